@@ -0,0 +1,118 @@
+"""
+Activity - Son başarılı yazma zamanı ve sessizlik son tarihi
+Tüm paylaşımlar (tweet, thread, quote, reply, mention) olay günlüğünden beslenir
+"""
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+from loguru import logger
+import pytz
+
+from config import config, DATA_DIR
+from event_journal import EventJournal, journal
+from usage import local_now
+
+# Aktivite sayılan olaylar (sadece başarılı yazmalar günlüğe düşer)
+ACTIVITY_EVENTS = ("tweet", "thread", "quote", "reply", "mention")
+
+
+class ActivityTracker:
+    """
+    Bellekteki son aktivite zamanı
+
+    Açılışta günlüğün son yazma olayından (yoksa eski
+    last_activity.json'dan) okunur, sonra her olayda güncellenir.
+    Değişiklik dinleyicileri sessizlik son tarihini yeniden kurar.
+    """
+
+    def __init__(self, event_journal: EventJournal, legacy_path=None):
+        self.journal = event_journal
+        self.legacy_path = legacy_path or DATA_DIR / "last_activity.json"
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[datetime], None]] = []
+        self._last: Optional[datetime] = self._restore()
+        self.journal.subscribe(self._on_event)
+
+    def _restore(self) -> Optional[datetime]:
+        events = self.journal.tail(1, types=ACTIVITY_EVENTS)
+        if events:
+            return datetime.fromisoformat(events[0]["ts"])
+        if self.legacy_path.exists():
+            try:
+                last = datetime.fromisoformat(json.loads(self.legacy_path.read_text())["last_activity"])
+                return last if last.tzinfo else pytz.timezone(config.schedule.timezone).localize(last)
+            except Exception as e:
+                logger.warning(f"Legacy last_activity.json could not be read: {e}")
+        return None
+
+    def _on_event(self, event: dict):
+        if event.get("type") not in ACTIVITY_EVENTS:
+            return
+        ts = datetime.fromisoformat(event["ts"])
+        with self._lock:
+            if self._last is not None and ts <= self._last:
+                return
+            self._last = ts
+        for callback in list(self._listeners):
+            try:
+                callback(ts)
+            except Exception as e:
+                logger.error(f"Activity listener error: {e}")
+
+    def reload(self) -> Optional[datetime]:
+        """
+        Son aktiviteyi diskteki günlükten tekrar oku
+
+        Başka süreçlerin (ör. CLI ile elle paylaşım) yazdığı olaylar bu
+        sürecin aboneliğine düşmez; daha yeni bir olay varsa dinleyiciler
+        çağrılır ve son tarih yeniden kurulur.
+        """
+        events = self.journal.tail(1, types=ACTIVITY_EVENTS)
+        if events:
+            self._on_event(events[0])
+        return self.last
+
+    def subscribe(self, callback: Callable[[datetime], None]):
+        """Her yeni aktivitede çağrılacak fonksiyon ekle"""
+        self._listeners.append(callback)
+
+    @property
+    def last(self) -> Optional[datetime]:
+        with self._lock:
+            return self._last
+
+    def hours_since(self) -> float:
+        """Son aktiviteden bu yana geçen saat (hiç yoksa 999)"""
+        last = self.last
+        if last is None:
+            return 999
+        return (local_now() - last).total_seconds() / 3600
+
+    def deadline(self) -> datetime:
+        """
+        Sessizlik kuralı için aksiyon zamanı
+
+        last + max_silence_hours - silence_margin_minutes; hiç aktivite
+        yoksa şimdi.
+        """
+        last = self.last
+        if last is None:
+            return local_now()
+        return last + timedelta(
+            hours=config.engagement.max_silence_hours,
+            minutes=-config.engagement.silence_margin_minutes,
+        )
+
+    def check(self) -> Tuple[bool, float]:
+        """
+        (is_urgent, hours_since_last)
+
+        Son tarih geçtiyse acil.
+        """
+        hours_since = self.hours_since()
+        return local_now() >= self.deadline(), hours_since
+
+
+# Süreç genelinde tek izleyici
+activity = ActivityTracker(journal)
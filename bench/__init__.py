@@ -0,0 +1,5 @@
+"""
+Benchmark ve yerel API stub'ları
+
+Repo kökünden modül olarak çalıştırılır: python -m bench.<modül>
+"""
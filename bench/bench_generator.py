@@ -0,0 +1,204 @@
+"""
+Generator Benchmark - TweetGenerator throughput ve kuyruk gecikmesi
+Sync, async, batched ve streaming yollarını yerel OpenAI stub'ına karşı ölçer
+
+Kullanım:
+    python -m bench.bench_generator --requests 40 --concurrency 8 --latency lognormal:0.3,0.5
+    python -m bench.bench_generator --base-url http://127.0.0.1:8089/v1   # harici stub
+"""
+import argparse
+import asyncio
+import math
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from loguru import logger
+
+from bench.openai_stub import LatencyModel, StubSettings, running_stub
+from config import config
+from reddit_scraper import RedditPost
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _report(name: str, latencies: List[float], failures: int, elapsed: float):
+    total = len(latencies) + failures
+    throughput = total / elapsed if elapsed else 0.0
+    print(
+        f"{name:<10} {total:>5} req  {throughput:>7.2f} req/s  "
+        f"p50 {_percentile(latencies, 50) * 1000:>7.0f}ms  "
+        f"p95 {_percentile(latencies, 95) * 1000:>7.0f}ms  "
+        f"p99 {_percentile(latencies, 99) * 1000:>7.0f}ms  "
+        f"fail {failures}"
+    )
+
+
+def _posts(count: int) -> List[RedditPost]:
+    return [
+        RedditPost(
+            id=f"bench{i}",
+            title=f"I built a SaaS that makes $10k/month - lesson {i}",
+            subreddit="SaaS",
+            score=1500,
+            num_comments=234,
+            url="https://reddit.com/r/SaaS/bench",
+            selftext="Started with an idea, validated on Reddit, built MVP in 2 weeks...",
+            created_utc=1704067200,
+            permalink=f"/r/SaaS/comments/bench{i}/",
+        )
+        for i in range(count)
+    ]
+
+
+def _timed(fn: Callable, latencies: List[float]) -> bool:
+    start = time.perf_counter()
+    result = fn()
+    latencies.append(time.perf_counter() - start)
+    return result is not None
+
+
+def bench_sync(generator, posts: List[RedditPost]):
+    latencies, failures = [], 0
+    start = time.perf_counter()
+    for post in posts:
+        if not _timed(lambda: generator.generate_tweet(post, "en"), latencies):
+            failures += 1
+    _report("sync", latencies, failures, time.perf_counter() - start)
+
+
+def bench_batched(generator, posts: List[RedditPost], concurrency: int):
+    """generate_tweets - gecikme batch başına ölçülür"""
+    latencies, failures = [], 0
+    start = time.perf_counter()
+    for i in range(0, len(posts), concurrency):
+        batch = posts[i:i + concurrency]
+        batch_start = time.perf_counter()
+        results = generator.generate_tweets(batch, "en", max_workers=concurrency)
+        latencies.append(time.perf_counter() - batch_start)
+        failures += results.count(None)
+    _report("batched", latencies, 0, time.perf_counter() - start)
+    print(f"{'':<10} {len(posts)} tweets in {len(latencies)} batches, {failures} failed")
+
+
+def bench_async(generator, posts: List[RedditPost], concurrency: int):
+    latencies: List[float] = []
+
+    async def one(post, semaphore):
+        async with semaphore:
+            start = time.perf_counter()
+            result = await generator.agenerate_tweet(post, "en")
+            latencies.append(time.perf_counter() - start)
+            return result is not None
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(one(p, semaphore) for p in posts))
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    _report("async", latencies, results.count(False), time.perf_counter() - start)
+
+
+def bench_stream(generator, posts: List[RedditPost]):
+    """Streaming - ilk token süresi (TTFT) ve toplam süre"""
+    ttft, latencies, failures = [], [], 0
+    start = time.perf_counter()
+    for post in posts:
+        call_start = time.perf_counter()
+        try:
+            stream = generator.client.chat.completions.create(
+                model=config.openai.model,
+                max_tokens=config.openai.max_tokens_tweet,
+                messages=generator._tweet_messages(post, "en"),
+                stream=True,
+            )
+            first = None
+            for chunk in stream:
+                if first is None and chunk.choices and chunk.choices[0].delta.content:
+                    first = time.perf_counter() - call_start
+            ttft.append(first or 0.0)
+            latencies.append(time.perf_counter() - call_start)
+        except Exception:
+            failures += 1
+    _report("stream", latencies, failures, time.perf_counter() - start)
+    print(f"{'':<10} TTFT p50 {_percentile(ttft, 50) * 1000:.0f}ms  p95 {_percentile(ttft, 95) * 1000:.0f}ms")
+
+
+def _isolate_state(tmp_dir: Path):
+    """Benchmark kayıtları gerçek usage/telemetri dosyalarını kirletmesin"""
+    import model_router
+    import usage
+
+    usage.ledger.path = tmp_dir / "usage.json"
+    usage.ledger._days = {}
+    model_router.telemetry.path = tmp_dir / "model_telemetry.json"
+    model_router.telemetry._stats = {}
+    model_router.telemetry._failover_until = {}
+
+
+def run(args, base_url: str):
+    from tweet_generator import TweetGenerator
+
+    config.openai.base_url = base_url
+    config.openai.api_key = config.openai.api_key or "stub"
+    config.openai.fallback_model = ""
+    config.tweet.variant_count = args.variants
+
+    generator = TweetGenerator()
+    posts = _posts(args.requests)
+
+    print(f"Target: {base_url}  requests={args.requests}  concurrency={args.concurrency}  n={args.variants}")
+    for path in args.paths:
+        if path == "sync":
+            bench_sync(generator, posts)
+        elif path == "batched":
+            bench_batched(generator, posts, args.concurrency)
+        elif path == "async":
+            bench_async(generator, posts, args.concurrency)
+        elif path == "stream":
+            bench_stream(generator, posts)
+
+    # Geçici dizin silinmeden önce write-behind kayıtları yaz
+    import model_router
+    import usage
+    usage.ledger.flush()
+    model_router.telemetry.flush()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="TweetGenerator benchmark against a local OpenAI stub")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--variants", type=int, default=3)
+    parser.add_argument("--latency", default="lognormal:0.2,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--base-url", help="Use an already running stub instead of starting one")
+    parser.add_argument("--paths", nargs="+", default=["sync", "batched", "async", "stream"],
+                        choices=["sync", "batched", "async", "stream"])
+    args = parser.parse_args(argv)
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _isolate_state(Path(tmp))
+        if args.base_url:
+            run(args, args.base_url)
+            return
+
+        settings = StubSettings(latency=LatencyModel.parse(args.latency), error_rate=args.error_rate)
+        with running_stub(settings) as server:
+            run(args, server.base_url)
+
+
+if __name__ == "__main__":
+    main()
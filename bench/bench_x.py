@@ -0,0 +1,262 @@
+"""
+X Benchmark - XPoster ve XEngagementManager uçtan uca döngüleri
+Yerel X stub'ına (ve gerekirse OpenAI stub'ına) karşı throughput ve gecikme
+
+Döngüler:
+    post      tek tweet paylaşımı
+    thread    5 tweetlik thread
+    engage    aday havuzundan (yoksa canlı) tweet seç + reply
+    pipeline  üretim (OpenAI stub) + outbox + paylaşım
+
+Kullanım:
+    python -m bench.bench_x --cycles 50 --latency lognormal:0.1,0.4
+    python -m bench.bench_x --paths engage --window 10 --limit "GET /2/users/:id/tweets=20"
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from loguru import logger
+
+from bench import openai_stub, x_stub
+from bench.bench_generator import _posts, _report
+from bench.openai_stub import LatencyModel
+from config import config
+
+
+def _isolate_state(tmp_dir: Path):
+    """
+    Benchmark kayıtları gerçek günlük/kota/limit dosyalarını kirletmesin
+
+    Süreç tekilleri (günlük, kota, outbox, önbellekler) import anında
+    DATA_DIR altında kurulur; DATA_DIR bu modüller import edilmeden önce
+    geçici dizine çevrilir. Önceden yüklenmiş olanların yolları elle taşınır.
+    """
+    import config as config_module
+    config_module.DATA_DIR = tmp_dir
+
+    import model_router
+    import rate_limits
+    import resilience
+    import usage
+
+    usage.ledger.path = tmp_dir / "usage.json"
+    usage.ledger._days = {}
+    model_router.telemetry.path = tmp_dir / "model_telemetry.json"
+    model_router.telemetry._stats = {}
+    model_router.telemetry._failover_until = {}
+    rate_limits.rate_limits.path = tmp_dir / "rate_limits.json"
+    rate_limits.rate_limits._limits = {}
+    resilience.breakers.path = tmp_dir / "breakers.json"
+    resilience.breakers._breakers = {}
+    resilience.breakers._persisted = {}
+
+
+def _wire(component, tmp_dir: Path):
+    """Poster/engagement nesnesini geçici günlük ve kotaya bağla"""
+    from event_journal import EventJournal
+    from quota import QuotaManager
+
+    journal = EventJournal(tmp_dir / "journal")
+    component.journal = journal
+    component.quota = QuotaManager(journal, path=tmp_dir / "quota.json")
+    if hasattr(component, "checkpoint_file"):
+        component.checkpoint_file = tmp_dir / "thread_checkpoints.json"
+    if hasattr(component, "target_accounts_file"):
+        from activity import ActivityTracker
+        from candidate_pool import CandidatePool
+        from engaged_index import EngagedIndex
+        from target_scheduler import TargetScheduler
+        from timeline_cache import TimelineCache
+        from user_cache import UserIdCache
+
+        component.target_accounts_file = tmp_dir / "target_accounts.json"
+        component.user_ids = UserIdCache(tmp_dir / "user_ids.json")
+        component.timelines = TimelineCache(tmp_dir / "timelines.json")
+        component.candidates = CandidatePool(tmp_dir / "candidate_pool.json")
+        component.engaged = EngagedIndex(journal, tmp_dir / "engaged_tweets.json")
+        component.target_scheduler = TargetScheduler(tmp_dir / "target_schedule.json")
+        component.activity = ActivityTracker(journal, tmp_dir / "last_activity.json")
+
+
+def _timed(fn, latencies: List[float]) -> bool:
+    start = time.perf_counter()
+    ok = bool(fn())
+    latencies.append(time.perf_counter() - start)
+    return ok
+
+
+def bench_post(poster, cycles: int):
+    latencies, failures = [], 0
+    start = time.perf_counter()
+    for i in range(cycles):
+        text = f"Benchmark tweet {i} {time.time_ns()}"
+        if not _timed(lambda: poster.post_tweet(text, "en", reddit_post_id=f"bench{i}", dry_run=False), latencies):
+            failures += 1
+    _report("post", latencies, failures, time.perf_counter() - start)
+
+
+def bench_thread(poster, cycles: int):
+    latencies, failures = [], 0
+    start = time.perf_counter()
+    for i in range(cycles):
+        tweets = [f"{j}/ Benchmark thread {i} part {j} {time.time_ns()}" for j in range(1, 6)]
+        if not _timed(lambda: poster.post_thread(tweets, "en", dry_run=False, reddit_post_id=f"bench{i}"), latencies):
+            failures += 1
+    _report("thread", latencies, failures, time.perf_counter() - start)
+
+
+def bench_engage(engagement, cycles: int, targets: List[str]):
+    latencies, failures = [], 0
+
+    # Havuz arka plan işinde kurulur; ölçüme dahil değil
+    for username in targets:
+        engagement.add_target_account(username)
+    engagement.refresh_candidate_pool()
+
+    def cycle(i: int) -> bool:
+        username = targets[i % len(targets)]
+        candidate = engagement.select_candidate(username)
+        if candidate:
+            tweet_id = candidate.tweet_id
+        else:
+            tweets = [t for t in engagement.get_user_recent_tweets(username, count=20)
+                      if not engagement.has_engaged(t["id"])]
+            if not tweets:
+                return False
+            tweet_id = tweets[0]["id"]
+        return engagement.reply_to_tweet(tweet_id, f"Great point #{i} {time.time_ns()}", dry_run=False, language="en")
+
+    start = time.perf_counter()
+    for i in range(cycles):
+        if not _timed(lambda: cycle(i), latencies):
+            failures += 1
+    _report("engage", latencies, failures, time.perf_counter() - start)
+
+
+def bench_pipeline(poster, cycles: int, tmp_dir: Path):
+    from outbox import Outbox, process_next
+    from tweet_generator import TweetGenerator
+
+    generator = TweetGenerator()
+    box = Outbox(tmp_dir / "outbox.db")
+    latencies, failures = [], 0
+
+    def cycle(post) -> bool:
+        text = generator.generate_tweet(post, "en")
+        if not text:
+            return False
+        box.enqueue("tweet", [f"{text} {time.time_ns()}"], "en", reddit_post_id=post.id)
+        return process_next(box, poster) is not None
+
+    start = time.perf_counter()
+    for post in _posts(cycles):
+        if not _timed(lambda: cycle(post), latencies):
+            failures += 1
+    _report("pipeline", latencies, failures, time.perf_counter() - start)
+
+
+def run(args, x_base_url: str, openai_base_url: Optional[str], tmp_dir: Path, server=None):
+    from x_engagement import XEngagementManager
+    from x_poster import XPoster
+
+    config.dry_run = False
+    config.x.base_url = x_base_url
+    config.x.api_key = config.x.api_key or "stub"
+    config.x.api_secret = config.x.api_secret or "stub"
+    config.x.access_token = config.x.access_token or "stub"
+    config.x.access_token_secret = config.x.access_token_secret or "stub"
+    config.x.bearer_token = config.x.bearer_token or "stub"
+    config.tweet.max_daily_tweets = 10 ** 6
+    if openai_base_url:
+        config.openai.base_url = openai_base_url
+        config.openai.api_key = config.openai.api_key or "stub"
+        config.openai.fallback_model = ""
+        config.tweet.variant_count = 1
+
+    poster = XPoster()
+    engagement = XEngagementManager()
+    _wire(poster, tmp_dir)
+    _wire(engagement, tmp_dir)
+
+    print(f"Target: {x_base_url}  cycles={args.cycles}")
+    for path in args.paths:
+        if path == "post":
+            bench_post(poster, args.cycles)
+        elif path == "thread":
+            bench_thread(poster, max(1, args.cycles // 5))
+        elif path == "engage":
+            bench_engage(engagement, args.cycles, args.targets)
+        elif path == "pipeline" and openai_base_url:
+            bench_pipeline(poster, args.cycles, tmp_dir)
+
+    # Geçici dizin silinmeden önce write-behind kayıtları yaz (süreç tekilleri dahil)
+    import engaged_index
+    import model_router
+    import quota
+    import rate_limits
+    import rollups
+    import target_scheduler
+    import usage
+    for store in (
+        poster.quota, engagement.quota, engagement.engaged, engagement.target_scheduler,
+        quota.quota, engaged_index.engaged, rollups.rollups, target_scheduler.target_scheduler,
+        rate_limits.rate_limits, usage.ledger, model_router.telemetry,
+    ):
+        store.flush()
+
+    if server is not None:
+        throttled = sum(server.throttled.values())
+        print(f"{'':<10} stub requests {sum(server.requests.values())}, throttled {throttled}")
+        for endpoint, count in sorted(server.throttled.items()):
+            print(f"{'':<10}   429 {endpoint}: {count}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="XPoster/XEngagementManager benchmark against a local X stub")
+    parser.add_argument("--cycles", type=int, default=30)
+    parser.add_argument("--latency", default="lognormal:0.05,0.4")
+    parser.add_argument("--openai-latency", default="lognormal:0.2,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--window", type=float, default=900.0, help="Rate limit window in seconds")
+    parser.add_argument("--limit", action="append", default=[], metavar="ENDPOINT=N")
+    parser.add_argument("--targets", nargs="+", default=["naval", "paulg", "levelsio"])
+    parser.add_argument("--base-url", help="Use an already running X stub instead of starting one")
+    parser.add_argument("--paths", nargs="+", default=["post", "thread", "engage", "pipeline"],
+                        choices=["post", "thread", "engage", "pipeline"])
+    args = parser.parse_args(argv)
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    limits = dict(x_stub.DEFAULT_LIMITS)
+    for item in args.limit:
+        endpoint, _, value = item.rpartition("=")
+        limits[endpoint.strip()] = int(value)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        _isolate_state(tmp_dir)
+        openai_settings = openai_stub.StubSettings(latency=LatencyModel.parse(args.openai_latency))
+
+        with openai_stub.running_stub(openai_settings) as openai_server:
+            if args.base_url:
+                run(args, args.base_url, openai_server.base_url, tmp_dir)
+                return
+
+            settings = x_stub.XStubSettings(
+                latency=LatencyModel.parse(args.latency),
+                error_rate=args.error_rate,
+                window=args.window,
+                limits=limits,
+                seed_users=sorted(set(args.targets) | set(x_stub.XStubSettings().seed_users)),
+            )
+            with x_stub.running_stub(settings) as server:
+                run(args, server.base_url, openai_server.base_url, tmp_dir, server)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+OpenAI Stub - Yerel chat-completions taklidi
+Offline yük testi ve benchmark için (streaming dahil)
+
+Kullanım:
+    python -m bench.openai_stub --port 8089 --latency lognormal:0.8,0.4 --error-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python main.py --dry-run
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Union
+
+
+@dataclass
+class LatencyModel:
+    """
+    Gecikme dağılımı
+
+    Spec formatı: 'fixed:0.5', 'uniform:0.2,1.0', 'normal:0.8,0.2', 'lognormal:0.8,0.4'
+    (lognormal için ilk değer medyan saniye, ikincisi sigma)
+    """
+    kind: str = "fixed"
+    params: List[float] = field(default_factory=lambda: [0.0])
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, raw = spec.partition(":")
+        params = [float(p) for p in raw.split(",") if p] or [0.0]
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        return cls(kind, params)
+
+    def sample(self) -> float:
+        p = self.params
+        if self.kind == "uniform":
+            return random.uniform(p[0], p[1] if len(p) > 1 else p[0])
+        if self.kind == "normal":
+            return max(0.0, random.gauss(p[0], p[1] if len(p) > 1 else 0.0))
+        if self.kind == "lognormal":
+            median = max(p[0], 1e-6)
+            sigma = p[1] if len(p) > 1 else 0.0
+            return median * random.lognormvariate(0.0, sigma)
+        return p[0]
+
+
+@dataclass
+class StubSettings:
+    """Stub davranışı"""
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    error_rate: float = 0.0
+    error_codes: List[int] = field(default_factory=lambda: [500, 503, 429])
+    retry_after: float = 1.0
+    # Prompt içinde geçen anahtar -> yanıt metni (veya metin listesi)
+    canned: Dict[str, Union[str, List[str]]] = field(default_factory=dict)
+    stream_chunks: int = 8
+
+
+_DEFAULT_TWEET = (
+    "Most founders chase passive income the wrong way 💸 "
+    "They build features nobody asked for instead of talking to ten customers. "
+    "Which side are you on?"
+)
+
+
+def _prompt_text(messages: List[dict]) -> str:
+    return "\n".join(str(m.get("content", "")) for m in messages)
+
+
+def _canned_reply(settings: StubSettings, prompt: str, index: int) -> Optional[str]:
+    for key, value in settings.canned.items():
+        if key in prompt:
+            if isinstance(value, list):
+                return value[index % len(value)]
+            return value
+    return None
+
+
+def _default_reply(body: dict, index: int) -> str:
+    response_format = (body.get("response_format") or {}).get("type")
+    if response_format == "json_object":
+        tweets = [f"{i}/ {_DEFAULT_TWEET[:200]}" for i in range(1, 6)]
+        tweets[0] = f"🧵 {tweets[0]}"
+        return json.dumps({"tweets": tweets}, ensure_ascii=False)
+    return f"{_DEFAULT_TWEET} #{index + 1}" if index else _DEFAULT_TWEET
+
+
+def _token_estimate(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "OpenAIStub/1.0"
+    protocol_version = "HTTP/1.1"
+    # Keep-alive: başlık ve gövde ayrı yazılınca Nagle ~40ms ekliyor
+    disable_nagle_algorithm = True
+
+    @property
+    def settings(self) -> StubSettings:
+        return self.server.settings
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        delay = self.settings.latency.sample()
+
+        if random.random() < self.settings.error_rate:
+            time.sleep(delay)
+            code = random.choice(self.settings.error_codes)
+            headers = {"Retry-After": str(self.settings.retry_after)} if code == 429 else None
+            self._send_json(code, {"error": {"message": f"injected {code}", "type": "stub_error"}}, headers)
+            return
+
+        messages = body.get("messages", [])
+        prompt = _prompt_text(messages)
+        n = max(1, int(body.get("n") or 1))
+        texts = [_canned_reply(self.settings, prompt, i) or _default_reply(body, i) for i in range(n)]
+
+        if body.get("stream"):
+            self._stream(body, texts[0], delay)
+            return
+
+        time.sleep(delay)
+        prompt_tokens = _token_estimate(prompt)
+        completion_tokens = sum(_token_estimate(t) for t in texts)
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {"index": i, "message": {"role": "assistant", "content": t}, "finish_reason": "stop"}
+                for i, t in enumerate(texts)
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _stream(self, body: dict, text: str, delay: float):
+        """SSE ile parça parça yanıt - gecikmenin yarısı ilk token'a kadar"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        chunk_count = max(1, self.settings.stream_chunks)
+        size = max(1, len(text) // chunk_count + 1)
+        pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        time.sleep(delay / 2)
+        for i, piece in enumerate(pieces):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"role": "assistant", "content": piece} if i == 0 else {"content": piece},
+                    "finish_reason": None,
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(delay / 2 / len(pieces))
+
+        final = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        self.wfile.write(f"data: {json.dumps(final)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class OpenAIStubServer(ThreadingHTTPServer):
+    """Arka planda çalışabilen stub sunucu"""
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, settings: Optional[StubSettings] = None):
+        super().__init__((host, port), _Handler)
+        self.settings = settings or StubSettings()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "OpenAIStubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+@contextmanager
+def running_stub(settings: Optional[StubSettings] = None, host: str = "127.0.0.1", port: int = 0):
+    """with running_stub(...) as server: server.base_url"""
+    server = OpenAIStubServer(host, port, settings).start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+def load_canned(path: Optional[str]) -> Dict[str, Union[str, List[str]]]:
+    """Canned yanıt dosyasını yükle ({"prompt parçası": "yanıt"})"""
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat-completions stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:0.2", help="fixed:s | uniform:a,b | normal:m,sd | lognormal:median,sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-codes", default="500,503,429")
+    parser.add_argument("--canned", help="JSON file mapping prompt substrings to replies")
+    args = parser.parse_args()
+
+    settings = StubSettings(
+        latency=LatencyModel.parse(args.latency),
+        error_rate=args.error_rate,
+        error_codes=[int(c) for c in args.error_codes.split(",") if c],
+        canned=load_canned(args.canned),
+    )
+    server = OpenAIStubServer(args.host, args.port, settings)
+    print(f"OpenAI stub listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
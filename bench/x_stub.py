@@ -0,0 +1,441 @@
+"""
+X Stub - Yerel X API v2 taklidi
+Kullandığımız endpoint'ler, rate limit başlıkları/429, gecikme dağılımı
+ve kalıcı durum (kullanıcılar, tweetler)
+
+Kullanım:
+    python -m bench.x_stub --port 8090 --latency lognormal:0.15,0.4 --window 60
+    X_API_BASE_URL=http://127.0.0.1:8090 python main.py --engage
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from bench.openai_stub import LatencyModel
+
+# Endpoint başına pencere limiti (X v2 kullanıcı bağlamı, 15 dk)
+DEFAULT_LIMITS: Dict[str, int] = {
+    "POST /2/tweets": 200,
+    "DELETE /2/tweets/:id": 50,
+    "GET /2/tweets/:id": 900,
+    "GET /2/tweets": 900,
+    "GET /2/users/me": 75,
+    "GET /2/users/:id": 900,
+    "GET /2/users": 900,
+    "GET /2/users/by/username/:username": 900,
+    "GET /2/users/by": 900,
+    "GET /2/users/:id/tweets": 900,
+}
+
+# Kimliği doğrulanmış hesap
+ME_ID = "1000"
+
+_DEFAULT_TARGETS = ["elonmusk", "naval", "paulg", "levelsio", "shl"]
+
+_SAMPLE_TEXTS = [
+    "Shipping beats planning. Every single time.",
+    "Your first 100 customers will teach you more than any course.",
+    "Most startups die from building the wrong thing, not from competition.",
+    "Write the landing page before you write the code.",
+    "Distribution is the product nobody talks about.",
+]
+
+
+@dataclass
+class XStubSettings:
+    """Stub davranışı"""
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    error_rate: float = 0.0
+    error_codes: List[int] = field(default_factory=lambda: [500, 503])
+    # Rate limit penceresi (saniye) ve endpoint limitleri
+    window: float = 900.0
+    limits: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_LIMITS))
+    # Kalıcı durum dosyası (None = sadece bellek)
+    state_path: Optional[Path] = None
+    # Açılışta oluşturulacak hedef hesaplar ve hesap başına tweet
+    seed_users: List[str] = field(default_factory=lambda: list(_DEFAULT_TARGETS))
+    seed_tweets: int = 20
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class XStubState:
+    """Kullanıcılar, tweetler ve rate limit pencereleri"""
+
+    def __init__(self, settings: XStubSettings):
+        self.settings = settings
+        self._lock = threading.Lock()
+        self.users: Dict[str, dict] = {}
+        self.tweets: Dict[str, dict] = {}
+        self.next_id = 10_000
+        self._windows: Dict[str, Tuple[float, int]] = {}
+
+        if not self._load():
+            self._seed()
+
+    # Kalıcılık ---------------------------------------------------------
+
+    def _load(self) -> bool:
+        path = self.settings.state_path
+        if not path or not Path(path).exists():
+            return False
+        data = json.loads(Path(path).read_text())
+        self.users, self.tweets, self.next_id = data["users"], data["tweets"], data["next_id"]
+        return True
+
+    def save(self):
+        path = self.settings.state_path
+        if not path:
+            return
+        tmp = Path(f"{path}.tmp")
+        tmp.write_text(json.dumps({"users": self.users, "tweets": self.tweets, "next_id": self.next_id}))
+        tmp.replace(path)
+
+    def _seed(self):
+        self.users[ME_ID] = {"id": ME_ID, "name": "Automation", "username": "automation_bot"}
+        for i, username in enumerate(self.settings.seed_users):
+            user_id = str(2000 + i)
+            self.users[user_id] = {"id": user_id, "name": username.title(), "username": username}
+            for j in range(self.settings.seed_tweets):
+                self._new_tweet(user_id, f"{_SAMPLE_TEXTS[j % len(_SAMPLE_TEXTS)]} ({username} #{j})")
+        self.save()
+
+    # Veri --------------------------------------------------------------
+
+    def _new_tweet(self, author_id: str, text: str, reply_to: Optional[str] = None) -> dict:
+        self.next_id += 1
+        tweet_id = str(self.next_id)
+        tweet = {
+            "id": tweet_id,
+            "text": text,
+            "author_id": author_id,
+            "created_at": _now_iso(),
+            "conversation_id": self.tweets[reply_to]["conversation_id"] if reply_to in self.tweets else tweet_id,
+            "edit_history_tweet_ids": [tweet_id],
+            "public_metrics": {
+                "retweet_count": random.randint(0, 500),
+                "reply_count": random.randint(0, 200),
+                "like_count": random.randint(0, 5000),
+                "quote_count": random.randint(0, 50),
+            },
+        }
+        if reply_to:
+            tweet["in_reply_to_tweet_id"] = reply_to
+        self.tweets[tweet_id] = tweet
+        return tweet
+
+    def create_tweet(self, text: str, reply_to: Optional[str]) -> Tuple[int, dict]:
+        with self._lock:
+            if not text:
+                return 400, _error("Invalid Request", "text is required")
+            if reply_to and reply_to not in self.tweets:
+                return 400, _error("Invalid Request", "in_reply_to_tweet_id does not exist")
+            if any(t["author_id"] == ME_ID and t["text"] == text for t in self.tweets.values()):
+                return 403, {"detail": "You are not allowed to create a Tweet with duplicate content.",
+                             "title": "Forbidden", "status": 403}
+            tweet = self._new_tweet(ME_ID, text, reply_to)
+            self.save()
+            return 201, {"data": {"id": tweet["id"], "text": tweet["text"],
+                                  "edit_history_tweet_ids": tweet["edit_history_tweet_ids"]}}
+
+    def delete_tweet(self, tweet_id: str) -> Tuple[int, dict]:
+        with self._lock:
+            deleted = self.tweets.pop(tweet_id, None) is not None
+            if deleted:
+                self.save()
+            return 200, {"data": {"deleted": deleted}}
+
+    def user_by_username(self, username: str) -> Optional[dict]:
+        username = username.lower()
+        return next((u for u in self.users.values() if u["username"].lower() == username), None)
+
+    def user_tweets(self, user_id: str, max_results: int, since_id: Optional[str]) -> List[dict]:
+        with self._lock:
+            tweets = [
+                t for t in self.tweets.values()
+                if t["author_id"] == user_id and (not since_id or int(t["id"]) > int(since_id))
+            ]
+        tweets.sort(key=lambda t: int(t["id"]), reverse=True)
+        return tweets[:max_results]
+
+    # Rate limit --------------------------------------------------------
+
+    def consume(self, endpoint: str) -> Tuple[bool, Dict[str, str]]:
+        """Pencereden bir istek düş; (izin, başlıklar)"""
+        limit = self.settings.limits.get(endpoint)
+        if limit is None:
+            return True, {}
+        now = time.time()
+        with self._lock:
+            reset, used = self._windows.get(endpoint, (0.0, 0))
+            if now >= reset:
+                reset, used = now + self.settings.window, 0
+            allowed = used < limit
+            if allowed:
+                used += 1
+            self._windows[endpoint] = (reset, used)
+        return allowed, {
+            "x-rate-limit-limit": str(limit),
+            "x-rate-limit-remaining": str(max(0, limit - used)),
+            "x-rate-limit-reset": str(int(reset)),
+        }
+
+
+def _error(title: str, detail: str) -> dict:
+    return {"errors": [{"message": detail}], "title": title, "detail": detail}
+
+
+_NUMERIC = re.compile(r"(?<=.)/\d+(?=/|$)")
+_USERNAME = re.compile(r"/username/[^/]+")
+
+
+def _endpoint(method: str, path: str) -> str:
+    path = _USERNAME.sub("/username/:username", path)
+    return f"{method} {_NUMERIC.sub('/:id', path)}"
+
+
+def _fields(query: Dict[str, List[str]], name: str) -> List[str]:
+    return [f for value in query.get(name, []) for f in value.split(",") if f]
+
+
+def _project(tweet: dict, fields: List[str]) -> dict:
+    base = {"id": tweet["id"], "text": tweet["text"], "edit_history_tweet_ids": tweet["edit_history_tweet_ids"]}
+    for name in fields:
+        if name in tweet:
+            base[name] = tweet[name]
+    return base
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "XStub/1.0"
+    protocol_version = "HTTP/1.1"
+    # Keep-alive: başlık ve gövde ayrı yazılınca Nagle ~40ms ekliyor
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self) -> XStubState:
+        return self.server.state
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self, method: str):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        endpoint = _endpoint(method, url.path.rstrip("/"))
+        settings = self.server.settings
+        time.sleep(settings.latency.sample())
+
+        allowed, headers = self.state.consume(endpoint)
+        self.server.count(endpoint, allowed)
+        if not allowed:
+            self._send_json(429, {"title": "Too Many Requests", "detail": "Too Many Requests", "status": 429}, headers)
+            return
+        if random.random() < settings.error_rate:
+            code = random.choice(settings.error_codes)
+            self._send_json(code, _error("Service Unavailable", f"injected {code}"), headers)
+            return
+
+        handler = _ROUTES.get(endpoint)
+        if handler is None:
+            self._send_json(404, _error("Not Found", f"{endpoint} is not emulated"), headers)
+            return
+        status, payload = handler(self.state, url.path.rstrip("/"), query, body)
+        self._send_json(status, payload, headers)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+# Route işleyicileri: (state, path, query, body) -> (status, payload)
+
+def _post_tweet(state: XStubState, path, query, body):
+    reply_to = (body.get("reply") or {}).get("in_reply_to_tweet_id")
+    return state.create_tweet(body.get("text", ""), reply_to)
+
+
+def _delete_tweet(state: XStubState, path, query, body):
+    return state.delete_tweet(path.rsplit("/", 1)[1])
+
+
+def _get_tweet(state: XStubState, path, query, body):
+    tweet = state.tweets.get(path.rsplit("/", 1)[1])
+    if tweet is None:
+        return 200, {"errors": [{"title": "Not Found Error", "detail": "Could not find tweet"}]}
+    return 200, {"data": _project(tweet, _fields(query, "tweet.fields"))}
+
+
+def _get_tweets(state: XStubState, path, query, body):
+    fields = _fields(query, "tweet.fields")
+    ids = _fields(query, "ids")
+    found = [_project(state.tweets[i], fields) for i in ids if i in state.tweets]
+    return 200, {"data": found} if found else {"errors": [{"title": "Not Found Error"}]}
+
+
+def _get_me(state: XStubState, path, query, body):
+    return 200, {"data": state.users[ME_ID]}
+
+
+def _get_user(state: XStubState, path, query, body):
+    user = state.users.get(path.rsplit("/", 1)[1])
+    return 200, {"data": user} if user else {"errors": [{"title": "Not Found Error"}]}
+
+
+def _get_users(state: XStubState, path, query, body):
+    ids = _fields(query, "ids")
+    if len(ids) > 100:
+        return 400, _error("Invalid Request", "ids: at most 100 values")
+    found = [state.users[i] for i in ids if i in state.users]
+    return 200, {"data": found} if found else {"errors": [{"title": "Not Found Error"}]}
+
+
+def _get_user_by_username(state: XStubState, path, query, body):
+    user = state.user_by_username(path.rsplit("/", 1)[1])
+    return 200, {"data": user} if user else {"errors": [{"title": "Not Found Error"}]}
+
+
+def _get_users_by(state: XStubState, path, query, body):
+    names = _fields(query, "usernames")
+    if len(names) > 100:
+        return 400, _error("Invalid Request", "usernames: at most 100 values")
+    found = [u for u in (state.user_by_username(n) for n in names) if u]
+    return 200, {"data": found} if found else {"errors": [{"title": "Not Found Error"}]}
+
+
+def _get_users_tweets(state: XStubState, path, query, body):
+    user_id = path.split("/")[3]
+    max_results = int((query.get("max_results") or ["10"])[0])
+    if not 5 <= max_results <= 100:
+        return 400, _error("Invalid Request", "max_results must be between 5 and 100")
+    since_id = (query.get("since_id") or [None])[0]
+    tweets = state.user_tweets(user_id, max_results, since_id)
+    fields = _fields(query, "tweet.fields")
+    meta = {"result_count": len(tweets)}
+    if tweets:
+        meta.update(newest_id=tweets[0]["id"], oldest_id=tweets[-1]["id"])
+        return 200, {"data": [_project(t, fields) for t in tweets], "meta": meta}
+    return 200, {"meta": meta}
+
+
+_ROUTES: Dict[str, Callable] = {
+    "POST /2/tweets": _post_tweet,
+    "DELETE /2/tweets/:id": _delete_tweet,
+    "GET /2/tweets/:id": _get_tweet,
+    "GET /2/tweets": _get_tweets,
+    "GET /2/users/me": _get_me,
+    "GET /2/users/:id": _get_user,
+    "GET /2/users": _get_users,
+    "GET /2/users/by/username/:username": _get_user_by_username,
+    "GET /2/users/by": _get_users_by,
+    "GET /2/users/:id/tweets": _get_users_tweets,
+}
+
+
+class XStubServer(ThreadingHTTPServer):
+    """Arka planda çalışabilen stub sunucu"""
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, settings: Optional[XStubSettings] = None):
+        super().__init__((host, port), _Handler)
+        self.settings = settings or XStubSettings()
+        self.state = XStubState(self.settings)
+        self.requests: Dict[str, int] = {}
+        self.throttled: Dict[str, int] = {}
+        self._count_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def count(self, endpoint: str, allowed: bool):
+        with self._count_lock:
+            target = self.requests if allowed else self.throttled
+            target[endpoint] = target.get(endpoint, 0) + 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "XStubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+@contextmanager
+def running_stub(settings: Optional[XStubSettings] = None, host: str = "127.0.0.1", port: int = 0):
+    """with running_stub(...) as server: server.base_url"""
+    server = XStubServer(host, port, settings).start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local X API v2 stub with rate-limit emulation")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="fixed:0.1", help="fixed:s | uniform:a,b | normal:m,sd | lognormal:median,sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--window", type=float, default=900.0, help="Rate limit window in seconds")
+    parser.add_argument("--limit", action="append", default=[], metavar="ENDPOINT=N",
+                        help="Override a limit, e.g. 'POST /2/tweets=10'")
+    parser.add_argument("--state", default="data/x_stub_state.json", help="Persistent state file ('' = memory only)")
+    args = parser.parse_args()
+
+    limits = dict(DEFAULT_LIMITS)
+    for item in args.limit:
+        endpoint, _, value = item.rpartition("=")
+        limits[endpoint.strip()] = int(value)
+
+    settings = XStubSettings(
+        latency=LatencyModel.parse(args.latency),
+        error_rate=args.error_rate,
+        window=args.window,
+        limits=limits,
+        state_path=Path(args.state) if args.state else None,
+    )
+    server = XStubServer(args.host, args.port, settings)
+    print(f"X stub listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Candidate Pool - Engagement için önceden puanlanmış tweet havuzu
+Hedef hesapların önbellekteki tweetleri yerelde puanlanır; seçim heap ile O(log n)
+
+Puan: tazelik (yarı ömür), etkileşim hızı (metrik / yaş) ve konuşma durumu
+(kök tweet, yanıt yoğunluğu). Engagement işi sırasında API okuması yapılmaz.
+"""
+import heapq
+import json
+import math
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+
+from config import config, DATA_DIR
+
+# Tazelik yarı ömrü (saat)
+RECENCY_HALF_LIFE_HOURS = 6.0
+
+# Puan ağırlıkları
+W_RECENCY = 0.4
+W_VELOCITY = 0.4
+W_CONVERSATION = 0.2
+
+
+@dataclass
+class Candidate:
+    """Etkileşim adayı tweet"""
+    tweet_id: str
+    username: str
+    text: str
+    created_at: Optional[str]
+    metrics: Dict[str, int] = field(default_factory=dict)
+    conversation_id: Optional[str] = None
+    score: float = 0.0
+
+    def as_tweet(self) -> dict:
+        """get_user_recent_tweets ile aynı yapı"""
+        return {"id": self.tweet_id, "text": self.text, "created_at": self.created_at, "metrics": self.metrics}
+
+
+def _age_hours(created_at: Optional[str], now: datetime) -> float:
+    if not created_at:
+        return float("inf")
+    created = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return max(0.0, (now - created).total_seconds() / 3600)
+
+
+def score_candidates(candidates: List[Candidate], now: Optional[datetime] = None) -> List[Candidate]:
+    """
+    Adayları tek geçişte puanla, yaşı sınırı aşanları at
+
+    Özellik sütunları bir kez hesaplanır; hız logaritmik olarak havuzdaki
+    en yüksek hıza göre normalize edilir.
+    """
+    now = now or datetime.now(timezone.utc)
+    max_age = config.engagement.candidate_max_age_hours
+
+    ages = [_age_hours(c.created_at, now) for c in candidates]
+    kept = [(c, age) for c, age in zip(candidates, ages) if age <= max_age]
+    if not kept:
+        return []
+
+    velocities = []
+    conversations = []
+    for c, age in kept:
+        m = c.metrics or {}
+        likes, replies = m.get("like_count", 0), m.get("reply_count", 0)
+        weighted = likes + 2 * m.get("retweet_count", 0) + 3 * replies + 2 * m.get("quote_count", 0)
+        velocities.append(math.log1p(weighted / max(age, 0.25)))
+        # Kök tweet ve yanıt/beğeni oranı yüksek = canlı tartışma
+        is_root = c.conversation_id in (None, c.tweet_id)
+        conversations.append((0.5 if is_root else 0.0) + 0.5 * min(1.0, replies / (likes + 1) * 5))
+
+    top_velocity = max(velocities) or 1.0
+    for (c, age), velocity, conversation in zip(kept, velocities, conversations):
+        recency = 0.5 ** (age / RECENCY_HALF_LIFE_HOURS)
+        c.score = W_RECENCY * recency + W_VELOCITY * velocity / top_velocity + W_CONVERSATION * conversation
+    return [c for c, _ in kept]
+
+
+class CandidatePool:
+    """
+    Puanlı aday havuzu
+
+    Genel ve hesap bazlı max-heap'ler (negatif puan) tutulur; seçilen
+    aday sözlükten silinir, heap'lerdeki kopyası pop sırasında atlanır.
+    Havuz data/candidate_pool.json'a yazılır, böylece ayrı süreçte
+    çalışan engagement işi de kullanır.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DATA_DIR / "candidate_pool.json"
+        self._lock = threading.Lock()
+        self._candidates: Dict[str, Candidate] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._by_user: Dict[str, List[Tuple[float, str]]] = {}
+        self.built_at: Optional[str] = None
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+            self._index([Candidate(**c) for c in data.get("candidates", [])])
+            self.built_at = data.get("built_at")
+        except Exception as e:
+            logger.warning(f"Candidate pool could not be loaded: {e}")
+
+    def _save(self):
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({
+            "built_at": self.built_at,
+            "candidates": [asdict(c) for c in self._candidates.values()],
+        }, ensure_ascii=False))
+        tmp.replace(self.path)
+
+    def _index(self, candidates: Iterable[Candidate]):
+        """Sözlük ve heap'leri kur (O(n) heapify)"""
+        self._candidates = {c.tweet_id: c for c in candidates}
+        self._heap = [(-c.score, c.tweet_id) for c in self._candidates.values()]
+        heapq.heapify(self._heap)
+        self._by_user = {}
+        for c in self._candidates.values():
+            self._by_user.setdefault(c.username.lower(), []).append((-c.score, c.tweet_id))
+        for heap in self._by_user.values():
+            heapq.heapify(heap)
+
+    def rebuild(self, candidates: List[Candidate]):
+        """Havuzu yeniden puanla ve kur"""
+        scored = score_candidates(candidates)
+        with self._lock:
+            self._index(scored)
+            self.built_at = datetime.now().isoformat()
+            self._save()
+        logger.info(f"Candidate pool rebuilt: {len(scored)} candidates from {len(candidates)} tweets")
+
+    def select(self, username: Optional[str] = None) -> Optional[Candidate]:
+        """
+        En yüksek puanlı adayı al ve havuzdan çıkar
+
+        Args:
+            username: Verilirse sadece bu hesabın adayları
+        """
+        with self._lock:
+            heap = self._by_user.get(username.lower(), []) if username else self._heap
+            while heap:
+                _, tweet_id = heapq.heappop(heap)
+                candidate = self._candidates.pop(tweet_id, None)
+                if candidate is not None:
+                    self._save()
+                    return candidate
+            return None
+
+    def is_stale(self) -> bool:
+        """Havuz hiç kurulmadı ya da candidate_refresh_minutes'tan eski"""
+        if not self.built_at:
+            return True
+        age = datetime.now() - datetime.fromisoformat(self.built_at)
+        return age > timedelta(minutes=config.engagement.candidate_refresh_minutes)
+
+    def has_candidates(self, username: str) -> bool:
+        """Hesabın havuzda seçilebilir adayı var mı (silinmiş baş kayıtlar temizlenir)"""
+        with self._lock:
+            heap = self._by_user.get(username.lower())
+            while heap and heap[0][1] not in self._candidates:
+                heapq.heappop(heap)
+            return bool(heap)
+
+    def discard(self, tweet_id: str):
+        """Adayı havuzdan çıkar (ör. başka yoldan etkileşim yapıldı)"""
+        with self._lock:
+            if self._candidates.pop(str(tweet_id), None) is not None:
+                self._save()
+
+    def __len__(self) -> int:
+        return len(self._candidates)
+
+
+# Süreç genelinde tek havuz
+candidates = CandidatePool()
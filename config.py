@@ -21,11 +21,41 @@ class XConfig(BaseModel):
     access_token: str = os.getenv("X_ACCESS_TOKEN", "")
     access_token_secret: str = os.getenv("X_ACCESS_TOKEN_SECRET", "")
     bearer_token: str = os.getenv("X_BEARER_TOKEN", "")
+    # Boşsa gerçek API; yerel stub için ör. http://127.0.0.1:8090
+    base_url: str = os.getenv("X_API_BASE_URL", "")
+    # Döngü son tarihi varken istek başına en fazla HTTP timeout (saniye)
+    request_timeout: float = float(os.getenv("X_REQUEST_TIMEOUT", "30"))
 
 class OpenAIConfig(BaseModel):
     """OpenAI API configuration"""
     api_key: str = os.getenv("OPENAI_API_KEY", "")
     model: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    
+    # OpenAI uyumlu farklı bir sunucu (ör. yerel stub: http://127.0.0.1:8089/v1)
+    base_url: str = os.getenv("OPENAI_BASE_URL", "")
+    
+    # Tek tweet üretimi için süre sınırı (saniye) - aşılırsa şablona düşülür
+    generation_deadline_seconds: float = float(os.getenv("OPENAI_DEADLINE_SECONDS", "45"))
+    
+    # Görev bazlı model yönlendirme (boşsa OPENAI_MODEL kullanılır)
+    tweet_model: str = os.getenv("OPENAI_MODEL_TWEET", "")
+    thread_model: str = os.getenv("OPENAI_MODEL_THREAD", "")
+    quote_model: str = os.getenv("OPENAI_MODEL_QUOTE", "")
+    reply_model: str = os.getenv("OPENAI_MODEL_REPLY", "")
+    
+    # Görev bazlı max_tokens
+    max_tokens_tweet: int = int(os.getenv("OPENAI_MAX_TOKENS_TWEET", "300"))
+    max_tokens_thread: int = int(os.getenv("OPENAI_MAX_TOKENS_THREAD", "1500"))
+    max_tokens_quote: int = int(os.getenv("OPENAI_MAX_TOKENS_QUOTE", "150"))
+    max_tokens_reply: int = int(os.getenv("OPENAI_MAX_TOKENS_REPLY", "200"))
+    
+    # Yedek model - p95 gecikme veya hata oranı eşiği aşılınca devreye girer
+    fallback_model: str = os.getenv("OPENAI_FALLBACK_MODEL", "")
+    failover_p95_seconds: float = float(os.getenv("OPENAI_FAILOVER_P95_SECONDS", "20"))
+    failover_error_rate: float = float(os.getenv("OPENAI_FAILOVER_ERROR_RATE", "0.5"))
+    failover_min_samples: int = int(os.getenv("OPENAI_FAILOVER_MIN_SAMPLES", "5"))
+    failover_cooldown_minutes: int = int(os.getenv("OPENAI_FAILOVER_COOLDOWN", "30"))
+    telemetry_window: int = int(os.getenv("OPENAI_TELEMETRY_WINDOW", "50"))
 
 class RedditConfig(BaseModel):
     """Reddit scraping configuration"""
@@ -66,6 +96,10 @@ class EngagementConfig(BaseModel):
     # 24 saat kuralı - maksimum sessizlik süresi (saat)
     max_silence_hours: int = int(os.getenv("MAX_SILENCE_HOURS", "23"))
     
+    # Sessizlik son tarihinden ne kadar önce aksiyon alınsın / başarısızsa tekrar (dakika)
+    silence_margin_minutes: int = int(os.getenv("SILENCE_MARGIN_MINUTES", "30"))
+    silence_retry_minutes: int = int(os.getenv("SILENCE_RETRY_MINUTES", "15"))
+    
     # Minimum engagement rate hedefi (%0.5)
     min_engagement_rate: float = float(os.getenv("MIN_ENGAGEMENT_RATE", "0.005"))
     
@@ -79,6 +113,24 @@ class EngagementConfig(BaseModel):
     daily_quote_target: int = int(os.getenv("DAILY_QUOTE_TARGET", "10"))
     daily_mention_target: int = int(os.getenv("DAILY_MENTION_TARGET", "5"))
     
+    # Hedef hesapların username -> ID önbelleği kaç günde bir yenilensin
+    user_cache_refresh_days: int = int(os.getenv("USER_CACHE_REFRESH_DAYS", "7"))
+    
+    # Hesap başına yerelde tutulan son tweet sayısı (since_id ile artımlı)
+    timeline_window: int = int(os.getenv("TIMELINE_WINDOW", "20"))
+    # Zaman akışı bu kadar dakikadan yeniyse API'ye hiç gidilmez
+    timeline_refresh_minutes: int = int(os.getenv("TIMELINE_REFRESH_MINUTES", "15"))
+    
+    # Aday havuzu: arka planda yenileme aralığı ve en fazla tweet yaşı
+    candidate_refresh_minutes: int = int(os.getenv("CANDIDATE_REFRESH_MINUTES", "30"))
+    candidate_max_age_hours: int = int(os.getenv("CANDIDATE_MAX_AGE_HOURS", "24"))
+    
+    # Tekrar quote/reply engeli için tutulan en fazla tweet ID sayısı
+    engaged_index_size: int = int(os.getenv("ENGAGED_INDEX_SIZE", "5000"))
+    
+    # Aynı hedef hesaba iki etkileşim arası en az süre (dakika)
+    target_cooldown_minutes: int = int(os.getenv("TARGET_COOLDOWN_MINUTES", "180"))
+    
     # Trustscore aktarımı için hedef hesaplar (username listesi)
     target_accounts: List[str] = []
 
@@ -87,6 +139,12 @@ class TweetConfig(BaseModel):
     max_daily_tweets: int = int(os.getenv("MAX_DAILY_TWEETS", "8"))
     min_interval_minutes: int = int(os.getenv("MIN_TWEET_INTERVAL", "60"))
     
+    # Tek çağrıda üretilecek tweet varyantı (en iyisi yerelde seçilir)
+    variant_count: int = int(os.getenv("TWEET_VARIANTS", "3"))
+    
+    # OpenAI yavaş/kapalıyken yerel şablonla tweet üret (slot kaybolmasın)
+    use_template_fallback: bool = os.getenv("USE_TEMPLATE_FALLBACK", "true").lower() == "true"
+    
     # Hurricane: Hashtag kullanma, engagement düşürür
     use_hashtags: bool = os.getenv("USE_HASHTAGS", "false").lower() == "true"
     
@@ -123,6 +181,26 @@ class ScheduleConfig(BaseModel):
     engagement_schedule: List[str] = [
         "07:00", "09:00", "11:00", "13:00", "15:00", "17:00", "19:00", "21:00"
     ]
+    
+    # Kalıcı iş deposu (boşsa data/jobs.sqlite)
+    job_store: str = os.getenv("SCHEDULER_JOB_STORE", "")
+    
+    # Kapalıyken kaçan slot en fazla bu kadar gecikmeyle telafi edilir (dakika)
+    engagement_misfire_grace_minutes: int = int(os.getenv("ENGAGEMENT_MISFIRE_GRACE_MINUTES", "90"))
+    original_misfire_grace_minutes: int = int(os.getenv("ORIGINAL_MISFIRE_GRACE_MINUTES", "180"))
+    
+    # Zamanlanmış döngü süre sınırı (dakika) - sonraki slottan önce temiz iptal
+    cycle_timeout_minutes: int = int(os.getenv("CYCLE_TIMEOUT_MINUTES", "20"))
+    
+    # İş türü başına eşzamanlı çalışma sınırı
+    engagement_workers: int = int(os.getenv("ENGAGEMENT_WORKERS", "1"))
+    original_workers: int = int(os.getenv("ORIGINAL_WORKERS", "1"))
+    
+    # Çakışan slotlar: 'merge' = tek birleşik döngü, 'stagger' = sonrakini kaydır
+    slot_collision_policy: str = os.getenv("SLOT_COLLISION_POLICY", "merge")
+    # İki döngü arasında en az süre (dakika); slot ayrıca önceki döngünün
+    # CYCLE_TIMEOUT_MINUTES x aksiyon sayısı süresi bitmeden başlamaz
+    slot_min_gap_minutes: int = int(os.getenv("SLOT_MIN_GAP_MINUTES", "10"))
 
 class WarmupConfig(BaseModel):
     """Reddit ısınma süreci yapılandırması"""
@@ -138,6 +216,47 @@ class WarmupConfig(BaseModel):
     # Günlük karma hedefi
     daily_karma_target: int = int(os.getenv("DAILY_KARMA_TARGET", "50"))
 
+class BudgetConfig(BaseModel):
+    """Günlük kullanım bütçeleri (0 = sınırsız)"""
+    daily_openai_tokens: int = int(os.getenv("DAILY_OPENAI_TOKENS", "0"))
+    daily_openai_requests: int = int(os.getenv("DAILY_OPENAI_REQUESTS", "0"))
+    daily_x_writes: int = int(os.getenv("DAILY_X_WRITES", "0"))
+    daily_x_reads: int = int(os.getenv("DAILY_X_READS", "0"))
+    
+    # Bütçenin bu oranı aşılınca iş hafifletilir (thread yerine tek tweet vb.)
+    degrade_ratio: float = float(os.getenv("BUDGET_DEGRADE_RATIO", "0.8"))
+
+class ResilienceConfig(BaseModel):
+    """OpenAI ve X çağrıları için retry / circuit breaker ayarları"""
+    max_attempts: int = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+    base_delay: float = float(os.getenv("RETRY_BASE_DELAY", "1"))
+    max_delay: float = float(os.getenv("RETRY_MAX_DELAY", "30"))
+    
+    # Art arda bu kadar geçici hata -> breaker açılır
+    breaker_failure_threshold: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    breaker_reset_seconds: float = float(os.getenv("BREAKER_RESET_SECONDS", "120"))
+    
+    # X rate limit: reset bu kadar saniye içindeyse bekle, değilse işi ertele
+    rate_limit_max_wait: float = float(os.getenv("RATE_LIMIT_MAX_WAIT", "60"))
+    # Endpoint başına son N istek yedekte tutulur
+    rate_limit_reserve: int = int(os.getenv("RATE_LIMIT_RESERVE", "0"))
+
+class JournalConfig(BaseModel):
+    """Append-only olay günlüğü (tweet/engagement geçmişi)"""
+    segment_max_events: int = int(os.getenv("JOURNAL_SEGMENT_EVENTS", "1000"))
+    retention_days: int = int(os.getenv("JOURNAL_RETENTION_DAYS", "90"))
+    # Bu kadar kapalı segment birikince arka planda sıkıştır
+    compact_after_segments: int = int(os.getenv("JOURNAL_COMPACT_AFTER", "4"))
+    # Günlükten türetilen görünümler (kota, rollup) en geç bu kadar saniyede diske yazılır
+    flush_seconds: float = float(os.getenv("JOURNAL_FLUSH_SECONDS", "5"))
+
+class OutboxConfig(BaseModel):
+    """Kalıcı paylaşım kuyruğu (üretim ve paylaşım ayrık)"""
+    # Başarısız öğe bu kadar denemeden sonra failed olur
+    max_attempts: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "3"))
+    # posted/failed öğeler kaç gün saklansın
+    keep_days: int = int(os.getenv("OUTBOX_KEEP_DAYS", "30"))
+
 class Config(BaseModel):
     """Main configuration"""
     x: XConfig = XConfig()
@@ -147,6 +266,10 @@ class Config(BaseModel):
     schedule: ScheduleConfig = ScheduleConfig()
     engagement: EngagementConfig = EngagementConfig()
     warmup: WarmupConfig = WarmupConfig()
+    budget: BudgetConfig = BudgetConfig()
+    resilience: ResilienceConfig = ResilienceConfig()
+    journal: JournalConfig = JournalConfig()
+    outbox: OutboxConfig = OutboxConfig()
     
     dry_run: bool = os.getenv("DRY_RUN", "false").lower() == "true"
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
@@ -0,0 +1,103 @@
+"""
+Engaged Index - Quote/reply yapılmış orijinal tweet ID'leri
+O(1) üyelik kontrolü, sınırlı bellek, olay günlüğünden artımlı güncelleme
+"""
+import json
+import threading
+from collections import OrderedDict
+from loguru import logger
+
+from config import config, DATA_DIR
+from event_journal import EventJournal, JournalFollower, journal
+from storage import WriteBehindSnapshot
+
+# Orijinal tweet'e bağlı olay türleri
+ENGAGED_EVENTS = ("quote", "reply")
+
+
+class EngagedIndex(JournalFollower, WriteBehindSnapshot):
+    """
+    Etkileşim yapılmış tweet ID'leri (eklenme sırasıyla)
+
+    En fazla engaged_index_size ID tutulur, en eskisi düşer. Diskteki
+    anlık görüntü (data/engaged_tweets.json) seq ile birlikte yazılır;
+    açılışta sadece sonraki olaylar günlükten okunur. Diğer süreçlerin
+    etkileşimleri üyelik kontrolünden önce günlükten okunur (catch_up).
+    """
+
+    def __init__(self, event_journal: EventJournal, path=None):
+        self.journal = event_journal
+        self.path = path or DATA_DIR / "engaged_tweets.json"
+        self._lock = threading.Lock()
+        self._ids: "OrderedDict[str, None]" = OrderedDict()
+        self._seq = 0
+        self._init_snapshot()
+
+        self._restore()
+        self.journal.subscribe(self._follow)
+
+    # ------------------------------------------------------------------
+    # Kurulum
+    # ------------------------------------------------------------------
+
+    def _restore(self):
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+                with self._lock:
+                    for tweet_id in data.get("ids", []):
+                        self._add(tweet_id)
+                    self._seq = data.get("seq", 0)
+                    for event in self.journal.after(self._seq):
+                        self._apply(event)
+                return
+            except Exception as e:
+                logger.warning(f"Engaged index snapshot could not be loaded: {e}")
+        self.rebuild()
+
+    def rebuild(self):
+        """Son engaged_index_size etkileşimi günlükten yeniden oku"""
+        with self._lock:
+            self._ids.clear()
+            for event in self.journal.tail(config.engagement.engaged_index_size, types=ENGAGED_EVENTS):
+                self._apply(event)
+            self._seq = self.journal.last_seq
+            self._mark_dirty()
+
+    # ------------------------------------------------------------------
+    # Güncelleme
+    # ------------------------------------------------------------------
+
+    def _add(self, tweet_id: str):
+        """ID ekle, sınırı aşarsa en eskiyi at (kilit altında çağrılır)"""
+        self._ids[str(tweet_id)] = None
+        self._ids.move_to_end(str(tweet_id))
+        while len(self._ids) > config.engagement.engaged_index_size:
+            self._ids.popitem(last=False)
+
+    def _apply(self, event: dict):
+        self._seq = max(self._seq, event.get("seq", 0))
+        if event.get("type") in ENGAGED_EVENTS and event.get("original_tweet_id"):
+            self._add(event["original_tweet_id"])
+
+    _snapshot_label = "Engaged index snapshot"
+
+    def _snapshot(self) -> str:
+        return json.dumps({"seq": self._seq, "ids": list(self._ids)})
+
+    # ------------------------------------------------------------------
+    # Sorgular
+    # ------------------------------------------------------------------
+
+    def __contains__(self, tweet_id) -> bool:
+        self.catch_up()
+        with self._lock:
+            return str(tweet_id) in self._ids
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids)
+
+
+# Süreç genelinde tek indeks
+engaged = EngagedIndex(journal)
@@ -0,0 +1,485 @@
+"""
+Event Journal - XPoster ve XEngagementManager için append-only olay günlüğü
+JSONL segmentler, segment rotasyonu ve arka planda sıkıştırma
+
+Her yazma tek satır ekler (O(1)); okumalar sondan geriye doğru yapılır
+ve ihtiyaç duyulan segmentte durur (tail-bounded). Scheduler, servis
+loop'u ve CLI aynı günlüğe yazar: yazma, rotasyon ve sıkıştırma
+journal.lock üzerinde flock altında yapılır, aktif segment ve son seq
+her yazmada diskten doğrulanır.
+"""
+import contextlib
+import fcntl
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+from loguru import logger
+
+from config import config, DATA_DIR
+from usage import local_now
+import pytz
+
+_SEGMENT_GLOB = "segment-*.jsonl"
+_LOCK_NAME = "journal.lock"
+_COMPACT_LOCK_NAME = "compact.lock"
+
+# Geriye okuma blok boyutu (bayt)
+_BLOCK_SIZE = 64 * 1024
+
+
+def _segment_name(number: int) -> str:
+    return f"segment-{number:06d}.jsonl"
+
+
+def _segment_number(path: Path) -> int:
+    return int(path.stem.split("-")[1])
+
+
+class EventJournal:
+    """
+    Append-only olay günlüğü
+
+    Olay: {"seq": int, "type": str, "ts": ISO (yerel TZ), ...payload}
+    Aktif segment segment_max_events satıra ulaşınca kapanır; kapalı
+    segmentler arka planda birleştirilir ve saklama süresi dışındaki
+    olaylar atılır.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_max_events: Optional[int] = None,
+        retention_days: Optional[int] = None
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_max_events = segment_max_events or config.journal.segment_max_events
+        self.retention_days = retention_days or config.journal.retention_days
+
+        self._lock = threading.RLock()
+        self._compacting = threading.Lock()
+        self._subscribers: List[Callable[[dict], None]] = []
+        # Süreçler arası kilit; iç içe kullanımda flock bir kez alınır
+        self._lock_file = open(self.directory / _LOCK_NAME, "a")
+        self._lock_depth = 0
+        self._handle = None
+        self._active_path: Optional[Path] = None
+        self._active_size = -1
+        self._active_count = 0
+        self._seq = 0
+        with self._locked():
+            self._sync_active()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Süreç içi (RLock) ve süreçler arası (flock) özel kilit"""
+        with self._lock:
+            if self._lock_depth == 0:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    # ------------------------------------------------------------------
+    # Segmentler
+    # ------------------------------------------------------------------
+
+    def _segments(self) -> List[Path]:
+        return sorted(self.directory.glob(_SEGMENT_GLOB), key=_segment_number)
+
+    def _sync_active(self):
+        """
+        Aktif segmenti, satır sayısını ve son seq'i diskten doğrula (kilit altında)
+
+        Son yazmadan beri dosya değişmediyse bellekteki değerler geçerlidir;
+        başka bir süreç yazdıysa ya da rotasyon yaptıysa segmentin ilk ve
+        son olayından yeniden türetilir (aktif segmentte seq'ler ardışık).
+        """
+        segments = self._segments()
+        active = segments[-1] if segments else self.directory / _segment_name(1)
+        try:
+            size = active.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if active == self._active_path and size == self._active_size:
+            return
+
+        last = next(self._read_segment_reverse(active), None)
+        if last is not None:
+            first = self._first_event(active) or last
+            self._seq = last.get("seq", 0)
+            self._active_count = self._seq - first.get("seq", self._seq) + 1
+        else:
+            self._seq = self._last_seq(segments[-2]) if len(segments) > 1 else 0
+            self._active_count = 0
+
+        if active != self._active_path:
+            if self._handle is not None:
+                self._handle.close()
+            self._handle = open(active, "a", encoding="utf-8")
+            self._active_path = active
+        self._active_size = size
+
+    @classmethod
+    def _first_event(cls, path: Path) -> Optional[dict]:
+        try:
+            with open(path, "rb") as handle:
+                for line in handle:
+                    event = cls._decode(line)
+                    if event is not None:
+                        return event
+        except FileNotFoundError:
+            pass
+        return None
+
+    @classmethod
+    def _last_seq(cls, path: Path) -> int:
+        last = next(cls._read_segment_reverse(path), None)
+        return last.get("seq", 0) if last else 0
+
+    def _rotate(self):
+        """Aktif segmenti kapat, yenisini aç, gerekirse sıkıştırmayı başlat"""
+        with self._locked():
+            self._handle.close()
+            number = _segment_number(self._active_path) + 1
+            self._active_path = self.directory / _segment_name(number)
+            # Dosya hemen oluşur; diğer süreçler sonraki yazmada yeni segmente geçer
+            self._handle = open(self._active_path, "a", encoding="utf-8")
+            self._active_size = 0
+            self._active_count = 0
+            closed = len(self._segments()) - 1
+
+        if closed >= config.journal.compact_after_segments:
+            threading.Thread(target=self.compact, name="journal-compact", daemon=True).start()
+
+    # ------------------------------------------------------------------
+    # Yazma
+    # ------------------------------------------------------------------
+
+    def subscribe(self, callback: Callable[[dict], None]):
+        """Her yeni olayda çağrılacak fonksiyon ekle"""
+        self._subscribers.append(callback)
+
+    def append(self, event_type: str, ts: Optional[str] = None, **payload) -> dict:
+        """Olay ekle (tek satır yazma, seq süreçler arasında tekil)"""
+        with self._locked():
+            self._sync_active()
+            self._seq += 1
+            event = {"seq": self._seq, "type": event_type, "ts": ts or local_now().isoformat(), **payload}
+            self._handle.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self._handle.flush()
+            self._active_size = os.fstat(self._handle.fileno()).st_size
+            self._active_count += 1
+            if self._active_count >= self.segment_max_events:
+                self._rotate()
+
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Journal subscriber error: {e}")
+        return event
+
+    # ------------------------------------------------------------------
+    # Okuma
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _read_segment(path: Path) -> List[dict]:
+        events = []
+        try:
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            # Sıkıştırma sırasında silinmiş olabilir
+            return events
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Yarım yazılmış son satır (çökme) atlanır
+                continue
+        return events
+
+    @staticmethod
+    def _decode(line: bytes) -> Optional[dict]:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line.decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # Yarım yazılmış son satır (çökme) atlanır
+            return None
+
+    @classmethod
+    def _read_segment_reverse(cls, path: Path) -> Iterator[dict]:
+        """
+        Segment olayları sondan başa
+
+        Dosya sondan bloklar halinde okunur; tüketici durunca (limit,
+        tarih sınırı) segmentin geri kalanı hiç okunmaz.
+        """
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            # Sıkıştırma sırasında silinmiş olabilir
+            return
+        with handle:
+            position = handle.seek(0, os.SEEK_END)
+            remainder = b""
+            while position > 0:
+                size = min(_BLOCK_SIZE, position)
+                position -= size
+                handle.seek(position)
+                lines = (handle.read(size) + remainder).split(b"\n")
+                # İlk parça önceki blokta devam ediyor olabilir
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    event = cls._decode(line)
+                    if event is not None:
+                        yield event
+            event = cls._decode(remainder)
+            if event is not None:
+                yield event
+
+    def _reverse_events(self) -> Iterator[dict]:
+        """En yeniden en eskiye olaylar (segment segment, bloklar halinde)"""
+        with self._lock:
+            self._handle.flush()
+            segments = self._segments()
+        for path in reversed(segments):
+            yield from self._read_segment_reverse(path)
+
+    def tail(self, limit: int, types: Optional[Iterable[str]] = None) -> List[dict]:
+        """Son limit olay (eskiden yeniye sıralı)"""
+        wanted = set(types) if types else None
+        result = []
+        for event in self._reverse_events():
+            if wanted is None or event.get("type") in wanted:
+                result.append(event)
+                if len(result) >= limit:
+                    break
+        result.reverse()
+        return result
+
+    def since(self, ts_prefix: str, types: Optional[Iterable[str]] = None) -> List[dict]:
+        """
+        ts >= ts_prefix olan olaylar (ör. bugünün tarihi 'YYYY-MM-DD')
+
+        Geriye doğru okunur, daha eski bir olaya gelince durur.
+        """
+        wanted = set(types) if types else None
+        result = []
+        for event in self._reverse_events():
+            if event.get("ts", "")[:len(ts_prefix)] < ts_prefix:
+                break
+            if wanted is None or event.get("type") in wanted:
+                result.append(event)
+        result.reverse()
+        return result
+
+    def after(self, seq: int) -> List[dict]:
+        """seq'ten sonra eklenen olaylar (geriye doğru okunur)"""
+        result = []
+        for event in self._reverse_events():
+            if event.get("seq", 0) <= seq:
+                break
+            result.append(event)
+        result.reverse()
+        return result
+
+    def iter_events(self, types: Optional[Iterable[str]] = None) -> Iterator[dict]:
+        """Tüm olaylar, eskiden yeniye (yeniden oluşturma/backfill için)"""
+        wanted = set(types) if types else None
+        with self._lock:
+            self._handle.flush()
+            segments = self._segments()
+        for path in segments:
+            for event in self._read_segment(path):
+                if wanted is None or event.get("type") in wanted:
+                    yield event
+
+    def is_empty(self) -> bool:
+        return self.last_seq == 0
+
+    @property
+    def last_seq(self) -> int:
+        """Son eklenen olayın sıra numarası (diğer süreçlerin yazmaları dahil)"""
+        with self._locked():
+            self._sync_active()
+            return self._seq
+
+    # ------------------------------------------------------------------
+    # Sıkıştırma
+    # ------------------------------------------------------------------
+
+    def compact(self):
+        """
+        Kapalı segmentleri birleştir, saklama süresi dışındaki olayları at
+
+        Kapalı segmentler değişmez; birleştirme kilitsiz yapılır, sadece
+        dosya değişimi günlük kilidi altında. Aynı anda tek süreç sıkıştırır
+        (compact.lock).
+        """
+        if not self._compacting.acquire(blocking=False):
+            return
+        compact_lock = open(self.directory / _COMPACT_LOCK_NAME, "a")
+        try:
+            try:
+                fcntl.flock(compact_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Başka bir süreç sıkıştırıyor
+                return
+            with self._locked():
+                self._sync_active()
+                closed = [p for p in self._segments() if p != self._active_path]
+            if not closed:
+                return
+
+            cutoff = (local_now() - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+            kept = [
+                event
+                for path in closed
+                for event in self._read_segment(path)
+                if event.get("ts", "")[:10] >= cutoff
+            ]
+
+            # Birleşmiş segmentleri en eski numaralardan başlayarak yaz
+            chunks = [kept[i:i + self.segment_max_events] for i in range(0, len(kept), self.segment_max_events)]
+            numbers = [_segment_number(p) for p in closed]
+            staged = []
+            for number, chunk in zip(numbers, chunks):
+                tmp = self.directory / f"{_segment_name(number)}.tmp"
+                tmp.write_text("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in chunk), encoding="utf-8")
+                staged.append((tmp, self.directory / _segment_name(number)))
+
+            with self._locked():
+                for tmp, target in staged:
+                    tmp.replace(target)
+                for path in closed[len(staged):]:
+                    path.unlink(missing_ok=True)
+
+            logger.debug(f"Journal compacted: {len(closed)} -> {len(staged)} segments, {len(kept)} events kept")
+        except Exception as e:
+            logger.error(f"Journal compaction failed: {e}")
+        finally:
+            compact_lock.close()
+            self._compacting.release()
+
+
+class JournalFollower:
+    """
+    Günlükten türetilen görünüm (karma sınıf)
+
+    Abonelik sadece bu sürecin olaylarını getirir; scheduler, servis
+    loop'u ve CLI aynı günlüğe yazar. catch_up() diskteki son seq'e bakar
+    ve aradaki olayları sırayla uygular. Alt sınıf self.journal,
+    self._lock, self._seq, _apply(event) ve _mark_dirty() sağlar; her olay
+    bir kez uygulanır.
+    """
+
+    def _follow(self, event: dict):
+        """Abone: sıradaki olaysa uygula, arada başka sürecin olayı varsa diskten oku"""
+        seq = event.get("seq", 0)
+        with self._lock:
+            if seq == self._seq + 1:
+                self._apply(event)
+                self._seq = seq
+                self._mark_dirty()
+            elif seq > self._seq:
+                self._replay()
+
+    def catch_up(self):
+        """Diğer süreçlerin yazdığı olayları uygula (sorgudan önce çağrılır)"""
+        if self.journal.last_seq == self._seq:
+            return
+        with self._lock:
+            self._replay()
+
+    def _replay(self):
+        """self._seq'ten sonraki olayları uygula (kilit altında çağrılır)"""
+        applied = 0
+        for event in self.journal.after(self._seq):
+            seq = event.get("seq", 0)
+            if seq <= self._seq:
+                continue
+            self._apply(event)
+            self._seq = seq
+            applied += 1
+        if applied:
+            self._mark_dirty()
+
+
+def _normalize_ts(value: str) -> str:
+    """Eski naive ISO zamanı yapılandırılmış TZ'ye taşı"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return local_now().isoformat()
+    if parsed.tzinfo is None:
+        parsed = pytz.timezone(config.schedule.timezone).localize(parsed)
+    return parsed.isoformat()
+
+
+def migrate_legacy_history(journal: EventJournal):
+    """
+    tweet_history.json ve engagement_history.json'u günlüğe aktar
+
+    İki dosya birlikte zaman sırasına dizilip eklenir; aktarılan dosya
+    .migrated uzantısıyla saklanır, böylece işlem bir kez yapılır.
+    """
+    tweet_file = DATA_DIR / "tweet_history.json"
+    engagement_file = DATA_DIR / "engagement_history.json"
+    events = []
+    migrated = []
+
+    if tweet_file.exists():
+        try:
+            history = json.loads(tweet_file.read_text())
+            for tweet in history.get("tweets", []):
+                payload = {k: v for k, v in tweet.items() if k != "posted_at"}
+                events.append(("tweet", _normalize_ts(tweet.get("posted_at", "")), payload))
+
+            # Thread'ler tweets listesine yazılmıyordu; bugünkü farkı koru
+            today = local_now().strftime("%Y-%m-%d")
+            today_tweets = sum(1 for e in events if e[1].startswith(today))
+            for _ in range(history.get("daily_count", {}).get(today, 0) - today_tweets):
+                events.append(("thread", f"{today}T00:00:00{local_now().strftime('%z')[:3]}:00", {"legacy": True}))
+            migrated.append(tweet_file)
+        except Exception as e:
+            logger.error(f"tweet_history.json could not be migrated: {e}")
+
+    if engagement_file.exists():
+        try:
+            history = json.loads(engagement_file.read_text())
+            for key, event_type in (("quotes", "quote"), ("replies", "reply"), ("mentions", "mention")):
+                for item in history.get(key, []):
+                    payload = {k: v for k, v in item.items() if k != "created_at"}
+                    events.append((event_type, _normalize_ts(item.get("created_at", "")), payload))
+            migrated.append(engagement_file)
+        except Exception as e:
+            logger.error(f"engagement_history.json could not be migrated: {e}")
+
+    if not migrated:
+        return
+
+    events.sort(key=lambda e: e[1])
+    for event_type, ts, payload in events:
+        journal.append(event_type, ts=ts, **payload)
+
+    for path in migrated:
+        path.replace(path.with_suffix(".json.migrated"))
+    logger.info(f"Migrated {len(events)} history events into the journal")
+
+
+# Süreç genelinde paylaşılan günlük (tweet, thread, quote, reply, mention)
+journal = EventJournal(DATA_DIR / "journal")
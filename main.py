@@ -5,15 +5,25 @@ Reddit → X Automation - Hurricane Stratejisi ile Ana Orkestrasyon
 """
 import sys
 import argparse
+import asyncio
+import contextlib
+import functools
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, Optional
 from loguru import logger
 
+from candidate_pool import candidates as candidate_pool
 from config import config, LOGS_DIR
-from reddit_scraper import RedditScraper
-from tweet_generator import TweetGenerator
+from model_router import telemetry as model_telemetry
+from outbox import outbox, process_next, recover, PENDING as OUTBOX_PENDING
+from rate_limits import rate_limits, DEFER as RATE_LIMIT_DEFER
+from resilience import breakers, cycle_deadline, DeadlineExceeded
+from rollups import rollups, summarize, ACTIONS
+from usage import budget, ledger, BUDGET_DEFER, BUDGET_DEGRADE
+from services import services
 from x_poster import XPoster
-from x_engagement import XEngagementManager
+from x_client import TWEET_ENDPOINT
 
 
 def setup_logging(level: str = "INFO"):
@@ -38,7 +48,72 @@ def setup_logging(level: str = "INFO"):
     )
 
 
-def run_engagement(
+# İş türü başına eşzamanlı döngü sınırı (ENGAGEMENT_WORKERS / ORIGINAL_WORKERS)
+_cycle_limits: Dict[str, asyncio.Semaphore] = {}
+# Aday havuzu yenilemesi tek seferde bir kez
+_refresh_lock: Optional[asyncio.Lock] = None
+# Outbox kurtarması sırayla (ORIGINAL_WORKERS > 1 iken döngüler yarışmasın)
+_recover_lock: Optional[asyncio.Lock] = None
+
+
+def _cycle_limit(kind: Optional[str]):
+    if kind is None:
+        return contextlib.nullcontext()
+    if kind not in _cycle_limits:
+        workers = config.schedule.original_workers if kind == "original" else config.schedule.engagement_workers
+        _cycle_limits[kind] = asyncio.Semaphore(workers)
+    return _cycle_limits[kind]
+
+
+def _bounded_cycle(label: str, kind: Optional[str] = None, timeout: bool = True):
+    """
+    Async döngüyü CYCLE_TIMEOUT_MINUTES son tarihiyle çalıştır
+
+    Son tarih scraper, OpenAI ve X çağrılarına yayılır; süre dolunca
+    döngü yeni istek göndermeden False ile biter. kind verilirse aynı
+    türden en fazla *_WORKERS döngü birlikte çalışır. timeout=False ise
+    son tarih iç döngülere bırakılır (her biri kendi süresiyle çalışır).
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            async with _cycle_limit(kind):
+                seconds = config.schedule.cycle_timeout_minutes * 60 if timeout else None
+                with cycle_deadline(seconds):
+                    try:
+                        return await fn(*args, **kwargs)
+                    except DeadlineExceeded as e:
+                        logger.warning(f"{label} cycle aborted at deadline: {e}")
+                        return False
+        return wrapper
+    return decorator
+
+
+async def arefresh_candidates(force: bool = True) -> int:
+    """
+    Aday havuzunu yenile (X okumaları thread'de, loop bloklanmaz)
+
+    Args:
+        force: False ise havuz tazeyken dokunma
+
+    Returns:
+        Havuzdaki aday sayısı; başka bir yenileme sürüyorsa -1
+    """
+    global _refresh_lock
+    if _refresh_lock is None:
+        _refresh_lock = asyncio.Lock()
+    if _refresh_lock.locked() or not (force or candidate_pool.is_stale()):
+        return -1
+    async with _refresh_lock:
+        try:
+            return await asyncio.to_thread(services.engagement.refresh_candidate_pool)
+        except Exception as e:
+            logger.error(f"Candidate pool refresh failed: {e}")
+            return -1
+
+
+@_bounded_cycle("Engagement", kind="engagement")
+async def arun_engagement(
     language: str = "tr",
     dry_run: bool = False
 ):
@@ -54,16 +129,28 @@ def run_engagement(
     logger.info(f"Dry Run: {dry_run}")
     logger.info(f"{'='*50}")
     
-    engagement = XEngagementManager()
-    generator = TweetGenerator()
+    # Bütçe kontrolü - dolmuşsa ertele, hata verme
+    if budget.check("openai_tokens", "openai_requests", "x_reads", "x_writes") == BUDGET_DEFER:
+        logger.warning("Günlük bütçe doldu, engagement sonraki slota erteleniyor")
+        return False
     
+    # Rate limit - yazma hakkı reset'ten önce dönmeyecekse ertele
+    decision, reset_in = rate_limits.decide(TWEET_ENDPOINT)
+    if decision == RATE_LIMIT_DEFER and not dry_run:
+        logger.warning(f"X yazma limiti dolu ({reset_in:.0f}s sonra sıfırlanır), engagement erteleniyor")
+        return False
+    
+    engagement = services.engagement
+    generator = services.generator
+    
+    # Günlük/kota okumaları dosyaya inebilir; loop bloklanmasın
     # 24 saat kuralı kontrolü
-    is_urgent, hours_since = engagement.check_24h_rule()
+    is_urgent, hours_since = await asyncio.to_thread(engagement.check_24h_rule)
     if is_urgent:
         logger.warning(f"⚠️ ACİL: {hours_since:.1f} saat aktivite yok! Hemen aksiyon alınmalı!")
     
     # Günlük istatistikler
-    stats = engagement.get_daily_engagement_stats()
+    stats = await asyncio.to_thread(engagement.get_daily_engagement_stats)
     logger.info(f"Bugünkü engagement: {stats['total']} (Quote: {stats['quotes']}, Reply: {stats['replies']}, Mention: {stats['mentions']})")
     
     # Hangi aksiyon türü?
@@ -73,57 +160,84 @@ def run_engagement(
     if action_type == "original":
         # Orijinal post modu - mevcut akışı kullan
         logger.info("Orijinal post moduna geçiliyor...")
-        return run_automation(language, dry_run, thread_mode=False)
+        return await arun_automation(language, dry_run, thread_mode=False)
+    
+    # Eksik/eski hedef hesap ID'lerini toplu çöz (taze ise ağ çağrısı yok)
+    await asyncio.to_thread(engagement.refresh_target_accounts)
     
     # Engagement modu - hedef hesap seç
-    target = engagement.select_target_for_engagement()
+    target = await asyncio.to_thread(engagement.select_target_for_engagement)
     
     if not target:
-        logger.warning("Hedef hesap bulunamadı! Önce hedef hesap ekleyin:")
-        logger.info("python main.py --add-target <username>")
+        if not len(engagement.target_scheduler):
+            logger.warning("Hedef hesap bulunamadı! Önce hedef hesap ekleyin:")
+            logger.info("python main.py --add-target <username>")
         return False
     
     username = target["username"]
     logger.info(f"Hedef hesap: @{username}")
     
-    # Hesabın son tweetlerini al
-    tweets = engagement.get_user_recent_tweets(username, count=5)
-    
-    if not tweets:
-        logger.warning(f"@{username} için tweet bulunamadı")
-        return False
-    
-    # En uygun tweeti seç (en yeni ve etkileşimli)
-    selected_tweet = tweets[0]
+    # Önceden puanlanmış havuzdan seç (hedef sırası adayı olan hesabı verir)
+    candidate = await asyncio.to_thread(engagement.select_candidate, username)
+    if candidate:
+        selected_tweet = candidate.as_tweet()
+        logger.info(f"Havuzdan aday: {candidate.tweet_id} (puan {candidate.score:.2f})")
+    else:
+        # Havuz boş (ör. yenileme işi henüz çalışmadı) - canlı çek
+        recent = await asyncio.to_thread(
+            engagement.get_user_recent_tweets, username, count=config.engagement.timeline_window
+        )
+        tweets = [t for t in recent if not engagement.has_engaged(t["id"])]
+        if not tweets:
+            logger.warning(f"@{username} için etkileşim yapılmamış tweet bulunamadı")
+            return False
+        selected_tweet = tweets[0]
     logger.info(f"Seçilen tweet: {selected_tweet['text'][:50]}...")
     
+    # Havuz eskiyse üretim ve paylaşım sürerken arka planda yenilenir
+    prefetch = asyncio.create_task(arefresh_candidates(force=False))
+    try:
+        return await _engage(engagement, generator, action_type, username, selected_tweet, language, dry_run)
+    finally:
+        await prefetch
+
+
+async def _engage(engagement, generator, action_type: str, username: str, selected_tweet: dict,
+                  language: str, dry_run: bool) -> bool:
+    """Seçilen tweet için yorum üret ve paylaş"""
     if action_type == "quote":
         # Quote tweet
-        comment = generator.generate_quote_comment(selected_tweet["text"], language)
+        comment = await generator.agenerate_quote_comment(selected_tweet["text"], language)
         if comment:
-            result = engagement.quote_tweet(selected_tweet["id"], comment, dry_run=dry_run)
+            result = await asyncio.to_thread(
+                engagement.quote_tweet, selected_tweet["id"], comment, dry_run=dry_run, language=language
+            )
             if result:
-                engagement.increment_engagement_count(username)
+                await asyncio.to_thread(engagement.increment_engagement_count, username)
                 logger.success(f"Quote tweet başarılı! ID: {result}")
                 return True
     
     elif action_type == "reply":
         # Reply
-        reply = generator.generate_reply(selected_tweet["text"], language)
+        reply = await generator.agenerate_reply(selected_tweet["text"], language)
         if reply:
-            result = engagement.reply_to_tweet(selected_tweet["id"], reply, dry_run=dry_run)
+            result = await asyncio.to_thread(
+                engagement.reply_to_tweet, selected_tweet["id"], reply, dry_run=dry_run, language=language
+            )
             if result:
-                engagement.increment_engagement_count(username)
+                await asyncio.to_thread(engagement.increment_engagement_count, username)
                 logger.success(f"Reply başarılı! ID: {result}")
                 return True
     
     elif action_type == "mention":
         # Direct mention
-        mention_text = generator.generate_reply(selected_tweet["text"], language)
+        mention_text = await generator.agenerate_reply(selected_tweet["text"], language)
         if mention_text:
-            result = engagement.mention_user(username, mention_text, dry_run=dry_run)
+            result = await asyncio.to_thread(
+                engagement.mention_user, username, mention_text, dry_run=dry_run, language=language
+            )
             if result:
-                engagement.increment_engagement_count(username)
+                await asyncio.to_thread(engagement.increment_engagement_count, username)
                 logger.success(f"Mention başarılı! ID: {result}")
                 return True
     
@@ -131,7 +245,71 @@ def run_engagement(
     return False
 
 
-def run_automation(
+@_bounded_cycle("Hurricane")
+async def arun_hurricane_cycle(language: str = "tr", dry_run: bool = False):
+    """
+    Hurricane döngüsü - aksiyon türünü otomatik seç
+    
+    %90 engagement, %10 orijinal; 24 saat kuralı aktifse engagement.
+    Ayaklar kendi türlerinin sınırıyla çalışır: orijinal ayak
+    ORIGINAL_WORKERS semaforunu alır, outbox kurtarması sıralıdır.
+    """
+    logger.info(f"🌀 Hurricane cycle başladı ({language.upper()})")
+    engagement = services.engagement
+    
+    # 24 saat kuralı kontrolü
+    is_urgent, hours = await asyncio.to_thread(engagement.check_24h_rule)
+    
+    if is_urgent:
+        logger.warning(f"⚠️ 24 saat kuralı aktif! Acil aksiyon alınıyor...")
+        # Acil durumda engagement yap
+        return await arun_engagement(language=language, dry_run=dry_run)
+    
+    # Normal akış - rastgele karar
+    action_type = engagement.decide_action_type()
+    logger.info(f"Seçilen aksiyon: {action_type}")
+    
+    if action_type == "original":
+        return await arun_automation(language=language, dry_run=dry_run)
+    return await arun_engagement(language=language, dry_run=dry_run)
+
+
+@_bounded_cycle("Combined", timeout=False)
+async def arun_combined_cycle(actions: list, dry_run: bool = False):
+    """
+    Çakışan slotların birleşik döngüsü (slot_planner)
+
+    Aksiyonlar sırayla ve aynı sıcak istemcilerle çalışır; aynı anda OpenAI,
+    X kotası ve JSON dosyaları için yarışmazlar. Ortak son tarih yok: her
+    ayak kendi CYCLE_TIMEOUT_MINUTES bütçesiyle çalışır. Engagement
+    ayağının aday havuzu orijinal post üretilirken hazırlanır.
+
+    Args:
+        actions: [{"kind": "original" | "engagement", "language": "tr"}, ...]
+    """
+    logger.info(f"🔀 Combined cycle: {', '.join(a['kind'] + '/' + a['language'] for a in actions)}")
+    prefetch = None
+    if any(a["kind"] == "engagement" for a in actions):
+        prefetch = asyncio.create_task(arefresh_candidates(force=False))
+    
+    results = []
+    try:
+        for action in actions:
+            if action["kind"] == "original":
+                result = await arun_automation(language=action["language"], dry_run=dry_run)
+            else:
+                if prefetch is not None:
+                    await prefetch
+                result = await arun_engagement(language=action["language"], dry_run=dry_run)
+            results.append(bool(result))
+    finally:
+        if prefetch is not None:
+            await prefetch
+    return any(results)
+
+
+@_bounded_cycle("Automation", kind="original")
+async def arun_automation(
     language: str = "tr",
     dry_run: bool = False,
     thread_mode: bool = False
@@ -151,24 +329,51 @@ def run_automation(
     logger.info(f"Thread Mode: {thread_mode}")
     logger.info(f"{'='*50}")
     
-    # Bileşenleri oluştur
-    scraper = RedditScraper()
-    generator = TweetGenerator()
-    poster = XPoster()
+    # Süreç genelinde sıcak bileşenler (ilk döngüde kurulur)
+    scraper = services.scraper
+    generator = services.generator
+    poster = services.poster
     
     # Limit kontrolü
-    can_post, reason = poster.can_post()
+    can_post, reason = await asyncio.to_thread(poster.can_post)
     if not can_post and not dry_run:
         logger.warning(f"Skipping: {reason}")
         return False
     
+    # Bütçe kontrolü - dolmuşsa ertele, yaklaşıyorsa hafiflet
+    decision = budget.check("openai_tokens", "openai_requests", "x_writes")
+    if decision == BUDGET_DEFER:
+        logger.warning("Daily budget exhausted, deferring original post to a later slot")
+        return False
+    
+    # Rate limit - yazma hakkı reset'ten önce dönmeyecekse üretim yapmadan ertele
+    rate_decision, reset_in = rate_limits.decide(TWEET_ENDPOINT)
+    if rate_decision == RATE_LIMIT_DEFER and not dry_run:
+        logger.warning(f"X write limit exhausted (resets in {reset_in:.0f}s), deferring to a later slot")
+        return False
+    
+    variant_count = None
+    if decision == BUDGET_DEGRADE:
+        logger.warning("Daily budget nearly exhausted, degrading to a single-variant tweet")
+        thread_mode = False
+        variant_count = 1
+    
     # Mevcut istatistikler
-    stats = poster.get_stats()
+    stats = await asyncio.to_thread(poster.get_stats)
     logger.info(f"Today's tweets: {stats['today_count']}/{stats['daily_limit']}")
     
-    # Reddit'ten popüler post al
+    # Reddit'ten popüler post al; outbox kurtarması (X) ile aynı anda
     logger.info("Fetching top Reddit post...")
-    post = scraper.get_top_post()
+    fetch = asyncio.to_thread(scraper.get_top_post)
+    
+    # Outbox: çökmeden kalanları çöz, bekleyen öğe varsa yeni üretim yapma
+    if not dry_run:
+        _, post = await asyncio.gather(_arecover(poster), fetch)
+        if (await asyncio.to_thread(outbox.counts))[OUTBOX_PENDING]:
+            logger.info("Posting pending outbox item before generating new content")
+            return await _drain_outbox(poster)
+    else:
+        post = await fetch
     
     if not post:
         logger.warning("No suitable posts found")
@@ -180,7 +385,7 @@ def run_automation(
     if thread_mode:
         # Thread oluştur
         logger.info("Generating thread...")
-        tweets = generator.generate_thread(post, language, tweet_count=5)
+        tweets = await asyncio.to_thread(generator.generate_thread, post, language, tweet_count=5)
         
         if not tweets:
             logger.error("Failed to generate thread")
@@ -188,18 +393,20 @@ def run_automation(
         
         logger.info(f"Generated {len(tweets)} tweets for thread")
         
-        # Thread paylaş
-        tweet_ids = poster.post_thread(tweets, language, dry_run=dry_run)
+        if dry_run:
+            tweet_ids = await asyncio.to_thread(poster.post_thread, tweets, language, dry_run=True)
+            return bool(tweet_ids)
         
-        if tweet_ids:
-            logger.success(f"Thread posted! First tweet ID: {tweet_ids[0]}")
-            if not dry_run:
-                scraper.mark_as_posted(post.id)
-            return True
+        item, created = await asyncio.to_thread(outbox.enqueue, "thread", tweets, language, reddit_post_id=post.id)
     else:
         # Tek tweet oluştur
         logger.info("Generating tweet...")
-        tweet_text = generator.generate_tweet(post, language)
+        tweet_text = await generator.agenerate_tweet(
+            post,
+            language,
+            recent_texts=await asyncio.to_thread(poster.get_recent_texts),
+            n=variant_count
+        )
         
         if not tweet_text:
             logger.error("Failed to generate tweet")
@@ -208,24 +415,67 @@ def run_automation(
         logger.info(f"Generated tweet ({len(tweet_text)} chars)")
         logger.debug(f"Tweet: {tweet_text}")
         
-        # Tweet paylaş
-        tweet_id = poster.post_tweet(
-            tweet_text, 
-            language, 
-            reddit_post_id=post.id,
-            dry_run=dry_run
-        )
+        if dry_run:
+            tweet_id = await asyncio.to_thread(
+                poster.post_tweet, tweet_text, language, reddit_post_id=post.id, dry_run=True
+            )
+            return tweet_id is not None
         
-        if tweet_id:
-            logger.success(f"Tweet posted! ID: {tweet_id}")
-            if not dry_run:
-                scraper.mark_as_posted(post.id)
-            return True
+        item, created = await asyncio.to_thread(outbox.enqueue, "tweet", [tweet_text], language, reddit_post_id=post.id)
+    
+    if not created:
+        # Aynı anahtar zaten kuyrukta: işaretleme ve sayım ilk seferde yapıldı
+        if item.state != OUTBOX_PENDING:
+            logger.info(f"Reddit post {post.id} already {item.state} in outbox, skipping")
+            return False
+    else:
+        # Outbox'a yazıldı: post bir daha seçilmesin, paylaşım kuyruktan yapılır
+        await asyncio.to_thread(scraper.mark_as_posted, post.id)
+    return await _drain_outbox(poster)
+
+
+async def _arecover(poster: XPoster) -> int:
+    """Outbox kurtarması (thread'de, aynı anda tek döngü)"""
+    global _recover_lock
+    if _recover_lock is None:
+        _recover_lock = asyncio.Lock()
+    async with _recover_lock:
+        return await asyncio.to_thread(recover, outbox, poster)
+
+
+async def _drain_outbox(poster: XPoster) -> bool:
+    """Outbox'taki sıradaki öğeyi paylaş"""
+    item = await asyncio.to_thread(process_next, outbox, poster)
+    if item:
+        logger.success(f"{item.kind.capitalize()} posted! First tweet ID: {item.tweet_ids[0]}")
+        return True
     
     logger.error("Failed to post")
     return False
 
 
+# Senkron sarmalayıcılar (CLI, --run-now) - süreç event loop'unda çalışır
+
+def run_engagement(language: str = "tr", dry_run: bool = False):
+    """arun_engagement'ın senkron sarmalayıcısı"""
+    return services.run(arun_engagement(language=language, dry_run=dry_run))
+
+
+def run_hurricane_cycle(language: str = "tr", dry_run: bool = False):
+    """arun_hurricane_cycle'ın senkron sarmalayıcısı"""
+    return services.run(arun_hurricane_cycle(language=language, dry_run=dry_run))
+
+
+def run_combined_cycle(actions: list, dry_run: bool = False):
+    """arun_combined_cycle'ın senkron sarmalayıcısı"""
+    return services.run(arun_combined_cycle(actions, dry_run=dry_run))
+
+
+def run_automation(language: str = "tr", dry_run: bool = False, thread_mode: bool = False):
+    """arun_automation'ın senkron sarmalayıcısı"""
+    return services.run(arun_automation(language=language, dry_run=dry_run, thread_mode=thread_mode))
+
+
 def main():
     """CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -245,6 +495,7 @@ def main():
   python main.py --add-target elonmusk       # Hedef hesap ekle
   python main.py --check-24h                 # 24 saat kuralı kontrolü
   python main.py --stats                     # İstatistikleri göster
+  python main.py --backfill-stats            # İstatistik özetlerini yeniden kur
         """
     )
     
@@ -279,6 +530,12 @@ def main():
         help="İstatistikleri göster ve çık"
     )
     
+    parser.add_argument(
+        "--backfill-stats",
+        action="store_true",
+        help="İstatistik özetlerini olay geçmişinden yeniden kur"
+    )
+    
     parser.add_argument(
         "--add-target",
         metavar="USERNAME",
@@ -291,6 +548,18 @@ def main():
         help="Hedef hesapları listele"
     )
     
+    parser.add_argument(
+        "--refresh-targets",
+        action="store_true",
+        help="Hedef hesap ID'lerini toplu yenile (handle değişikliklerini bul)"
+    )
+    
+    parser.add_argument(
+        "--refresh-candidates",
+        action="store_true",
+        help="Engagement aday havuzunu yeniden kur (cron için)"
+    )
+    
     parser.add_argument(
         "--check-24h",
         action="store_true",
@@ -309,16 +578,23 @@ def main():
     log_level = "DEBUG" if args.verbose else config.log_level
     setup_logging(log_level)
     
+    # İstatistik özetlerini yeniden kur
+    if args.backfill_stats:
+        count = rollups.backfill()
+        rollups.flush()
+        print(f"✅ İstatistik özetleri yeniden kuruldu ({count} olay, {len(rollups.daily)} gün)")
+        return
+    
     # Hedef hesap ekleme
     if args.add_target:
-        engagement = XEngagementManager()
+        engagement = services.engagement
         engagement.add_target_account(args.add_target)
         print(f"✅ Hedef hesap eklendi: @{args.add_target}")
         return
     
     # Hedef hesapları listeleme
     if args.list_targets:
-        engagement = XEngagementManager()
+        engagement = services.engagement
         targets = engagement.load_target_accounts()
         
         print("\n🎯 Hedef Hesaplar")
@@ -328,13 +604,34 @@ def main():
             print("Eklemek için: python main.py --add-target <username>")
         else:
             for t in targets:
-                print(f"• @{t['username']} ({t.get('category', 'general')})")
+                print(f"• @{t['username']} ({t.get('category', 'general')}, id: {t.get('user_id') or '?'})")
                 print(f"  Engagement: {t.get('engagement_count', 0)}")
+                next_at = engagement.target_scheduler.next_eligible(t["username"])
+                if next_at and next_at > datetime.now().timestamp():
+                    print(f"  Sonraki uygun: {datetime.fromtimestamp(next_at).strftime('%Y-%m-%d %H:%M')}")
+                if t.get("previous_usernames"):
+                    print(f"  Önceki: {', '.join('@' + u for u in t['previous_usernames'])}")
+        return
+    
+    # Hedef hesap ID'lerini yenile
+    if args.refresh_targets:
+        engagement = services.engagement
+        changes = engagement.refresh_target_accounts(force=True)
+        print(f"✅ Hedef hesaplar yenilendi ({len(changes)} handle değişikliği)")
+        for user_id, old, new in changes:
+            print(f"• @{old} -> @{new} ({user_id})")
+        return
+    
+    # Aday havuzunu yenile
+    if args.refresh_candidates:
+        engagement = services.engagement
+        count = engagement.refresh_candidate_pool()
+        print(f"✅ Aday havuzu yenilendi ({count} aday)")
         return
     
     # 24 saat kuralı kontrolü
     if args.check_24h:
-        engagement = XEngagementManager()
+        engagement = services.engagement
         is_urgent, hours = engagement.check_24h_rule()
         
         print("\n⏰ 24 Saat Kuralı Kontrolü")
@@ -343,14 +640,14 @@ def main():
         if is_urgent:
             print("⚠️ ACİL: 24 saat kuralı! Hemen etkileşim yapmalısınız!")
         else:
-            remaining = config.engagement.max_silence_hours - hours
-            print(f"✅ OK. Kalan süre: {remaining:.1f} saat")
+            deadline = engagement.activity.deadline()
+            print(f"✅ OK. Son tarih: {deadline.strftime('%Y-%m-%d %H:%M')}")
         return
     
     # İstatistikler modu
     if args.stats:
-        poster = XPoster()
-        engagement = XEngagementManager()
+        poster = services.poster
+        engagement = services.engagement
         
         tweet_stats = poster.get_stats()
         engagement_stats = engagement.get_daily_engagement_stats()
@@ -368,11 +665,76 @@ def main():
         print(f"Mention: {engagement_stats['mentions']}/{engagement_stats['mention_target']}")
         print(f"Toplam: {engagement_stats['total']}")
         
+        # Kayan pencereler (materialized özetlerden)
+        print("\n📈 Son 7 / 30 Gün")
+        print("=" * 40)
+        week, month = rollups.window(7), rollups.window(30)
+        week_totals, month_totals = summarize(week), summarize(month)
+        for action in ACTIONS:
+            print(f"{action}: {week_totals.get(action, 0)} / {month_totals.get(action, 0)}")
+        for language in sorted(month):
+            print(f"  [{language}] {sum(week.get(language, {}).values())} / {sum(month[language].values())}")
+        
         # 24 saat kontrolü
         is_urgent, hours = engagement.check_24h_rule()
         print(f"\n⏰ Son aktivite: {hours:.1f} saat önce")
         if is_urgent:
             print("⚠️ ACİL: 24 saat kuralı!")
+        
+        # Günlük kullanım ve bütçe
+        print("\n💳 Günlük Kullanım")
+        print("=" * 40)
+        for resource, r in budget.report().items():
+            limit = r["limit"] if r["limit"] > 0 else "∞"
+            print(f"{resource}: {r['used']}/{limit}")
+        
+        day = ledger.day()
+        for task, c in day["openai"].items():
+            avg = c["latency_total"] / c["requests"] if c["requests"] else 0
+            print(f"  openai {task}: {c['requests']} istek, "
+                  f"{c['prompt_tokens'] + c['completion_tokens']} token, ort. {avg:.1f}s")
+        for endpoint, c in day["x"].items():
+            avg = c["latency_total"] / c["requests"] if c["requests"] else 0
+            print(f"  x {endpoint}: {c['requests']} istek, {c['errors']} hata, ort. {avg:.2f}s")
+        
+        # Outbox durumu
+        counts = outbox.counts()
+        print("\n📮 Outbox")
+        print("=" * 40)
+        print(" | ".join(f"{state}: {n}" for state, n in counts.items()))
+        
+        # Engagement aday havuzu
+        print("\n🎯 Aday Havuzu")
+        print("=" * 40)
+        print(f"{len(candidate_pool)} aday, son kurulum: {candidate_pool.built_at or '-'}")
+        
+        # X rate limit payı
+        headroom = rate_limits.headroom()
+        if headroom:
+            print("\n🚦 X Rate Limit")
+            print("=" * 40)
+            for endpoint, h in headroom.items():
+                reset = f", {h['reset_in']:.0f}s sonra sıfırlanır" if h["reset_in"] > 0 else ""
+                print(f"{endpoint}: {h['remaining']}/{h['limit']}{reset}")
+        
+        # Circuit breaker durumları
+        breaker_states = breakers.snapshot()
+        if breaker_states:
+            print("\n🔌 Circuit Breaker")
+            print("=" * 40)
+            for name, b in breaker_states.items():
+                extra = f", {b['retry_in']:.0f}s sonra tekrar" if "retry_in" in b else ""
+                print(f"{name}: {b['state']} (hata: {b['failures']}, açılma: {b['trips']}{extra})")
+        
+        # Model yönlendirme telemetrisi
+        routing = model_telemetry.snapshot()
+        if routing:
+            print("\n🧠 Model Yönlendirme")
+            print("=" * 40)
+            for key, r in routing.items():
+                failover = " (yedek aktif)" if r["failover"] else ""
+                print(f"{key}: p50 {r['p50']}s, p95 {r['p95']}s, hata %{r['error_rate'] * 100:.0f}, "
+                      f"token {r['prompt_tokens'] + r['completion_tokens']}{failover}")
         return
     
     # Ana otomasyon
@@ -0,0 +1,322 @@
+"""
+Model Router - Görev bazlı model yönlendirme
+Gecikme telemetrisi ve yedek modele otomatik geçiş
+"""
+import json
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+from loguru import logger
+
+from config import config, DATA_DIR
+from resilience import acall, breakers, call, effective_deadline
+from storage import WriteBehindSnapshot
+from usage import ledger
+
+# Yönlendirilen görevler
+TASKS = ("tweet", "thread", "quote", "reply")
+
+
+@dataclass
+class TaskRoute:
+    """Bir görevin model ve token ayarı"""
+    task: str
+    model: str
+    max_tokens: int
+
+
+@dataclass
+class TaskTelemetry:
+    """Görev+model bazlı kayan pencere telemetrisi"""
+    latencies: Deque[float] = field(default_factory=deque)
+    outcomes: Deque[bool] = field(default_factory=deque)
+    requests: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def record(self, latency: float, ok: bool, window: int):
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.latencies.append(latency)
+        self.outcomes.append(ok)
+        while len(self.latencies) > window:
+            self.latencies.popleft()
+        while len(self.outcomes) > window:
+            self.outcomes.popleft()
+
+    def percentile(self, pct: float) -> float:
+        """Nearest-rank yüzdelik (saniye)"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(1, math.ceil(pct / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def to_dict(self) -> dict:
+        return {
+            "latencies": list(self.latencies),
+            "outcomes": list(self.outcomes),
+            "requests": self.requests,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TaskTelemetry":
+        return cls(
+            latencies=deque(data.get("latencies", [])),
+            outcomes=deque(data.get("outcomes", [])),
+            requests=data.get("requests", 0),
+            errors=data.get("errors", 0),
+            prompt_tokens=data.get("prompt_tokens", 0),
+            completion_tokens=data.get("completion_tokens", 0),
+        )
+
+
+class RouterTelemetry(WriteBehindSnapshot):
+    """
+    Süreç genelinde paylaşılan telemetri
+
+    Generator her döngüde yeniden oluşturulsa da pencere korunur;
+    yedek model kararı için diske de yazılır (ertelenmiş, atomik).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DATA_DIR / "model_telemetry.json"
+        self._lock = threading.Lock()
+        self._stats: Dict[str, TaskTelemetry] = {}
+        self._failover_until: Dict[str, float] = {}
+        self._load()
+        self._init_snapshot()
+
+    @staticmethod
+    def _key(task: str, model: str) -> str:
+        return f"{task}:{model}"
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+            self._stats = {k: TaskTelemetry.from_dict(v) for k, v in data.get("stats", {}).items()}
+            self._failover_until = data.get("failover_until", {})
+        except Exception as e:
+            logger.warning(f"Model telemetry could not be loaded: {e}")
+
+    _snapshot_label = "Model telemetry"
+
+    def _snapshot(self) -> str:
+        data = {
+            "stats": {k: v.to_dict() for k, v in self._stats.items()},
+            "failover_until": self._failover_until,
+            "updated_at": datetime.now().isoformat(),
+        }
+        return json.dumps(data, indent=2)
+
+    def get(self, task: str, model: str) -> TaskTelemetry:
+        return self._stats.setdefault(self._key(task, model), TaskTelemetry())
+
+    def record(self, task: str, model: str, latency: float, ok: bool, usage=None):
+        with self._lock:
+            stats = self.get(task, model)
+            stats.record(latency, ok, config.openai.telemetry_window)
+            if usage is not None:
+                stats.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                stats.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+            self._mark_dirty()
+
+    def failover_active(self, task: str) -> bool:
+        return self._failover_until.get(task, 0) > time.time()
+
+    def trip_failover(self, task: str, model: str):
+        """Yedek modele geç ve birincil modelin penceresini sıfırla"""
+        with self._lock:
+            until = time.time() + config.openai.failover_cooldown_minutes * 60
+            self._failover_until[task] = until
+            # Soğuma bitince birincil model temiz pencereyle denenir
+            stats = self.get(task, model)
+            stats.latencies.clear()
+            stats.outcomes.clear()
+            self._mark_dirty()
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Görev+model bazlı özet (p50/p95, hata oranı, token)"""
+        with self._lock:
+            return {
+                key: {
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "error_rate": round(stats.error_rate(), 3),
+                    "p50": round(stats.percentile(50), 2),
+                    "p95": round(stats.percentile(95), 2),
+                    "prompt_tokens": stats.prompt_tokens,
+                    "completion_tokens": stats.completion_tokens,
+                    "failover": self.failover_active(key.split(":", 1)[0]),
+                }
+                for key, stats in self._stats.items()
+            }
+
+
+# Süreç genelinde tek telemetri
+telemetry = RouterTelemetry()
+
+
+def default_routes() -> Dict[str, TaskRoute]:
+    """config.openai'den görev rotalarını oluştur"""
+    cfg = config.openai
+    return {
+        "tweet": TaskRoute("tweet", cfg.tweet_model or cfg.model, cfg.max_tokens_tweet),
+        "thread": TaskRoute("thread", cfg.thread_model or cfg.model, cfg.max_tokens_thread),
+        "quote": TaskRoute("quote", cfg.quote_model or cfg.model, cfg.max_tokens_quote),
+        "reply": TaskRoute("reply", cfg.reply_model or cfg.model, cfg.max_tokens_reply),
+    }
+
+
+class ModelRouter:
+    """
+    Her görevi yapılandırılmış modele yönlendir
+
+    Birincil modelin p95 gecikmesi veya hata oranı eşiği aşarsa
+    soğuma süresi boyunca yedek modele geçilir.
+    """
+
+    def __init__(self, client, routes: Optional[Dict[str, TaskRoute]] = None, async_client=None):
+        self.client = client
+        self.async_client = async_client
+        self.routes = routes or default_routes()
+        self.telemetry = telemetry
+
+    def _is_unhealthy(self, task: str, model: str) -> Tuple[bool, str]:
+        stats = self.telemetry.get(task, model)
+        if len(stats.latencies) < config.openai.failover_min_samples:
+            return False, ""
+        p95 = stats.percentile(95)
+        if p95 > config.openai.failover_p95_seconds:
+            return True, f"p95 {p95:.1f}s > {config.openai.failover_p95_seconds}s"
+        error_rate = stats.error_rate()
+        if error_rate > config.openai.failover_error_rate:
+            return True, f"error rate {error_rate:.0%} > {config.openai.failover_error_rate:.0%}"
+        return False, ""
+
+    def select(self, task: str) -> TaskRoute:
+        """Görev için kullanılacak rotayı seç (gerekirse yedek model)"""
+        route = self.routes[task]
+        fallback = config.openai.fallback_model
+
+        if not fallback or fallback == route.model:
+            return route
+
+        if self.telemetry.failover_active(task):
+            return TaskRoute(task, fallback, route.max_tokens)
+
+        unhealthy, reason = self._is_unhealthy(task, route.model)
+        if unhealthy:
+            logger.warning(f"Model {route.model} unhealthy for {task} ({reason}), failing over to {fallback}")
+            self.telemetry.trip_failover(task, route.model)
+            return TaskRoute(task, fallback, route.max_tokens)
+
+        return route
+
+    def complete(
+        self,
+        task: str,
+        messages: List[dict],
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **kwargs
+    ):
+        """
+        Chat completion çağrısı - telemetri kaydıyla
+
+        Args:
+            task: 'tweet', 'thread', 'quote' veya 'reply'
+            messages: Chat mesajları
+            max_tokens: Rota varsayılanını ez (ör. onarım çağrıları)
+            timeout: Tüm denemeler için toplam süre (saniye)
+        """
+        route = self.select(task)
+        start = time.monotonic()
+        deadline = effective_deadline(start + timeout if timeout else None)
+
+        try:
+            response = call(
+                f"openai:{route.model}",
+                self._with_remaining_timeout(self.client.chat.completions.create, deadline),
+                deadline=deadline,
+                model=route.model,
+                max_tokens=max_tokens or route.max_tokens,
+                messages=messages,
+                **kwargs
+            )
+        except Exception:
+            latency = time.monotonic() - start
+            self.telemetry.record(task, route.model, latency, ok=False)
+            ledger.record_openai(task, route.model, latency, ok=False)
+            raise
+
+        return self._record_success(task, route, start, response)
+
+    async def acomplete(
+        self,
+        task: str,
+        messages: List[dict],
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **kwargs
+    ):
+        """complete() ile aynı, AsyncOpenAI istemcisi üzerinden"""
+        route = self.select(task)
+        start = time.monotonic()
+        deadline = effective_deadline(start + timeout if timeout else None)
+
+        try:
+            response = await acall(
+                f"openai:{route.model}",
+                self._with_remaining_timeout(self.async_client.chat.completions.create, deadline),
+                deadline=deadline,
+                model=route.model,
+                max_tokens=max_tokens or route.max_tokens,
+                messages=messages,
+                **kwargs
+            )
+        except Exception:
+            latency = time.monotonic() - start
+            self.telemetry.record(task, route.model, latency, ok=False)
+            ledger.record_openai(task, route.model, latency, ok=False)
+            raise
+
+        return self._record_success(task, route, start, response)
+
+    @staticmethod
+    def _with_remaining_timeout(create, deadline: Optional[float]):
+        """Her denemeye kalan süreyi HTTP timeout olarak ver"""
+        if deadline is None:
+            return create
+
+        def attempt(**kwargs):
+            return create(timeout=max(0.1, deadline - time.monotonic()), **kwargs)
+        return attempt
+
+    def is_circuit_open(self, task: str) -> bool:
+        """Görevin modeli için breaker açık mı (çağrı yapmadan)"""
+        return breakers.get(f"openai:{self.select(task).model}").is_open()
+
+    def _record_success(self, task: str, route: TaskRoute, start: float, response):
+        latency = time.monotonic() - start
+        usage = getattr(response, "usage", None)
+        self.telemetry.record(task, route.model, latency, ok=True, usage=usage)
+        ledger.record_openai(task, route.model, latency, ok=True, usage=usage)
+        logger.debug(f"{task} via {route.model}: {latency:.2f}s")
+        return response
@@ -0,0 +1,364 @@
+"""
+Outbox - SQLite tabanlı kalıcı paylaşım kuyruğu
+Üretilen tweet/thread'ler idempotency anahtarıyla kuyruğa yazılır,
+worker kota ve rate limit'e göre paylaşır
+
+Durumlar: pending -> posting -> posted | failed
+Çökme sonrası 'posting' kalan öğeler günlük ve X ile karşılaştırılarak
+tam bir kez tamamlanır. Sahiplenme claimed_at/claimed_by ile kaydedilir;
+sadece CYCLE_TIMEOUT_MINUTES'tan eski sahiplenmeler kurtarılır, böylece
+başka bir süreç ya da worker'ın o an paylaştığı öğe geri bırakılmaz.
+"""
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import List, Optional, Tuple
+from loguru import logger
+import requests
+import tweepy
+
+from config import config, DATA_DIR
+from event_journal import journal
+from usage import local_now
+from rate_limits import rate_limits, DEFER as RATE_LIMIT_DEFER
+from resilience import DeadlineExceeded
+from x_client import TWEET_ENDPOINT
+
+# Öğe durumları
+PENDING = "pending"
+POSTING = "posting"
+POSTED = "posted"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    texts TEXT NOT NULL,
+    language TEXT NOT NULL,
+    reddit_post_id TEXT,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    tweet_ids TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    claimed_at REAL,
+    claimed_by TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_state ON outbox (state, id);
+"""
+
+# Önceki şemaya sonradan eklenen sütunlar
+_MIGRATIONS = {
+    "claimed_at": "ALTER TABLE outbox ADD COLUMN claimed_at REAL",
+    "claimed_by": "ALTER TABLE outbox ADD COLUMN claimed_by TEXT",
+}
+
+# Bu süreci tanımlayan sahip kimliği
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def idempotency_key(kind: str, language: str, reddit_post_id: str) -> str:
+    """Aynı Reddit postu, dil ve tür için her zaman aynı anahtar"""
+    return f"{kind}:{language}:{reddit_post_id}"
+
+
+@dataclass
+class OutboxItem:
+    """Kuyruktaki tweet veya thread"""
+    id: int
+    idempotency_key: str
+    kind: str
+    texts: List[str]
+    language: str
+    reddit_post_id: Optional[str]
+    state: str
+    attempts: int
+    tweet_ids: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: str = ""
+    updated_at: str = ""
+    claimed_at: Optional[float] = None
+    claimed_by: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "OutboxItem":
+        return cls(
+            id=row["id"],
+            idempotency_key=row["idempotency_key"],
+            kind=row["kind"],
+            texts=json.loads(row["texts"]),
+            language=row["language"],
+            reddit_post_id=row["reddit_post_id"],
+            state=row["state"],
+            attempts=row["attempts"],
+            tweet_ids=json.loads(row["tweet_ids"] or "[]"),
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            claimed_at=row["claimed_at"],
+            claimed_by=row["claimed_by"],
+        )
+
+
+class Outbox:
+    """
+    Kalıcı kuyruk
+
+    Her işlem kendi bağlantısını açar (thread/süreç güvenli);
+    öğe sahiplenme BEGIN IMMEDIATE ile atomiktir.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DATA_DIR / "outbox.db"
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(outbox)")}
+            for column, statement in _MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(statement)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(
+        self,
+        kind: str,
+        texts: List[str],
+        language: str,
+        reddit_post_id: Optional[str] = None,
+        key: Optional[str] = None
+    ) -> Tuple[OutboxItem, bool]:
+        """
+        Öğeyi kuyruğa ekle
+
+        Returns:
+            (öğe, yeni_mi): Anahtar zaten varsa mevcut öğe döner
+        """
+        key = key or idempotency_key(kind, language, reddit_post_id)
+        now = local_now().isoformat()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO outbox "
+                "(idempotency_key, kind, texts, language, reddit_post_id, state, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(texts, ensure_ascii=False), language, reddit_post_id, PENDING, now, now)
+            )
+            created = cursor.rowcount == 1
+            row = conn.execute("SELECT * FROM outbox WHERE idempotency_key = ?", (key,)).fetchone()
+        if not created:
+            logger.info(f"Outbox already has {key} ({row['state']})")
+        return OutboxItem.from_row(row), created
+
+    def claim_next(self) -> Optional[OutboxItem]:
+        """En eski pending öğeyi posting'e al (sahiplenme zamanı ve sahibi kaydedilir)"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM outbox WHERE state = ? ORDER BY id LIMIT 1", (PENDING,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                claimed_at = time.time()
+                conn.execute(
+                    "UPDATE outbox SET state = ?, attempts = attempts + 1, updated_at = ?, "
+                    "claimed_at = ?, claimed_by = ? WHERE id = ?",
+                    (POSTING, local_now().isoformat(), claimed_at, OWNER, row["id"])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        item = OutboxItem.from_row(row)
+        item.state = POSTING
+        item.attempts += 1
+        item.claimed_at, item.claimed_by = claimed_at, OWNER
+        return item
+
+    def _set(self, item_id: int, state: str, tweet_ids: Optional[List[str]] = None, error: Optional[str] = None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET state = ?, tweet_ids = COALESCE(?, tweet_ids), error = ?, updated_at = ? WHERE id = ?",
+                (state, json.dumps(tweet_ids) if tweet_ids is not None else None, error,
+                 local_now().isoformat(), item_id)
+            )
+
+    def mark_posted(self, item: OutboxItem, tweet_ids: List[str]):
+        self._set(item.id, POSTED, tweet_ids=tweet_ids)
+
+    def mark_failed(self, item: OutboxItem, error: str) -> str:
+        """Deneme hakkı kaldıysa pending'e döndür, yoksa failed; yeni durumu döndür"""
+        state = PENDING if item.attempts < config.outbox.max_attempts else FAILED
+        self._set(item.id, state, error=error)
+        if state == FAILED:
+            logger.error(f"Outbox item {item.idempotency_key} failed after {item.attempts} attempts: {error}")
+        return state
+
+    def release(self, item: OutboxItem):
+        """Denemeyi saymadan pending'e geri bırak (ör. rate limit)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET state = ?, attempts = MAX(attempts - 1, 0), updated_at = ? WHERE id = ?",
+                (PENDING, local_now().isoformat(), item.id)
+            )
+
+    def in_state(self, state: str) -> List[OutboxItem]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM outbox WHERE state = ? ORDER BY id", (state,)).fetchall()
+        return [OutboxItem.from_row(r) for r in rows]
+
+    def stale_claims(self, max_age_seconds: float) -> List[OutboxItem]:
+        """max_age_seconds'tan uzun süredir 'posting' olan öğeler (sahibi çökmüş sayılır)"""
+        cutoff = time.time() - max_age_seconds
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM outbox WHERE state = ? AND (claimed_at IS NULL OR claimed_at < ?) ORDER BY id",
+                (POSTING, cutoff)
+            ).fetchall()
+        return [OutboxItem.from_row(r) for r in rows]
+
+    def counts(self) -> dict:
+        """Durum başına öğe sayısı"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) AS n FROM outbox GROUP BY state").fetchall()
+        result = {PENDING: 0, POSTING: 0, POSTED: 0, FAILED: 0}
+        result.update({r["state"]: r["n"] for r in rows})
+        return result
+
+    def purge(self):
+        """Saklama süresi dolan posted/failed öğeleri sil"""
+        cutoff = (local_now() - timedelta(days=config.outbox.keep_days)).isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM outbox WHERE state IN (?, ?) AND updated_at < ?",
+                (POSTED, FAILED, cutoff)
+            )
+
+
+def _journal_match(item: OutboxItem) -> Optional[List[str]]:
+    """Öğe paylaşılıp günlüğe yazıldıysa tweet ID'leri"""
+    if not item.reddit_post_id:
+        return None
+    event_type = "thread" if item.kind == "thread" else "tweet"
+    for event in journal.since(item.created_at[:10], types=(event_type,)):
+        if event.get("reddit_post_id") != item.reddit_post_id:
+            continue
+        if event_type == "thread":
+            return event.get("tweet_ids", [])
+        return [event.get("tweet_id")]
+    return None
+
+
+def recover(box: Outbox, poster) -> int:
+    """
+    Çökme sonrası 'posting' kalan öğeleri çöz
+
+    Sadece döngü süre sınırından (CYCLE_TIMEOUT_MINUTES) eski sahiplenmeler
+    ele alınır; daha yeni olanları canlı bir döngü paylaşıyor olabilir.
+
+    Günlükte kaydı varsa posted; X'te aynı metin yakın zamanda
+    paylaşılmışsa posted; thread'lerde X'e ulaşmış tweet'ler checkpoint'e
+    eklenir. Kalanlar (thread'ler checkpoint'ten devam eder) pending'e döner.
+    """
+    stuck = box.stale_claims(config.schedule.cycle_timeout_minutes * 60)
+    for item in stuck:
+        tweet_ids = _journal_match(item)
+        if tweet_ids is None and item.kind == "thread":
+            tweet_ids = poster.reconcile_thread(item.idempotency_key, item.texts, item.language, item.reddit_post_id)
+        elif tweet_ids is None and item.kind == "tweet":
+            remote_id = poster.find_recent_tweet(item.texts[0])
+            if remote_id:
+                tweet_ids = [remote_id]
+                # Günlüğe hiç yazılmadı; sayaç ve geçmiş eksik kalmasın
+                poster._log_tweet(remote_id, item.texts[0], item.language, item.reddit_post_id)
+
+        if tweet_ids is not None:
+            logger.info(f"Outbox recovery: {item.idempotency_key} was already posted")
+            box.mark_posted(item, tweet_ids)
+        else:
+            logger.info(f"Outbox recovery: {item.idempotency_key} returned to pending")
+            box.release(item)
+
+    box.purge()
+    # Thread checkpoint'leri sadece bekleyen/paylaşılan öğeler için tutulur
+    active = {item.idempotency_key for state in (PENDING, POSTING) for item in box.in_state(state)}
+    poster.prune_thread_checkpoints(active)
+    return len(stuck)
+
+
+def process_next(box: Outbox, poster) -> Optional[OutboxItem]:
+    """
+    Kota ve rate limit izin veriyorsa sıradaki öğeyi paylaş
+
+    Returns:
+        Paylaşılan öğe veya None (kuyruk boş, limit dolu ya da hata)
+    """
+    can_post, reason = poster.can_post()
+    if not can_post:
+        logger.info(f"Outbox waiting: {reason}")
+        return None
+    decision, reset_in = rate_limits.decide(TWEET_ENDPOINT)
+    if decision == RATE_LIMIT_DEFER:
+        logger.info(f"Outbox waiting: write limit resets in {reset_in:.0f}s")
+        return None
+
+    item = box.claim_next()
+    if item is None:
+        return None
+
+    logger.info(f"Outbox posting {item.idempotency_key} (attempt {item.attempts})")
+    try:
+        if item.kind == "thread":
+            # Checkpoint anahtarı = idempotency anahtarı, yarım thread devam eder
+            tweet_ids = poster.post_thread(
+                item.texts,
+                item.language,
+                dry_run=False,
+                reddit_post_id=item.reddit_post_id,
+                checkpoint_key=item.idempotency_key
+            )
+        else:
+            tweet_id = poster.post_tweet(
+                item.texts[0],
+                item.language,
+                reddit_post_id=item.reddit_post_id,
+                dry_run=False
+            )
+            tweet_ids = [tweet_id] if tweet_id else []
+    except DeadlineExceeded:
+        # İstek gönderilmeden kesildi; thread checkpoint'i korunur
+        box.release(item)
+        raise
+    except (tweepy.TwitterServerError, requests.RequestException) as e:
+        # X isteği almış olabilir; tekrar gönderme, öğe 'posting' kalır
+        # ve recover() günlük/X üzerinden sonucu bulur
+        logger.warning(f"Outbox {item.idempotency_key}: post outcome unknown ({e}), left for recovery")
+        return None
+
+    if tweet_ids:
+        box.mark_posted(item, tweet_ids)
+        item.state, item.tweet_ids = POSTED, tweet_ids
+        return item
+
+    if box.mark_failed(item, "post returned no tweet id") == FAILED and item.kind == "thread":
+        poster.discard_thread_checkpoint(item.idempotency_key)
+    return None
+
+
+# Süreç genelinde tek kuyruk
+outbox = Outbox()
@@ -0,0 +1,153 @@
+"""
+Quota - Günlük tweet/engagement sayaçları
+Bellekte O(1) limit kontrolü, olay günlüğünden yeniden kurulum, write-behind kayıt
+"""
+import json
+import threading
+from typing import Dict, Optional
+from loguru import logger
+
+from config import config, DATA_DIR
+from event_journal import EventJournal, JournalFollower, journal
+from storage import WriteBehindSnapshot
+from usage import today_key
+
+# Sayaç türleri
+POSTS = "posts"
+QUOTES = "quote"
+REPLIES = "reply"
+MENTIONS = "mention"
+
+# Günlük olay türü -> sayaç (thread tek paylaşım sayılır)
+EVENT_COUNTERS = {
+    "tweet": POSTS,
+    "thread": POSTS,
+    "quote": QUOTES,
+    "reply": REPLIES,
+    "mention": MENTIONS,
+}
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {POSTS: 0, QUOTES: 0, REPLIES: 0, MENTIONS: 0}
+
+
+def daily_limit(kind: str) -> Optional[int]:
+    """Sayaç türü için günlük limit (None = sınırsız)"""
+    if kind == POSTS:
+        return config.tweet.max_daily_tweets
+    if kind == QUOTES:
+        return config.engagement.daily_quote_target
+    if kind == MENTIONS:
+        return config.engagement.daily_mention_target
+    return None
+
+
+class QuotaManager(JournalFollower, WriteBehindSnapshot):
+    """
+    Bugünün sayaçları
+
+    Sayaçlar günlüğe abone olup her olayda artar; gün değişimi
+    yapılandırılmış zaman diliminde kontrol edilir. Diskteki anlık
+    görüntü (data/quota.json) günlüğün son seq'i ile eşleşiyorsa
+    kullanılır, yoksa bugünün olayları günlüğün sonundan okunur. Diğer
+    süreçlerin paylaşımları sorgudan önce günlükten okunur (catch_up).
+    """
+
+    def __init__(self, event_journal: EventJournal, path=None):
+        self.journal = event_journal
+        self.path = path or DATA_DIR / "quota.json"
+        self._lock = threading.Lock()
+        self._day = today_key()
+        self._counts = _empty_counts()
+        self._seq = 0
+        self._init_snapshot()
+
+        self._restore()
+        self.journal.subscribe(self._follow)
+
+    # ------------------------------------------------------------------
+    # Kurulum
+    # ------------------------------------------------------------------
+
+    def _restore(self):
+        last_seq = self.journal.last_seq
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+                if data.get("date") == self._day and data.get("seq") == last_seq:
+                    self._counts.update(data.get("counts", {}))
+                    self._seq = last_seq
+                    return
+            except Exception as e:
+                logger.warning(f"Quota snapshot could not be loaded: {e}")
+        self.rebuild()
+
+    def rebuild(self):
+        """Bugünün sayaçlarını günlükten yeniden hesapla"""
+        with self._lock:
+            self._day = today_key()
+            self._counts = _empty_counts()
+            for event in self.journal.since(self._day, types=EVENT_COUNTERS.keys()):
+                self._counts[EVENT_COUNTERS[event["type"]]] += 1
+            self._seq = self.journal.last_seq
+            self._mark_dirty()
+
+    def _roll(self):
+        """Gün değiştiyse sayaçları sıfırla (kilit altında çağrılır)"""
+        today = today_key()
+        if today != self._day:
+            logger.info(f"Quota day rollover: {self._day} -> {today}")
+            self._day = today
+            self._counts = _empty_counts()
+            self._mark_dirty()
+
+    # ------------------------------------------------------------------
+    # Güncelleme
+    # ------------------------------------------------------------------
+
+    def _apply(self, event: dict):
+        """Olayı bugünün sayacına işle (kilit altında çağrılır)"""
+        kind = EVENT_COUNTERS.get(event.get("type"))
+        self._roll()
+        if kind and event.get("ts", "")[:10] == self._day:
+            self._counts[kind] += 1
+
+    _snapshot_label = "Quota snapshot"
+
+    def _snapshot(self) -> str:
+        return json.dumps({"date": self._day, "seq": self._seq, "counts": dict(self._counts)}, indent=2)
+
+    # ------------------------------------------------------------------
+    # Sorgular
+    # ------------------------------------------------------------------
+
+    def count(self, kind: str) -> int:
+        """Bugünkü sayaç (diğer süreçlerin paylaşımları dahil)"""
+        self.catch_up()
+        with self._lock:
+            self._roll()
+            return self._counts.get(kind, 0)
+
+    def remaining(self, kind: str) -> Optional[int]:
+        """Bugün kalan hak (None = sınırsız)"""
+        limit = daily_limit(kind)
+        if limit is None:
+            return None
+        return max(0, limit - self.count(kind))
+
+    def allows(self, kind: str) -> bool:
+        """Limit dolmadı mı"""
+        remaining = self.remaining(kind)
+        return remaining is None or remaining > 0
+
+    def snapshot(self) -> dict:
+        """Bugünün tüm sayaçları"""
+        self.catch_up()
+        with self._lock:
+            self._roll()
+            return {"date": self._day, **self._counts}
+
+
+# Süreç genelinde tek sayaç
+quota = QuotaManager(journal)
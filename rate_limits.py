@@ -0,0 +1,140 @@
+"""
+Rate Limits - X API endpoint bazlı rate limit takibi
+x-rate-limit-* başlıklarından beslenir; istekleri kabul eder, reset'e kadar
+bekletir ya da sonraki işe erteler
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from loguru import logger
+import tweepy
+
+from config import config, DATA_DIR
+from storage import WriteBehindSnapshot
+
+# Kabul kararları
+ADMIT = "admit"
+WAIT = "wait"
+DEFER = "defer"
+
+
+class RateLimitDeferred(tweepy.TweepyException):
+    """Endpoint limiti doldu, reset çok uzak - istek gönderilmedi"""
+
+    def __init__(self, endpoint: str, reset_in: float):
+        self.endpoint = endpoint
+        self.reset_in = reset_in
+        super().__init__(f"Rate limit exhausted for {endpoint} (resets in {reset_in:.0f}s)")
+
+
+class RateLimitRegistry(WriteBehindSnapshot):
+    """
+    Endpoint -> {limit, remaining, reset}
+
+    XPoster ve XEngagementManager aynı XClient sınıfını kullandığı için
+    tek kayıt ikisini de kapsar. Durum diske yazılır (ertelenmiş, atomik);
+    cron ile başlayan sonraki süreç ve --stats son bilinen limiti görür.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DATA_DIR / "rate_limits.json"
+        self._lock = threading.Lock()
+        self._limits: Dict[str, dict] = self._load()
+        self._init_snapshot()
+
+    def _load(self) -> Dict[str, dict]:
+        if self.path.exists():
+            try:
+                return json.loads(self.path.read_text()).get("endpoints", {})
+            except Exception as e:
+                logger.warning(f"Rate limit state could not be loaded: {e}")
+        return {}
+
+    _snapshot_label = "Rate limit state"
+
+    def _snapshot(self) -> str:
+        return json.dumps(
+            {"endpoints": self._limits, "updated_at": datetime.now().isoformat()},
+            indent=2
+        )
+
+    def update(self, endpoint: str, headers) -> None:
+        """Yanıt başlıklarından endpoint durumunu güncelle"""
+        if not headers or "x-rate-limit-remaining" not in headers:
+            return
+        try:
+            state = {
+                "limit": int(headers.get("x-rate-limit-limit", 0)),
+                "remaining": int(headers["x-rate-limit-remaining"]),
+                "reset": float(headers.get("x-rate-limit-reset", 0)),
+            }
+        except (TypeError, ValueError):
+            return
+
+        with self._lock:
+            self._limits[endpoint] = state
+            self._mark_dirty()
+
+    def decide(self, endpoint: str, max_wait: Optional[float] = None) -> Tuple[str, float]:
+        """
+        İstek şimdi gönderilebilir mi
+
+        Returns:
+            (ADMIT, 0), (WAIT, saniye) ya da (DEFER, reset'e kalan saniye)
+        """
+        max_wait = config.resilience.rate_limit_max_wait if max_wait is None else max_wait
+        with self._lock:
+            state = self._limits.get(endpoint)
+            if state is None:
+                return ADMIT, 0.0
+            reset_in = state["reset"] - time.time()
+            if reset_in <= 0 or state["remaining"] > config.resilience.rate_limit_reserve:
+                return ADMIT, 0.0
+        if reset_in <= max_wait:
+            return WAIT, reset_in
+        return DEFER, reset_in
+
+    def acquire(self, endpoint: str, max_wait: Optional[float] = None):
+        """
+        İsteği kabul et; gerekirse reset'e kadar bekle
+
+        Raises:
+            RateLimitDeferred: Reset max_wait'ten uzaksa
+        """
+        decision, delay = self.decide(endpoint, max_wait)
+        if decision == DEFER:
+            raise RateLimitDeferred(endpoint, delay)
+        if decision == WAIT:
+            logger.info(f"{endpoint}: rate limit exhausted, waiting {delay:.0f}s for reset")
+            time.sleep(delay + 1)
+
+        with self._lock:
+            state = self._limits.get(endpoint)
+            if state is None:
+                return
+            if state["reset"] <= time.time():
+                # Pencere yenilendi; yeni başlıklar gelene kadar tam kota varsay
+                state["remaining"] = state["limit"]
+            # Yanıt gelene kadar eşzamanlı çağrılar aynı hakkı kullanmasın
+            state["remaining"] = max(0, state["remaining"] - 1)
+
+    def headroom(self) -> Dict[str, dict]:
+        """Endpoint başına kalan istek ve reset süresi"""
+        now = time.time()
+        result = {}
+        with self._lock:
+            for endpoint, state in sorted(self._limits.items()):
+                reset_in = max(0.0, state["reset"] - now)
+                remaining = state["remaining"] if reset_in > 0 else state["limit"]
+                result[endpoint] = {
+                    "limit": state["limit"],
+                    "remaining": remaining,
+                    "reset_in": reset_in,
+                }
+        return result
+
+
+# Süreç genelinde tek kayıt
+rate_limits = RateLimitRegistry()
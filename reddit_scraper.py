@@ -14,6 +14,7 @@ from dataclasses import dataclass
 from loguru import logger
 
 from config import config, CACHE_DIR
+from resilience import DeadlineExceeded, check_deadline, remaining, request_timeout
 
 
 # Gerçekçi User-Agent listesi
@@ -75,6 +76,9 @@ class RedditScraper:
         self.cache_file = CACHE_DIR / "reddit_cache.json"
         self.posted_file = CACHE_DIR / "posted_ids.json"
         self.request_count = 0
+        self._last_request_at: Optional[float] = None
+        # Dosya içerikleri bellekte; başka süreç yazdıysa (mtime) yeniden okunur
+        self._files: Dict[Path, tuple] = {}
     
     def _update_headers(self):
         """Gerçekçi browser headers ayarla"""
@@ -97,11 +101,13 @@ class RedditScraper:
     def _rate_limit(self):
         """Rate limiting - Reddit'i spam'lemekten kaçın"""
         self.request_count += 1
-        if self.request_count > 1:
-            # Her istek arasında 2-5 saniye bekle
-            delay = random.uniform(2, 5)
-            logger.debug(f"Rate limiting: waiting {delay:.1f}s")
-            time.sleep(delay)
+        if self._last_request_at is not None:
+            # İstekler arasında 2-5 saniye (scraper döngüler arasında yaşar)
+            delay = random.uniform(2, 5) - (time.monotonic() - self._last_request_at)
+            if delay > 0:
+                logger.debug(f"Rate limiting: waiting {delay:.1f}s")
+                time.sleep(delay)
+        self._last_request_at = time.monotonic()
         
         # Her 10 istekte bir headers'ı yenile
         if self.request_count % 10 == 0:
@@ -119,28 +125,37 @@ class RedditScraper:
         except:
             return False
     
+    def _read_json(self, path: Path) -> dict:
+        """JSON dosyası; değişmediyse bellekteki kopya"""
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return {}
+        cached = self._files.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            data = json.loads(path.read_text())
+        except:
+            data = {}
+        self._files[path] = (mtime, data)
+        return data
+    
+    def _write_json(self, path: Path, data: dict):
+        path.write_text(json.dumps(data, indent=2))
+        self._files[path] = (path.stat().st_mtime, data)
+    
     def _load_cache(self) -> dict:
         """Cache'i yükle"""
-        if self.cache_file.exists():
-            try:
-                return json.loads(self.cache_file.read_text())
-            except:
-                return {}
-        return {}
+        return self._read_json(self.cache_file)
     
     def _save_cache(self, cache: dict):
         """Cache'i kaydet"""
-        self.cache_file.write_text(json.dumps(cache, indent=2))
+        self._write_json(self.cache_file, cache)
     
     def _load_posted_ids(self) -> set:
         """Daha önce paylaşılan post ID'lerini yükle"""
-        if self.posted_file.exists():
-            try:
-                data = json.loads(self.posted_file.read_text())
-                return set(data.get("ids", []))
-            except:
-                return set()
-        return set()
+        return set(self._read_json(self.posted_file).get("ids", []))
     
     def _save_posted_id(self, post_id: str):
         """Paylaşılan post ID'sini kaydet"""
@@ -150,10 +165,10 @@ class RedditScraper:
         # Son 1000 ID'yi tut (eski olanları temizle)
         posted_list = list(posted)[-1000:]
         
-        self.posted_file.write_text(json.dumps({
+        self._write_json(self.posted_file, {
             "ids": posted_list,
             "updated_at": datetime.now().isoformat()
-        }, indent=2))
+        })
     
     def fetch_subreddit(
         self, 
@@ -180,6 +195,7 @@ class RedditScraper:
             return [RedditPost(**p) for p in cache[cache_key]]
         
         # Rate limiting uygula
+        check_deadline(f"reddit r/{subreddit}")
         self._rate_limit()
         
         # Reddit'ten çek - old.reddit.com kullan
@@ -188,14 +204,18 @@ class RedditScraper:
         
         try:
             logger.info(f"Fetching r/{subreddit}/{sort}...")
-            response = self.session.get(url, params=params, timeout=15)
+            response = self.session.get(url, params=params, timeout=request_timeout(15))
             
-            # 403 veya 429 durumunda bekle ve tekrar dene
+            # 403 veya 429 durumunda bekle ve tekrar dene (döngü süresi yetiyorsa)
             if response.status_code in [403, 429]:
+                delay = random.uniform(10, 20)
+                left = remaining()
+                if left is not None and left <= delay:
+                    raise DeadlineExceeded(f"reddit r/{subreddit}: no time left to retry")
                 logger.warning(f"Got {response.status_code} for r/{subreddit}, waiting and retrying...")
-                time.sleep(random.uniform(10, 20))
+                time.sleep(delay)
                 self._update_headers()
-                response = self.session.get(url, params=params, timeout=15)
+                response = self.session.get(url, params=params, timeout=request_timeout(15))
             
             response.raise_for_status()
             
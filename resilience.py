@@ -0,0 +1,400 @@
+"""
+Resilience - OpenAI ve X çağrıları için retry ve circuit breaker
+Sınıflandırılmış tekrar, jitter'lı üstel bekleme, Retry-After desteği
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple, Type
+from loguru import logger
+import openai
+import requests
+import tweepy
+
+from config import config, DATA_DIR
+
+# Breaker durumları
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class DeadlineExceeded(Exception):
+    """Çağrı için ayrılan süre doldu"""
+
+
+# Zamanlanmış döngünün son tarihi (time.monotonic); iç çağrılara otomatik yayılır
+_cycle_deadline: ContextVar[Optional[float]] = ContextVar("cycle_deadline", default=None)
+
+
+@contextmanager
+def cycle_deadline(seconds: Optional[float]):
+    """
+    Döngü için süre sınırı
+
+    İç içe kullanımda en erken son tarih geçerlidir. call()/acall()
+    ve remaining() bu değeri okur.
+    """
+    deadline = time.monotonic() + seconds if seconds else None
+    current = _cycle_deadline.get()
+    if current is not None and (deadline is None or current < deadline):
+        deadline = current
+    token = _cycle_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _cycle_deadline.reset(token)
+
+
+def effective_deadline(deadline: Optional[float] = None) -> Optional[float]:
+    """Verilen son tarih ile döngü son tarihinin erkeni"""
+    current = _cycle_deadline.get()
+    if current is None:
+        return deadline
+    return current if deadline is None else min(current, deadline)
+
+
+def remaining() -> Optional[float]:
+    """Döngü son tarihine kalan saniye (sınır yoksa None)"""
+    current = _cycle_deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+def check_deadline(stage: str):
+    """Süre dolduysa DeadlineExceeded"""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"{stage}: cycle deadline exceeded")
+
+
+def request_timeout(default: float) -> float:
+    """HTTP timeout: varsayılan ile kalan sürenin küçüğü"""
+    left = remaining()
+    return default if left is None else max(0.1, min(default, left))
+
+
+class CircuitOpenError(Exception):
+    """Breaker açıkken çağrı yapılmadan hemen hata"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {endpoint} (retry in {retry_in:.0f}s)")
+
+
+@dataclass
+class RetryPolicy:
+    """Tekrar politikası"""
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy":
+        cfg = config.resilience
+        return cls(cfg.max_attempts, cfg.base_delay, cfg.max_delay)
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: [0, min(max_delay, base * 2^attempt)]"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def _header_retry_after(headers) -> Optional[float]:
+    """Retry-After (saniye veya HTTP tarihi) ya da x-rate-limit-reset (epoch)"""
+    if not headers:
+        return None
+
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    reset = headers.get("x-rate-limit-reset")
+    if reset:
+        try:
+            return max(0.0, float(reset) - time.time())
+        except ValueError:
+            pass
+
+    return None
+
+
+def classify(exc: Exception) -> Tuple[bool, Optional[float]]:
+    """
+    Hatayı sınıflandır
+
+    Returns:
+        (retryable, retry_after): Geçici mi ve sunucunun istediği bekleme
+    """
+    # OpenAI
+    if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True, None
+    if isinstance(exc, (openai.RateLimitError, openai.InternalServerError)):
+        return True, _header_retry_after(exc.response.headers)
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in (408, 409) or exc.status_code >= 500, _header_retry_after(exc.response.headers)
+
+    # X (tweepy)
+    if isinstance(exc, (tweepy.TooManyRequests, tweepy.TwitterServerError)):
+        return True, _header_retry_after(exc.response.headers)
+    if isinstance(exc, tweepy.HTTPException):
+        return False, None
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True, None
+
+    return False, None
+
+
+class CircuitBreaker:
+    """
+    Endpoint bazlı circuit breaker
+
+    Art arda failure_threshold geçici hata -> OPEN (hemen hata),
+    reset_timeout sonra HALF_OPEN (tek deneme), başarı -> CLOSED.
+    HALF_OPEN'da tek bir deneme çağrısı geçer; sonucu gelene kadar
+    diğer çağrılar reddedilir.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, registry=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.registry = registry
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.time())
+
+    def is_open(self) -> bool:
+        """Durumu değiştirmeden: breaker şu an çağrıları reddediyor mu"""
+        return self.state == OPEN and self.retry_in() > 0
+
+    def allow(self) -> bool:
+        """Çağrıya izin var mı (OPEN süresi dolduysa HALF_OPEN'a geç, tek deneme)"""
+        with self._lock:
+            if self.state == OPEN and self.retry_in() <= 0:
+                self._transition(HALF_OPEN)
+            if self.state == OPEN:
+                return False
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def release(self):
+        """Sonucu breaker'a yazılmayan çağrı (kalıcı hata): deneme hakkını bırak"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._probe_in_flight = False
+            self.failures = 0
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._probe_in_flight = False
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+                self.trips += 1
+                self._transition(OPEN)
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning(f"Circuit {self.name}: {self.state} -> {state}")
+        self.state = state
+        if self.registry:
+            self.registry.save()
+
+    def to_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened_at": self.opened_at,
+            "trips": self.trips,
+        }
+
+
+class BreakerRegistry:
+    """
+    Süreç genelinde breaker kaydı
+
+    Durum değişiklikleri diske yazılır; böylece --stats ve cron ile
+    başlatılan sonraki süreçler açık breaker'ı görür.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DATA_DIR / "breakers.json"
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._persisted = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        if self.path.exists():
+            try:
+                return json.loads(self.path.read_text()).get("breakers", {})
+            except Exception as e:
+                logger.warning(f"Breaker state could not be loaded: {e}")
+        return {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                cfg = config.resilience
+                breaker = CircuitBreaker(name, cfg.breaker_failure_threshold, cfg.breaker_reset_seconds, self)
+                saved = self._persisted.get(name)
+                if saved:
+                    breaker.state = saved.get("state", CLOSED)
+                    breaker.failures = saved.get("failures", 0)
+                    breaker.opened_at = saved.get("opened_at", 0.0)
+                    breaker.trips = saved.get("trips", 0)
+                self._breakers[name] = breaker
+            return breaker
+
+    def save(self):
+        data = dict(self._persisted)
+        data.update({name: b.to_dict() for name, b in self._breakers.items()})
+        self._persisted = data
+        self.path.write_text(json.dumps({"breakers": data, "updated_at": datetime.now().isoformat()}, indent=2))
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Tüm breaker'ların durumu (diskteki dahil)"""
+        data = {name: dict(state) for name, state in self._load().items()}
+        for name, breaker in list(self._breakers.items()):
+            data[name] = breaker.to_dict()
+        for state in data.values():
+            if state["state"] == OPEN:
+                state["retry_in"] = max(0.0, state["opened_at"] + config.resilience.breaker_reset_seconds - time.time())
+        return data
+
+
+# Süreç genelinde tek kayıt
+breakers = BreakerRegistry()
+
+
+def _give_up(
+    endpoint: str,
+    attempt: int,
+    policy: RetryPolicy,
+    exc: Exception,
+    deadline: Optional[float] = None
+) -> Optional[float]:
+    """Tekrar denenecekse bekleme süresi, değilse None"""
+    retryable, retry_after = classify(exc)
+    if not retryable or attempt + 1 >= policy.max_attempts:
+        return None
+    if retry_after is not None and retry_after > policy.max_delay:
+        logger.warning(f"{endpoint}: server asks to wait {retry_after:.0f}s, not retrying")
+        return None
+    delay = max(retry_after or 0.0, policy.backoff(attempt))
+    if deadline is not None and time.monotonic() + delay >= deadline:
+        logger.warning(f"{endpoint}: deadline reached, not retrying")
+        return None
+    logger.warning(f"{endpoint}: {type(exc).__name__} (attempt {attempt + 1}/{policy.max_attempts}), retrying in {delay:.1f}s")
+    return delay
+
+
+def call(
+    endpoint: str,
+    fn: Callable,
+    *args,
+    policy: Optional[RetryPolicy] = None,
+    open_error: Type[CircuitOpenError] = CircuitOpenError,
+    deadline: Optional[float] = None,
+    retry_if: Optional[Callable[[Exception], bool]] = None,
+    **kwargs
+):
+    """
+    fn'i breaker ve retry politikası altında çağır
+
+    Geçici hatalar tekrar denenir; kalıcı hatalar (400, 401, 403...)
+    hemen yükseltilir ve breaker'ı açmaz. deadline (time.monotonic())
+    verilirse ya da döngü son tarihi varsa süre dolunca yeni deneme
+    yapılmaz. retry_if verilirse geçici hata ancak o da onaylarsa
+    tekrar denenir (ör. idempotent olmayan yazmalar).
+    """
+    deadline = effective_deadline(deadline)
+    policy = policy or RetryPolicy.from_config()
+    breaker = breakers.get(endpoint)
+
+    for attempt in range(policy.max_attempts):
+        if deadline is not None and time.monotonic() >= deadline:
+            raise DeadlineExceeded(f"{endpoint}: deadline exceeded")
+        if not breaker.allow():
+            raise open_error(endpoint, breaker.retry_in())
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            retryable, _ = classify(e)
+            if retryable:
+                breaker.record_failure()
+            else:
+                breaker.release()
+            if retry_if is not None and not retry_if(e):
+                raise
+            delay = _give_up(endpoint, attempt, policy, e, deadline)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+
+async def acall(
+    endpoint: str,
+    fn: Callable,
+    *args,
+    policy: Optional[RetryPolicy] = None,
+    open_error: Type[CircuitOpenError] = CircuitOpenError,
+    deadline: Optional[float] = None,
+    **kwargs
+):
+    """call() ile aynı, coroutine fonksiyonlar için"""
+    deadline = effective_deadline(deadline)
+    policy = policy or RetryPolicy.from_config()
+    breaker = breakers.get(endpoint)
+
+    for attempt in range(policy.max_attempts):
+        if deadline is not None and time.monotonic() >= deadline:
+            raise DeadlineExceeded(f"{endpoint}: deadline exceeded")
+        if not breaker.allow():
+            raise open_error(endpoint, breaker.retry_in())
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            retryable, _ = classify(e)
+            if retryable:
+                breaker.record_failure()
+            else:
+                breaker.release()
+            delay = _give_up(endpoint, attempt, policy, e, deadline)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
@@ -0,0 +1,191 @@
+"""
+Rollups - Günlük ve haftalık özet tabloları
+(tarih, dil, aksiyon) anahtarlı sayaçlar, olay geldikçe artımlı güncellenir
+
+İstatistik sorguları gün sayısıyla orantılıdır (O(gün)); olay sayısından
+bağımsızdır. --backfill-stats tabloları olay günlüğünden yeniden kurar.
+"""
+import json
+import threading
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+from loguru import logger
+
+from config import DATA_DIR
+from event_journal import EventJournal, journal
+from storage import WriteBehindSnapshot
+from usage import local_now
+
+# Özetlenen aksiyonlar
+ACTIONS = ("tweet", "thread", "quote", "reply", "mention")
+
+# Dili bilinmeyen (eski) olaylar
+UNKNOWN_LANGUAGE = "unknown"
+
+# Tablo: {anahtar: {dil: {aksiyon: sayı}}}
+Table = Dict[str, Dict[str, Dict[str, int]]]
+
+
+def week_key(day: str) -> str:
+    """YYYY-MM-DD -> ISO hafta (YYYY-Www)"""
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _add(table: Table, key: str, language: str, action: str, amount: int = 1):
+    actions = table.setdefault(key, {}).setdefault(language, {})
+    actions[action] = actions.get(action, 0) + amount
+
+
+def _merge(target: Dict[str, Dict[str, int]], source: Dict[str, Dict[str, int]]):
+    for language, actions in source.items():
+        merged = target.setdefault(language, {})
+        for action, count in actions.items():
+            merged[action] = merged.get(action, 0) + count
+
+
+class RollupStore(WriteBehindSnapshot):
+    """
+    Materialized günlük/haftalık özetler
+
+    Günlüğe abone olur; her olay daily[tarih] ve weekly[hafta] hücresini
+    bir artırır. Tablolar data/rollups.json'a write-behind yazılır ve
+    açılışta sadece kayıttan sonraki olaylar (seq) uygulanır.
+    """
+
+    def __init__(self, event_journal: EventJournal, path=None):
+        self.journal = event_journal
+        self.path = path or DATA_DIR / "rollups.json"
+        self._lock = threading.Lock()
+        self.daily: Table = {}
+        self.weekly: Table = {}
+        self._seq = 0
+        self._init_snapshot()
+
+        self._restore()
+        self.journal.subscribe(self._on_event)
+
+    # ------------------------------------------------------------------
+    # Kurulum
+    # ------------------------------------------------------------------
+
+    def _restore(self):
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+                self.daily = data.get("daily", {})
+                self.weekly = data.get("weekly", {})
+                self._seq = data.get("seq", 0)
+            except Exception as e:
+                logger.warning(f"Rollups could not be loaded: {e}")
+
+        last_seq = self.journal.last_seq
+        if self._seq > last_seq or (not self.daily and last_seq):
+            # Günlük sıfırlanmış ya da özet hiç kurulmamış
+            self.backfill()
+        elif self._seq < last_seq:
+            with self._lock:
+                for event in self.journal.after(self._seq):
+                    self._apply(event)
+                self._mark_dirty()
+
+    def backfill(self) -> int:
+        """Tabloları tüm günlükten yeniden kur, işlenen olay sayısını döndür"""
+        daily: Table = {}
+        weekly: Table = {}
+        count = 0
+        for event in self.journal.iter_events(types=ACTIONS):
+            day = event["ts"][:10]
+            language = event.get("language") or UNKNOWN_LANGUAGE
+            _add(daily, day, language, event["type"])
+            _add(weekly, week_key(day), language, event["type"])
+            count += 1
+
+        with self._lock:
+            self.daily, self.weekly = daily, weekly
+            self._seq = self.journal.last_seq
+            self._mark_dirty()
+        logger.info(f"Rollups rebuilt from {count} events ({len(daily)} days)")
+        return count
+
+    # ------------------------------------------------------------------
+    # Güncelleme
+    # ------------------------------------------------------------------
+
+    def _apply(self, event: dict):
+        """Olayı tablolara işle (kilit altında çağrılır)"""
+        self._seq = max(self._seq, event.get("seq", 0))
+        if event.get("type") not in ACTIONS:
+            return
+        day = event["ts"][:10]
+        language = event.get("language") or UNKNOWN_LANGUAGE
+        _add(self.daily, day, language, event["type"])
+        _add(self.weekly, week_key(day), language, event["type"])
+
+    def _on_event(self, event: dict):
+        with self._lock:
+            self._apply(event)
+            self._mark_dirty()
+
+    _snapshot_label = "Rollups"
+
+    def _snapshot(self) -> str:
+        return json.dumps({"seq": self._seq, "daily": self.daily, "weekly": self.weekly}, ensure_ascii=False)
+
+    # ------------------------------------------------------------------
+    # Sorgular
+    # ------------------------------------------------------------------
+
+    def day(self, day: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Tek gün: {dil: {aksiyon: sayı}}"""
+        day = day or local_now().strftime("%Y-%m-%d")
+        with self._lock:
+            source = self.daily.get(day, {})
+            return {language: dict(actions) for language, actions in source.items()}
+
+    def week(self, day: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Günün ISO haftası: {dil: {aksiyon: sayı}}"""
+        key = week_key(day or local_now().strftime("%Y-%m-%d"))
+        with self._lock:
+            source = self.weekly.get(key, {})
+            return {language: dict(actions) for language, actions in source.items()}
+
+    def window(self, days: int) -> Dict[str, Dict[str, int]]:
+        """Bugün dahil son days gün (kayan pencere)"""
+        today = local_now().date()
+        result: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for offset in range(days):
+                day = (today - timedelta(days=offset)).isoformat()
+                if day in self.daily:
+                    _merge(result, self.daily[day])
+        return result
+
+    def total(self, actions: Iterable[str] = ACTIONS, days: Optional[int] = None) -> int:
+        """Aksiyon toplamı (days verilmezse tüm geçmiş)"""
+        wanted = set(actions)
+        if days is not None:
+            source = [self.window(days)]
+        else:
+            with self._lock:
+                source = [dict(v) for v in self.daily.values()]
+        return sum(
+            count
+            for by_language in source
+            for by_action in by_language.values()
+            for action, count in by_action.items()
+            if action in wanted
+        )
+
+
+def summarize(table: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+    """{dil: {aksiyon: sayı}} -> {aksiyon: sayı} (diller toplanır)"""
+    totals: Dict[str, int] = {}
+    for actions in table.values():
+        for action, count in actions.items():
+            totals[action] = totals.get(action, 0) + count
+    return totals
+
+
+# Süreç genelinde tek özet deposu
+rollups = RollupStore(journal)
@@ -3,20 +3,38 @@
 Scheduler - Hurricane Stratejisi ile Otomatik Zamanlayıcı
 %90 Engagement, %10 Orijinal Post - 24 Saat Kuralı
 """
+import asyncio
 import sys
 import signal
 import time
 import random
-from datetime import datetime
+from datetime import datetime, timedelta
 from loguru import logger
-from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 import pytz
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
 
-from config import config, LOGS_DIR
-from main import run_automation, run_engagement, setup_logging
-from x_engagement import XEngagementManager
+from config import config, DATA_DIR, LOGS_DIR
+from main import (
+    arefresh_candidates, arun_automation, arun_combined_cycle, arun_engagement, arun_hurricane_cycle,
+    run_automation, run_engagement, run_hurricane_cycle, setup_logging
+)
+from services import services
+import slot_planner
+
+# Slot iş türleri
+ENGAGEMENT = "engagement"
+ORIGINAL = "original"
+HURRICANE = "hurricane"
+COMBINED = "combined"
 
 
 class TweetScheduler:
@@ -27,12 +45,33 @@ class TweetScheduler:
     - %90 engagement (quote/mention) - daha sık
     - %10 orijinal post (Reddit'ten) - daha seyrek
     - 24 saat kuralı: Maksimum 23 saat sessizlik
+    
+    İşler süreç event loop'unda (services.loop) coroutine olarak çalışır;
+    OpenAI çağrıları async, Reddit/X çağrıları thread'de bekletilir.
     """
     
     def __init__(self):
         self.timezone = pytz.timezone(config.schedule.timezone)
-        self.scheduler = BlockingScheduler(timezone=self.timezone)
-        self.engagement_manager = XEngagementManager()
+        
+        # Slot işleri SQLite'ta kalıcı; çalışma anı durumundan türeyen
+        # işler (son tarih, havuz yenileme) bellekte ve her açılışta kurulur
+        job_store = config.schedule.job_store or str(DATA_DIR / "jobs.sqlite")
+        self.job_store = SQLAlchemyJobStore(url=f"sqlite:///{job_store}")
+        # Tüm işler tek loop'ta; tür başına eşzamanlılık main'deki
+        # semaforlarla (ENGAGEMENT_WORKERS / ORIGINAL_WORKERS) sınırlı
+        self.scheduler = AsyncIOScheduler(
+            timezone=self.timezone,
+            event_loop=services.loop,
+            jobstores={"default": self.job_store, "memory": MemoryJobStore()},
+            executors={"default": AsyncIOExecutor()},
+        )
+        self.scheduler.add_listener(self._on_job_missed, EVENT_JOB_MISSED)
+        self.scheduler.add_listener(self._on_job_overlap, EVENT_JOB_MAX_INSTANCES)
+        # job_id -> iş türü (misfire telafisi için)
+        self._slots = {}
+        # Son kurulan günlük çizelge (slot_planner)
+        self.plan = []
+        self.engagement_manager = services.engagement
         
         # Graceful shutdown
         signal.signal(signal.SIGINT, self._shutdown)
@@ -44,36 +83,96 @@ class TweetScheduler:
         self.scheduler.shutdown(wait=False)
         sys.exit(0)
     
+    def _slot_policy(self, kind: str) -> dict:
+        """İş türüne göre misfire/coalesce ve eşzamanlılık ayarları"""
+        if kind == ORIGINAL:
+            grace = config.schedule.original_misfire_grace_minutes
+        else:
+            grace = config.schedule.engagement_misfire_grace_minutes
+        return {
+            "misfire_grace_time": grace * 60,
+            "coalesce": True,
+            # Önceki çalışma bitmeden aynı iş tekrar başlamaz
+            "max_instances": 1,
+        }
+    
+    def _on_job_missed(self, event):
+        logger.warning(f"Job missed (misfire grace exceeded): {event.job_id} @ {event.scheduled_run_time}")
+    
+    def _on_job_overlap(self, event):
+        logger.warning(f"Job skipped, previous run still in progress: {event.job_id}")
+    
+    def _persisted_runs(self) -> dict:
+        """Depodaki slot işlerinin kayıtlı next_run_time'ı (epoch)"""
+        table = self.job_store.jobs_t
+        try:
+            with self.job_store.engine.begin() as connection:
+                rows = connection.execute(select(table.c.id, table.c.next_run_time)).all()
+        except OperationalError:
+            # Tablo henüz yok (ilk açılış)
+            return {}
+        return {job_id: next_run for job_id, next_run in rows}
+    
+    def _recover_misfires(self) -> dict:
+        """
+        Kapalıyken kaçan slotları telafi et
+        
+        Her iş türü için telafi penceresindeki en son kaçan slot bir kez
+        çalıştırılır (coalesce); diğerleri atlanır. Artık tanımlı olmayan
+        kayıtlı işler depodan silinir.
+        
+        Returns:
+            {"missed": kaçan slot sayısı, "recovered": [job_id], "skipped": sayı}
+        """
+        persisted = self._persisted_runs()
+        now = datetime.now(self.timezone)
+        latest = {}  # kind -> (run_time, job_id)
+        missed = 0
+        
+        for job_id, next_run in persisted.items():
+            kind = self._slots.get(job_id)
+            if kind is None or next_run is None:
+                continue
+            run_time = datetime.fromtimestamp(next_run, self.timezone)
+            trigger = self.scheduler.get_job(job_id).trigger
+            last_missed = None
+            while run_time is not None and run_time <= now:
+                missed += 1
+                last_missed = run_time
+                run_time = trigger.get_next_fire_time(run_time, run_time + timedelta(seconds=1))
+            if last_missed is None:
+                continue
+            grace = self._slot_policy(kind)["misfire_grace_time"]
+            if (now - last_missed).total_seconds() <= grace and (kind not in latest or last_missed > latest[kind][0]):
+                latest[kind] = (last_missed, job_id)
+        
+        recovered = []
+        for run_time, job_id in latest.values():
+            self.scheduler.modify_job(job_id, next_run_time=run_time)
+            recovered.append(job_id)
+        
+        stale = [job_id for job_id in persisted if job_id not in self._slots]
+        if stale:
+            with self.job_store.engine.begin() as connection:
+                connection.execute(self.job_store.jobs_t.delete().where(self.job_store.jobs_t.c.id.in_(stale)))
+            logger.info(f"Removed {len(stale)} stale jobs from store")
+        
+        report = {"missed": missed, "recovered": recovered, "skipped": missed - len(recovered)}
+        if missed:
+            logger.warning(
+                f"Recovered misfires: {missed} slots missed during downtime, "
+                f"catch-up: {', '.join(recovered) or 'none'}, skipped: {report['skipped']}"
+            )
+        return report
+    
     def _parse_time(self, time_str: str) -> tuple:
         """Saat:dakika formatını parse et"""
         parts = time_str.split(":")
         return int(parts[0]), int(parts[1])
     
     def _run_hurricane_cycle(self, language: str):
-        """
-        Hurricane döngüsü - aksiyon türünü otomatik seç
-        
-        %90 engagement, %10 orijinal
-        """
-        logger.info(f"🌀 Hurricane cycle başladı ({language.upper()})")
-        
-        # 24 saat kuralı kontrolü
-        is_urgent, hours = self.engagement_manager.check_24h_rule()
-        
-        if is_urgent:
-            logger.warning(f"⚠️ 24 saat kuralı aktif! Acil aksiyon alınıyor...")
-            # Acil durumda engagement yap
-            run_engagement(language=language, dry_run=config.dry_run)
-            return
-        
-        # Normal akış - rastgele karar
-        action_type = self.engagement_manager.decide_action_type()
-        logger.info(f"Seçilen aksiyon: {action_type}")
-        
-        if action_type == "original":
-            run_automation(language=language, dry_run=config.dry_run)
-        else:
-            run_engagement(language=language, dry_run=config.dry_run)
+        """Hurricane döngüsü - %90 engagement, %10 orijinal"""
+        run_hurricane_cycle(language=language, dry_run=config.dry_run)
     
     def add_engagement_schedule(self, time_str: str, language: str, job_id: str = None):
         """
@@ -85,13 +184,15 @@ class TweetScheduler:
         job_id = job_id or f"engage_{language}_{time_str.replace(':', '')}"
         
         self.scheduler.add_job(
-            run_engagement,
+            arun_engagement,
             CronTrigger(hour=hour, minute=minute, timezone=self.timezone),
             kwargs={"language": language, "dry_run": config.dry_run},
             id=job_id,
             name=f"🌀 Engage ({language.upper()}) at {time_str}",
-            replace_existing=True
+            replace_existing=True,
+            **self._slot_policy(ENGAGEMENT)
         )
+        self._slots[job_id] = ENGAGEMENT
         
         logger.info(f"Scheduled engagement: {language.upper()} at {time_str}")
     
@@ -105,13 +206,15 @@ class TweetScheduler:
         job_id = job_id or f"tweet_{language}_{time_str.replace(':', '')}"
         
         self.scheduler.add_job(
-            run_automation,
+            arun_automation,
             CronTrigger(hour=hour, minute=minute, timezone=self.timezone),
             kwargs={"language": language, "dry_run": config.dry_run},
             id=job_id,
             name=f"📝 Tweet ({language.upper()}) at {time_str}",
-            replace_existing=True
+            replace_existing=True,
+            **self._slot_policy(ORIGINAL)
         )
+        self._slots[job_id] = ORIGINAL
         
         logger.info(f"Scheduled original post: {language.upper()} at {time_str}")
     
@@ -123,43 +226,137 @@ class TweetScheduler:
         job_id = job_id or f"hurricane_{language}_{time_str.replace(':', '')}"
         
         self.scheduler.add_job(
-            self._run_hurricane_cycle,
+            arun_hurricane_cycle,
             CronTrigger(hour=hour, minute=minute, timezone=self.timezone),
-            kwargs={"language": language},
+            kwargs={"language": language, "dry_run": config.dry_run},
             id=job_id,
             name=f"🌀 Hurricane ({language.upper()}) at {time_str}",
-            replace_existing=True
+            replace_existing=True,
+            **self._slot_policy(HURRICANE)
         )
+        self._slots[job_id] = HURRICANE
         
         logger.info(f"Scheduled Hurricane cycle: {language.upper()} at {time_str}")
     
-    def add_24h_check(self):
+    def add_combined_schedule(self, time_str: str, actions: list, job_id: str = None):
         """
-        24 saat kuralı kontrolü - her 4 saatte bir
+        Birleşik döngü zamanlaması (aynı slota düşen işler tek döngüde)
         
-        Eğer sessizlik 20 saati geçtiyse uyarı ver
+        Args:
+            actions: [{"kind": ..., "language": ...}] - sırayla çalışır
         """
-        def check_and_alert():
-            is_urgent, hours = self.engagement_manager.check_24h_rule()
-            
-            if hours >= 20:
-                logger.warning(f"⚠️ UYARI: {hours:.1f} saat aktivite yok!")
-                logger.warning("24 saat kuralına yaklaşılıyor!")
-                
-                if is_urgent:
-                    logger.error("🚨 ACİL: Şimdi aksiyon alınmalı!")
-                    # Otomatik engagement yap
-                    run_engagement(language=config.default_language, dry_run=config.dry_run)
+        hour, minute = self._parse_time(time_str)
+        job_id = job_id or f"combined_{time_str.replace(':', '')}"
+        label = " + ".join(f"{a['kind']}/{a['language']}" for a in actions)
         
         self.scheduler.add_job(
-            check_and_alert,
-            IntervalTrigger(hours=4, timezone=self.timezone),
-            id="check_24h_rule",
-            name="⏰ 24h Rule Check",
+            arun_combined_cycle,
+            CronTrigger(hour=hour, minute=minute, timezone=self.timezone),
+            kwargs={"actions": actions, "dry_run": config.dry_run},
+            id=job_id,
+            name=f"🔀 Combined ({label}) at {time_str}",
+            replace_existing=True,
+            **self._slot_policy(COMBINED)
+        )
+        self._slots[job_id] = COMBINED
+        
+        logger.info(f"Scheduled combined cycle: {label} at {time_str}")
+    
+    def add_planned_schedule(self, include_engagement: bool = True):
+        """
+        Günlük çizelgeyi slot_planner ile kur
+        
+        Birbirine SLOT_MIN_GAP_MINUTES'tan yakın slotlar politikaya göre
+        birleştirilir ya da kaydırılır; aynı anda iki döngü başlamaz.
+        """
+        self.plan = slot_planner.build_plan(include_engagement)
+        
+        for slot in self.plan:
+            if slot.is_combined:
+                self.add_combined_schedule(slot.time, [a.to_dict() for a in slot.actions])
+                continue
+            action = slot.actions[0]
+            if action.kind == slot_planner.ENGAGEMENT:
+                self.add_engagement_schedule(slot.time, action.language)
+            else:
+                self.add_original_schedule(slot.time, action.language)
+        
+        resolved = slot_planner.collisions(self.plan)
+        if resolved:
+            logger.info(
+                f"Slot planner resolved {resolved} colliding jobs "
+                f"(policy: {config.schedule.slot_collision_policy})"
+            )
+    
+    def add_silence_deadline(self):
+        """
+        24 saat kuralı - tek seferlik son tarih işi
+        
+        İş, son aktivite + max_silence_hours - silence_margin_minutes
+        anına kurulur; her başarılı paylaşım (tweet, thread, quote,
+        reply, mention) işi yeniden kurar. Yoklama yok.
+        """
+        self.engagement_manager.activity.subscribe(lambda _ts: self._schedule_silence_deadline())
+        self._schedule_silence_deadline()
+    
+    def _schedule_silence_deadline(self, run_at: datetime = None):
+        """Son tarih işini (yeniden) kur"""
+        now = datetime.now(self.timezone)
+        run_at = max(run_at or self.engagement_manager.activity.deadline(), now)
+        
+        self.scheduler.add_job(
+            self._on_silence_deadline,
+            DateTrigger(run_date=run_at, timezone=self.timezone),
+            id="silence_deadline",
+            jobstore="memory",
+            max_instances=1,
+            # DateTrigger bir kez çalışır: kaçarsa (varsayılan 1 sn tolerans,
+            # meşgul loop) bir daha kurulmaz; ne kadar gecikirse gecikse çalışsın
+            misfire_grace_time=None,
+            coalesce=True,
+            name="⏰ 24h Silence Deadline",
             replace_existing=True
         )
+        logger.info(f"Silence deadline scheduled at {run_at.strftime('%Y-%m-%d %H:%M')}")
+    
+    async def _on_silence_deadline(self):
+        """Son tarih geldi: sessizlik sürüyorsa otomatik engagement"""
+        # Başka süreçlerin paylaşımları bellekteki izleyiciye düşmez
+        await asyncio.to_thread(self.engagement_manager.activity.reload)
+        is_urgent, hours = self.engagement_manager.check_24h_rule()
+        if not is_urgent:
+            # Bu arada aktivite oldu; yeni son tarih dinleyiciyle kuruldu
+            return
         
-        logger.info("Scheduled 24h rule check every 4 hours")
+        logger.error(f"🚨 ACİL: {hours:.1f} saat aktivite yok, engagement yapılıyor")
+        await arun_engagement(language=config.default_language, dry_run=config.dry_run)
+        
+        # Başarılıysa dinleyici yeni son tarihi kurdu; değilse kısa süre sonra tekrar
+        if self.engagement_manager.check_24h_rule()[0]:
+            retry_at = datetime.now(self.timezone) + timedelta(minutes=config.engagement.silence_retry_minutes)
+            self._schedule_silence_deadline(retry_at)
+    
+    def add_candidate_refresh(self):
+        """
+        Engagement aday havuzu yenileme - arka planda, başlangıçta bir kez
+        
+        Engagement işleri havuzdan seçer; kritik yolda API okuması olmaz.
+        Bir döngü havuzu zaten yeniliyorsa bu çalışma atlanır.
+        """
+        minutes = config.engagement.candidate_refresh_minutes
+        self.scheduler.add_job(
+            arefresh_candidates,
+            IntervalTrigger(minutes=minutes, timezone=self.timezone),
+            id="refresh_candidates",
+            jobstore="memory",
+            max_instances=1,
+            coalesce=True,
+            name="🎯 Candidate Pool Refresh",
+            next_run_time=datetime.now(self.timezone),
+            replace_existing=True
+        )
+        
+        logger.info(f"Scheduled candidate pool refresh every {minutes} minutes")
     
     def setup_hurricane_schedule(self):
         """
@@ -167,24 +364,18 @@ class TweetScheduler:
         
         - Engagement: Günde 8 kez (3 saatte 1)
         - Orijinal post: Günde 2-3 kez
-        - 24 saat kontrolü: 4 saatte 1
+        - 24 saat kuralı: son aktiviteye göre tek seferlik son tarih işi
         """
         logger.info("🌀 Setting up Hurricane schedule...")
         
-        # Engagement zamanları (Türkçe)
-        for time_str in config.schedule.engagement_schedule:
-            self.add_engagement_schedule(time_str, "tr")
-        
-        # Orijinal post zamanları (Türkçe)
-        for time_str in config.schedule.schedule_tr:
-            self.add_original_schedule(time_str, "tr")
+        # Engagement (TR) ve orijinal post (TR/EN) zamanları - çakışmalar çözülmüş
+        self.add_planned_schedule(include_engagement=True)
         
-        # İngilizce orijinal postlar
-        for time_str in config.schedule.schedule_en:
-            self.add_original_schedule(time_str, "en")
+        # Aday havuzu (engagement işlerinden önce hazır olsun)
+        self.add_candidate_refresh()
         
-        # 24 saat kuralı kontrolü
-        self.add_24h_check()
+        # 24 saat kuralı son tarihi
+        self.add_silence_deadline()
         
         logger.info(f"Total scheduled jobs: {len(self.scheduler.get_jobs())}")
     
@@ -192,16 +383,18 @@ class TweetScheduler:
         """Eski varsayılan zamanlama (geriye uyumluluk)"""
         logger.info("Setting up default schedule...")
         
-        # Türkçe tweet'ler
-        for time_str in config.schedule.schedule_tr:
-            self.add_original_schedule(time_str, "tr")
-        
-        # İngilizce tweet'ler
-        for time_str in config.schedule.schedule_en:
-            self.add_original_schedule(time_str, "en")
+        # Türkçe ve İngilizce tweet'ler
+        self.add_planned_schedule(include_engagement=False)
         
         logger.info(f"Total scheduled jobs: {len(self.scheduler.get_jobs())}")
     
+    def _next_run(self, job):
+        """Sonraki çalışma; başlamamış zamanlayıcıda tetikleyiciden hesaplanır"""
+        next_run = getattr(job, "next_run_time", None)
+        if next_run is None and job.trigger is not None:
+            next_run = job.trigger.get_next_fire_time(None, datetime.now(self.timezone))
+        return next_run
+    
     def list_jobs(self):
         """Zamanlanmış görevleri listele"""
         jobs = self.scheduler.get_jobs()
@@ -213,29 +406,43 @@ class TweetScheduler:
             print("Henüz zamanlanmış görev yok.")
             return
         
+        if self.plan:
+            print(f"\n🗓️ Günlük Plan (çakışma: {config.schedule.slot_collision_policy}, "
+                  f"en az {config.schedule.slot_min_gap_minutes} dk ara):")
+            for slot in self.plan:
+                print(f"  • {slot_planner.describe(slot)}")
+        
         # Grupla
         engagement_jobs = [j for j in jobs if "Engage" in j.name or "Hurricane" in j.name]
         tweet_jobs = [j for j in jobs if "Tweet" in j.name]
-        other_jobs = [j for j in jobs if j not in engagement_jobs and j not in tweet_jobs]
+        combined_jobs = [j for j in jobs if "Combined" in j.name]
+        other_jobs = [j for j in jobs if j not in engagement_jobs + tweet_jobs + combined_jobs]
         
         if engagement_jobs:
             print("\n🌀 Engagement Görevleri:")
             for job in engagement_jobs:
-                next_run = job.next_run_time
+                next_run = self._next_run(job)
                 next_run_str = next_run.strftime("%Y-%m-%d %H:%M") if next_run else "N/A"
                 print(f"  • {job.name} → Sonraki: {next_run_str}")
         
         if tweet_jobs:
             print("\n📝 Orijinal Tweet Görevleri:")
             for job in tweet_jobs:
-                next_run = job.next_run_time
+                next_run = self._next_run(job)
+                next_run_str = next_run.strftime("%Y-%m-%d %H:%M") if next_run else "N/A"
+                print(f"  • {job.name} → Sonraki: {next_run_str}")
+        
+        if combined_jobs:
+            print("\n🔀 Birleşik Görevler:")
+            for job in combined_jobs:
+                next_run = self._next_run(job)
                 next_run_str = next_run.strftime("%Y-%m-%d %H:%M") if next_run else "N/A"
                 print(f"  • {job.name} → Sonraki: {next_run_str}")
         
         if other_jobs:
             print("\n⚙️ Diğer Görevler:")
             for job in other_jobs:
-                next_run = job.next_run_time
+                next_run = self._next_run(job)
                 next_run_str = next_run.strftime("%Y-%m-%d %H:%M") if next_run else "N/A"
                 print(f"  • {job.name} → Sonraki: {next_run_str}")
     
@@ -268,11 +475,17 @@ class TweetScheduler:
         else:
             self.setup_default_schedule()
         
+        self._recover_misfires()
+        
+        # İstemcileri ilk slottan önce kur (bağlantı havuzları sıcak kalır)
+        services.warm_up()
+        
         logger.info(f"Starting scheduler (timezone: {config.schedule.timezone})...")
         logger.info("Press Ctrl+C to exit")
         
         try:
             self.scheduler.start()
+            services.loop.run_forever()
         except (KeyboardInterrupt, SystemExit):
             logger.info("Scheduler stopped")
 
@@ -288,7 +501,7 @@ def main():
 🌀 Hurricane Stratejisi:
   - Engagement (quote/mention): Günde 8 kez
   - Orijinal post (Reddit): Günde 2-3 kez
-  - 24 saat kuralı kontrolü: 4 saatte 1
+  - 24 saat kuralı: son aktiviteden 23 saat (eksi pay) sonra otomatik engagement
 
 Örnekler:
   python scheduler.py                  # Hurricane modunda başlat
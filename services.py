@@ -0,0 +1,104 @@
+"""
+Services - Süreç genelinde sıcak bileşenler
+Scraper, generator, poster ve engagement yöneticisi bir kez kurulur;
+keep-alive bağlantı havuzları ve bellekteki durum döngüler arasında korunur.
+Async istemciler (AsyncOpenAI) süreç genelindeki tek event loop'a bağlıdır.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+
+from reddit_scraper import RedditScraper
+from tweet_generator import TweetGenerator
+from x_engagement import XEngagementManager
+from x_poster import XPoster
+
+
+class Services:
+    """
+    Tembel kurulan bileşen kabı
+
+    İlk erişimde kurulur, sonraki döngüler aynı nesneyi kullanır
+    (requests.Session, OpenAI/httpx ve tweepy oturumları açık kalır).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instances: Dict[str, object] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get(self, name: str, factory: Callable[[], object]):
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+                    logger.debug(f"Service ready: {name}")
+        return instance
+
+    @property
+    def scraper(self) -> RedditScraper:
+        return self._get("scraper", RedditScraper)
+
+    @property
+    def generator(self) -> TweetGenerator:
+        return self._get("generator", TweetGenerator)
+
+    @property
+    def poster(self) -> XPoster:
+        return self._get("poster", XPoster)
+
+    @property
+    def engagement(self) -> XEngagementManager:
+        return self._get("engagement", XEngagementManager)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Süreç event loop'u
+        
+        AsyncIOScheduler bu döngüde çalışır; senkron sarmalayıcılar da aynı
+        döngüyü kullanır, böylece AsyncOpenAI bağlantıları kapanmış bir
+        döngüye bağlı kalmaz.
+        """
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    self._loop = asyncio.new_event_loop()
+        return self._loop
+    
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """
+        Coroutine'i süreç döngüsünde çalıştır ve sonucunu döndür
+        
+        Döngü başka bir thread'de çalışıyorsa (zamanlayıcı) iş ona gönderilir;
+        döngünün kendi thread'inden çağrılamaz (await kullanın).
+        """
+        loop = self.loop
+        if loop.is_running():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                raise RuntimeError("services.run() called from the event loop thread; await the coroutine instead")
+            return asyncio.run_coroutine_threadsafe(coro, loop).result()
+        return loop.run_until_complete(coro)
+    
+    def warm_up(self):
+        """Tüm bileşenleri şimdi kur (zamanlayıcı açılışında)"""
+        for name in ("scraper", "generator", "poster", "engagement"):
+            getattr(self, name)
+
+    def reset(self):
+        """Bileşenleri bırak; sonraki erişimde yeniden kurulur (ör. yapılandırma değişti)"""
+        with self._lock:
+            self._instances.clear()
+
+
+# Süreç genelinde tek kap
+services = Services()
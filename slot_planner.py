@@ -0,0 +1,156 @@
+"""
+Slot Planner - Günlük zaman çizelgesi ve çakışma çözümü
+Engagement ve orijinal post listeleri tek çizelgede birleştirilir;
+önceki döngü bitmeden (CYCLE_TIMEOUT_MINUTES x aksiyon sayısı) başlayan
+slotlar kaydırılır (stagger) ya da tek döngüde birleştirilir (merge);
+çizelge gece yarısında sarar
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from config import config
+
+# Aksiyon türleri
+ENGAGEMENT = "engagement"
+ORIGINAL = "original"
+
+# Çakışma politikaları
+MERGE = "merge"
+STAGGER = "stagger"
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _to_minute(time_str: str) -> int:
+    hour, minute = time_str.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+def _to_time(minute: int) -> str:
+    minute %= MINUTES_PER_DAY
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+@dataclass
+class SlotAction:
+    """Tek bir zamanlanmış aksiyon"""
+    kind: str
+    language: str
+    requested: str  # Yapılandırmadaki saat
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"kind": self.kind, "language": self.language}
+
+
+@dataclass
+class PlannedSlot:
+    """Çizelgedeki slot; birden fazla aksiyon = birleşik döngü"""
+    minute: int
+    actions: List[SlotAction] = field(default_factory=list)
+
+    @property
+    def time(self) -> str:
+        return _to_time(self.minute)
+
+    @property
+    def is_combined(self) -> bool:
+        return len(self.actions) > 1
+
+    @property
+    def shifted(self) -> List[SlotAction]:
+        """Yapılandırılan saatinden kaydırılmış aksiyonlar"""
+        return [a for a in self.actions if a.requested != self.time]
+
+
+def requested_actions(include_engagement: bool = True) -> List[SlotAction]:
+    """Yapılandırmadaki tüm aksiyonlar (saat sırasıyla)"""
+    actions = []
+    if include_engagement:
+        actions += [SlotAction(ENGAGEMENT, "tr", t) for t in config.schedule.engagement_schedule]
+    actions += [SlotAction(ORIGINAL, "tr", t) for t in config.schedule.schedule_tr]
+    actions += [SlotAction(ORIGINAL, "en", t) for t in config.schedule.schedule_en]
+    # Aynı saatte orijinal post önce (birleşik döngüde ilk çalışır)
+    return sorted(actions, key=lambda a: (_to_minute(a.requested), a.kind != ORIGINAL))
+
+
+def _day_start(minutes: List[int]) -> int:
+    """
+    Günün çizelgeye başladığı dakika: en uzun boşluktan sonraki slot
+
+    Çizelge her gün tekrar eder; 23:55 ile 00:05 komşudur. Tarama en
+    uzun boşluktan başlarsa gece yarısını aşan çakışmalar da görülür.
+    """
+    distinct = sorted(set(minutes))
+    if len(distinct) < 2:
+        return distinct[0] if distinct else 0
+    gaps = [
+        ((distinct[(i + 1) % len(distinct)] - m) % MINUTES_PER_DAY, distinct[(i + 1) % len(distinct)])
+        for i, m in enumerate(distinct)
+    ]
+    return max(gaps, key=lambda g: (g[0], -g[1]))[1]
+
+
+def build_plan(
+    include_engagement: bool = True,
+    policy: Optional[str] = None,
+    min_gap: Optional[int] = None
+) -> List[PlannedSlot]:
+    """
+    Günün çizelgesini kur
+
+    Bir slot, önceki slotun bitişinden (başlangıç + CYCLE_TIMEOUT_MINUTES
+    x aksiyon sayısı, en az min_gap) önce başlıyorsa çakışır: merge'de
+    önceki slota eklenir, stagger'da o bitişe kaydırılır. Dakikalar gün
+    modunda (1440) hesaplanır; kaydırma bir sonraki günün ilk slotuna
+    taşarsa aksiyon son slotla birleştirilir.
+
+    Args:
+        include_engagement: Engagement slotları dahil mi (Hurricane modu)
+        policy: 'merge' veya 'stagger' (varsayılan: SLOT_COLLISION_POLICY)
+        min_gap: İki döngü arası en az süre, dakika (varsayılan: SLOT_MIN_GAP_MINUTES)
+
+    Returns:
+        Saat sırasıyla slotlar
+    """
+    policy = policy or config.schedule.slot_collision_policy
+    min_gap = config.schedule.slot_min_gap_minutes if min_gap is None else min_gap
+    timeout = config.schedule.cycle_timeout_minutes
+
+    actions = requested_actions(include_engagement)
+    start = _day_start([_to_minute(a.requested) for a in actions])
+    # Dakikalar günün başlangıcına göre (0..1439); plan sonunda saate çevrilir
+    actions.sort(key=lambda a: ((_to_minute(a.requested) - start) % MINUTES_PER_DAY, a.kind != ORIGINAL))
+    plan: List[PlannedSlot] = []
+
+    for action in actions:
+        minute = (_to_minute(action.requested) - start) % MINUTES_PER_DAY
+        last = plan[-1] if plan else None
+        if last is not None:
+            # Önceki slot her aksiyonu için bir döngü süresi meşgul
+            busy_until = last.minute + max(min_gap, timeout * len(last.actions))
+            if minute < busy_until:
+                if policy == MERGE or busy_until >= MINUTES_PER_DAY:
+                    last.actions.append(action)
+                    continue
+                minute = busy_until
+        plan.append(PlannedSlot(minute, [action]))
+
+    for slot in plan:
+        slot.minute = (slot.minute + start) % MINUTES_PER_DAY
+    return sorted(plan, key=lambda slot: slot.minute)
+
+
+def collisions(plan: List[PlannedSlot]) -> int:
+    """Çözülen çakışma sayısı (birleştirilen + kaydırılan aksiyonlar)"""
+    return sum(len(slot.actions) - 1 + len(slot.shifted) for slot in plan)
+
+
+def describe(slot: PlannedSlot) -> str:
+    """'09:00 original/en + engagement/tr (birleşik)' gibi tek satır"""
+    text = " + ".join(f"{a.kind}/{a.language}" for a in slot.actions)
+    notes = []
+    if slot.is_combined:
+        notes.append("birleşik")
+    for action in slot.shifted:
+        notes.append(f"{action.kind}/{action.language} {action.requested} → {slot.time}")
+    return f"{slot.time} {text}" + (f" ({'; '.join(notes)})" if notes else "")
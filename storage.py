@@ -0,0 +1,70 @@
+"""
+Storage - Bellekteki durumun diske yazılması
+Atomik dosya yazma ve write-behind (ertelenmiş, toplu) anlık görüntü
+"""
+import atexit
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+from loguru import logger
+
+from config import config
+
+
+def atomic_write(path: Path, text: str):
+    """
+    Dosyayı tmp + os.replace ile yaz
+
+    Yarıda kesilen yazma eski dosyayı bozmaz; tmp adı süreç başına
+    ayrıdır, aynı dosyaya yazan süreçler birbirinin tmp'sini ezmez.
+    """
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class WriteBehindSnapshot:
+    """
+    Write-behind anlık görüntü (karma sınıf)
+
+    Alt sınıf self.path, self._lock ve _snapshot() -> str sağlar;
+    _mark_dirty() kilit altında çağrılır. Aralıktaki tüm değişiklikler
+    JOURNAL_FLUSH_SECONDS sonra tek atomik yazmada toplanır, bekleyenler
+    süreç kapanırken yazılır.
+    """
+
+    _snapshot_label = "Snapshot"
+
+    def _init_snapshot(self, delay: Optional[float] = None):
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self._flush_delay = delay
+        atexit.register(self.flush)
+
+    def _snapshot(self) -> str:
+        """Kaydedilecek içerik (kilit altında çağrılır)"""
+        raise NotImplementedError
+
+    def _mark_dirty(self):
+        """Kaydı ertele; aralıktaki tüm değişiklikler tek yazmada toplanır"""
+        self._dirty = True
+        if self._timer is None:
+            delay = config.journal.flush_seconds if self._flush_delay is None else self._flush_delay
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Bekleyen değişiklikleri diske yaz"""
+        with self._lock:
+            self._timer = None
+            if not self._dirty:
+                return
+            data = self._snapshot()
+            self._dirty = False
+        try:
+            atomic_write(self.path, data)
+        except Exception as e:
+            logger.error(f"{self._snapshot_label} could not be saved: {e}")
@@ -0,0 +1,177 @@
+"""
+Target Scheduler - Hedef hesap sırası (min-heap)
+Hesap başına bekleme süresi, aday farkındalığı, write-behind sayaç kaydı
+"""
+import heapq
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+
+from config import config, DATA_DIR
+from storage import WriteBehindSnapshot
+
+
+class TargetScheduler(WriteBehindSnapshot):
+    """
+    {username (küçük harf): {"next_at", "count"}}
+
+    Heap anahtarı (next_at, count, username): önce süresi dolan, eşitlikte
+    en az etkileşim yapılan hesap gelir. Güncellenen hesabın eski heap
+    kaydı pop sırasında atlanır. Sayaçlar bellekte artar ve aralıklı
+    olarak data/target_schedule.json'a tek yazmada kaydedilir. Hesap
+    kayıtları (target_accounts.json satırları) sync() ile bellekte
+    tutulur; seçim dosya okumaz.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DATA_DIR / "target_schedule.json"
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = self._load()
+        self._accounts: Dict[str, dict] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._init_snapshot()
+        self._rebuild_heap()
+
+    def _load(self) -> Dict[str, dict]:
+        if self.path.exists():
+            try:
+                return json.loads(self.path.read_text()).get("targets", {})
+            except Exception as e:
+                logger.warning(f"Target schedule could not be loaded: {e}")
+        return {}
+
+    def _rebuild_heap(self):
+        """Heap'i kayıtlardan kur (kilit altında, O(n))"""
+        self._heap = [(e["next_at"], e["count"], name) for name, e in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def _push(self, name: str):
+        entry = self._entries[name]
+        heapq.heappush(self._heap, (entry["next_at"], entry["count"], name))
+
+    def _is_current(self, item: Tuple[float, int, str]) -> bool:
+        entry = self._entries.get(item[2])
+        return entry is not None and (entry["next_at"], entry["count"]) == item[:2]
+
+    # ------------------------------------------------------------------
+    # Hesap listesi
+    # ------------------------------------------------------------------
+
+    def sync(self, accounts: Iterable[dict]):
+        """
+        Hesap listesiyle eşitle
+
+        Yeni hesaplar hemen uygun olur, sayaç target_accounts.json'daki
+        engagement_count ile başlar; listeden çıkanlar silinir. Sadece
+        hesap listesi değiştiğinde çağrılır (O(n)).
+        """
+        accounts = {a["username"].lower(): dict(a) for a in accounts}
+        counts = {name: a.get("engagement_count", 0) for name, a in accounts.items()}
+        with self._lock:
+            self._accounts = accounts
+            added = counts.keys() - self._entries.keys()
+            removed = self._entries.keys() - counts.keys()
+            if not added and not removed:
+                return
+            for name in removed:
+                del self._entries[name]
+            for name in added:
+                self._entries[name] = {"next_at": 0.0, "count": counts[name]}
+            self._rebuild_heap()
+            self._mark_dirty()
+
+    def rename(self, old: str, new: str):
+        """Handle değişikliğinde sayacı ve bekleme süresini taşı"""
+        with self._lock:
+            account = self._accounts.pop(old.lower(), None)
+            if account is not None:
+                self._accounts[new.lower()] = {**account, "username": new}
+            entry = self._entries.pop(old.lower(), None)
+            if entry is None:
+                return
+            self._entries[new.lower()] = entry
+            self._push(new.lower())
+            self._mark_dirty()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._accounts)
+
+    # ------------------------------------------------------------------
+    # Seçim
+    # ------------------------------------------------------------------
+
+    def select(self, has_candidates: Optional[Callable[[str], bool]] = None) -> Optional[dict]:
+        """
+        Süresi dolmuş ve üzerinde işlem yapılabilecek ilk hesap
+
+        Adayı olmayan hesaplar bir havuz yenileme aralığı kadar ertelenir,
+        böylece sonraki seçimler onları tekrar denemez.
+
+        Args:
+            has_candidates: username -> bool; None ise tüm hesaplar uygun
+
+        Returns:
+            Hesap kaydı (güncel engagement_count ile) veya None
+        """
+        now = time.time()
+        retry_at = now + config.engagement.candidate_refresh_minutes * 60
+        with self._lock:
+            deferred = []
+            selected = None
+            while self._heap and self._heap[0][0] <= now:
+                item = heapq.heappop(self._heap)
+                if not self._is_current(item):
+                    continue
+                name = item[2]
+                if name not in self._accounts:
+                    continue
+                if has_candidates is None or has_candidates(name):
+                    selected = {**self._accounts[name], "engagement_count": self._entries[name]["count"]}
+                    self._push(name)
+                    break
+                deferred.append(name)
+
+            for name in deferred:
+                self._entries[name]["next_at"] = retry_at
+                self._push(name)
+            if deferred:
+                logger.debug(f"No candidates, deferred: {', '.join('@' + n for n in deferred)}")
+                self._mark_dirty()
+            return selected
+
+    def record(self, username: str):
+        """Etkileşim yapıldı: sayacı artır, bekleme süresini başlat"""
+        name = username.lower()
+        with self._lock:
+            entry = self._entries.setdefault(name, {"next_at": 0.0, "count": 0})
+            entry["count"] += 1
+            entry["next_at"] = time.time() + config.engagement.target_cooldown_minutes * 60
+            self._push(name)
+            self._mark_dirty()
+
+    def count(self, username: str, default: int = 0) -> int:
+        with self._lock:
+            entry = self._entries.get(username.lower())
+            return entry["count"] if entry else default
+
+    def next_eligible(self, username: str) -> Optional[float]:
+        """Hesabın tekrar seçilebileceği zaman (epoch)"""
+        with self._lock:
+            entry = self._entries.get(username.lower())
+            return entry["next_at"] if entry else None
+
+    # ------------------------------------------------------------------
+    # Kayıt
+    # ------------------------------------------------------------------
+
+    _snapshot_label = "Target schedule"
+
+    def _snapshot(self) -> str:
+        return json.dumps({"targets": {name: dict(e) for name, e in self._entries.items()}}, indent=2)
+
+
+# Süreç genelinde tek sıra
+target_scheduler = TargetScheduler()
@@ -0,0 +1,18 @@
+"""Engaged index: başka sürecin etkileşimi tekrar yapılmaz"""
+from event_journal import EventJournal
+from engaged_index import EngagedIndex
+
+
+def test_engagement_from_other_process_is_seen(tmp_path):
+    index = EngagedIndex(EventJournal(tmp_path / "journal"), path=tmp_path / "engaged.json")
+    other = EventJournal(tmp_path / "journal")
+
+    index.journal.append("quote", original_tweet_id="1")
+    other.append("reply", original_tweet_id="2")
+    assert "2" in index
+
+    # Aradaki olay diskten okunduktan sonra kendi olayı bir kez uygulanır
+    other.append("reply", original_tweet_id="3")
+    index.journal.append("quote", original_tweet_id="4")
+    assert all(t in index for t in ("1", "2", "3", "4"))
+    assert len(index) == 4
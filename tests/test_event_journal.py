@@ -0,0 +1,50 @@
+"""Olay günlüğü: aynı dizine yazan birden fazla süreç"""
+import multiprocessing
+
+from config import config
+from event_journal import EventJournal
+
+WRITES = 300
+
+
+def _writer(directory: str, name: str):
+    journal = EventJournal(directory, segment_max_events=40)
+    for i in range(WRITES):
+        journal.append("tweet", writer=name, n=i)
+
+
+def test_two_processes_keep_seq_unique_across_rotation(tmp_path, monkeypatch):
+    # Sıkıştırma bu testte devre dışı; sadece yazma ve rotasyon
+    monkeypatch.setattr(config.journal, "compact_after_segments", 10_000)
+    ctx = multiprocessing.get_context("fork")
+    writers = [ctx.Process(target=_writer, args=(str(tmp_path), name)) for name in ("a", "b")]
+    for process in writers:
+        process.start()
+    for process in writers:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    journal = EventJournal(tmp_path, segment_max_events=40)
+    events = list(journal.iter_events())
+    seqs = [e["seq"] for e in events]
+
+    assert len(events) == 2 * WRITES
+    assert seqs == list(range(1, 2 * WRITES + 1))
+    assert journal.last_seq == 2 * WRITES
+    assert len(journal.after(WRITES)) == WRITES
+    for name in ("a", "b"):
+        assert [e["n"] for e in events if e["writer"] == name] == list(range(WRITES))
+
+
+def test_writer_continues_after_other_process_rotated(tmp_path):
+    first = EventJournal(tmp_path, segment_max_events=3)
+    second = EventJournal(tmp_path, segment_max_events=3)
+
+    first.append("tweet")
+    for _ in range(4):
+        second.append("reply")
+    event = first.append("tweet")
+
+    assert event["seq"] == 6
+    assert [e["seq"] for e in first.iter_events()] == [1, 2, 3, 4, 5, 6]
+    assert second.last_seq == 6
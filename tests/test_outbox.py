@@ -0,0 +1,64 @@
+"""Outbox: sonucu bilinmeyen thread tweet'i tekrar gönderilmez"""
+from types import SimpleNamespace
+
+import tweepy
+
+from config import config
+from event_journal import EventJournal
+from outbox import Outbox, POSTED, POSTING, process_next, recover
+from x_poster import XPoster
+
+
+class AcceptThen5xxClient:
+    """fail_on'uncu tweet'i kabul eder ama 503 döner (X yazdı, yanıt kayboldu)"""
+
+    def __init__(self, fail_on: int):
+        self.fail_on = fail_on
+        self.calls = []
+
+    def create_tweet(self, text, in_reply_to_tweet_id=None):
+        tweet_id = str(100 + len(self.calls))
+        self.calls.append((tweet_id, text, in_reply_to_tweet_id))
+        if len(self.calls) == self.fail_on:
+            response = SimpleNamespace(status_code=503, reason="Service Unavailable", json=lambda: {})
+            raise tweepy.TwitterServerError(response)
+        return SimpleNamespace(data={"id": tweet_id})
+
+    def get_me(self, user_auth=True):
+        return SimpleNamespace(data=SimpleNamespace(id=1))
+
+    def get_users_tweets(self, user_id, max_results=10, user_auth=True):
+        tweets = [SimpleNamespace(id=i, text=t) for i, t, _ in reversed(self.calls)]
+        return SimpleNamespace(data=tweets[:max_results])
+
+
+def _poster(tmp_path, client) -> XPoster:
+    poster = object.__new__(XPoster)
+    poster.client = client
+    poster.journal = EventJournal(tmp_path / "journal")
+    poster.checkpoint_file = tmp_path / "thread_checkpoints.json"
+    poster.can_post = lambda: (True, "OK")
+    return poster
+
+
+def test_thread_5xx_mid_way_is_left_for_recovery(tmp_path, monkeypatch):
+    client = AcceptThen5xxClient(fail_on=2)
+    poster = _poster(tmp_path, client)
+    box = Outbox(tmp_path / "outbox.db")
+    box.enqueue("thread", ["1/ first", "2/ second", "3/ third"], "en", reddit_post_id="p1")
+
+    assert process_next(box, poster) is None
+    assert box.counts()[POSTING] == 1
+    # Bir sonraki boşaltma öğeyi tekrar almaz
+    assert process_next(box, poster) is None
+    assert len(client.calls) == 2
+
+    # Sahiplenme eskidi: X'e ulaşan ikinci tweet checkpoint'e eklenir
+    monkeypatch.setattr(config.schedule, "cycle_timeout_minutes", 0)
+    recover(box, poster)
+    item = process_next(box, poster)
+
+    assert item is not None and item.state == POSTED
+    assert [text for _, text, _ in client.calls] == ["1/ first", "2/ second", "3/ third"]
+    assert client.calls[2][2] == "101"
+    assert item.tweet_ids == ["100", "101", "102"]
@@ -0,0 +1,35 @@
+"""Kota: aynı günlüğe yazan iki süreç"""
+from config import config
+from event_journal import EventJournal
+from quota import POSTS, QuotaManager
+
+
+def _manager(tmp_path, name: str) -> QuotaManager:
+    # Her "süreç" kendi günlük nesnesi ve anlık görüntüsüyle
+    return QuotaManager(EventJournal(tmp_path / "journal"), path=tmp_path / f"quota_{name}.json")
+
+
+def test_two_managers_see_each_others_posts(tmp_path, monkeypatch):
+    monkeypatch.setattr(config.tweet, "max_daily_tweets", 3)
+    scheduler = _manager(tmp_path, "scheduler")
+    cli = _manager(tmp_path, "cli")
+
+    scheduler.journal.append("tweet")
+    cli.journal.append("thread")
+    scheduler.journal.append("tweet")
+
+    assert scheduler.count(POSTS) == 3
+    assert cli.count(POSTS) == 3
+    assert not cli.allows(POSTS)
+    assert not scheduler.allows(POSTS)
+
+
+def test_restart_does_not_trust_snapshot_behind_journal(tmp_path):
+    first = _manager(tmp_path, "a")
+    first.journal.append("tweet")
+    first.flush()
+    EventJournal(tmp_path / "journal").append("reply")
+
+    restarted = QuotaManager(EventJournal(tmp_path / "journal"), path=tmp_path / "quota_a.json")
+    snapshot = restarted.snapshot()
+    assert (snapshot[POSTS], snapshot["reply"]) == (1, 1)
@@ -0,0 +1,23 @@
+"""Rate limit kaydı: ertelenmiş, atomik yazma"""
+import json
+
+from config import config
+from rate_limits import RateLimitRegistry
+
+HEADERS = {"x-rate-limit-limit": "50", "x-rate-limit-remaining": "49", "x-rate-limit-reset": "9999999999"}
+
+
+def test_updates_are_batched_into_one_atomic_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(config.journal, "flush_seconds", 3600)
+    registry = RateLimitRegistry(path=tmp_path / "rate_limits.json")
+
+    registry.update("POST /2/tweets", HEADERS)
+    registry.update("GET /2/users/:id/tweets", dict(HEADERS, **{"x-rate-limit-remaining": "10"}))
+    assert not registry.path.exists()
+
+    registry.flush()
+    endpoints = json.loads(registry.path.read_text())["endpoints"]
+    assert endpoints["POST /2/tweets"]["remaining"] == 49
+    assert endpoints["GET /2/users/:id/tweets"]["remaining"] == 10
+    assert list(tmp_path.iterdir()) == [registry.path]
+    assert RateLimitRegistry(path=registry.path).headroom()["POST /2/tweets"]["remaining"] == 49
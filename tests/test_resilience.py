@@ -0,0 +1,36 @@
+"""Circuit breaker: HALF_OPEN'da tek deneme çağrısı"""
+import pytest
+
+from resilience import CLOSED, HALF_OPEN, CircuitBreaker, RetryPolicy, breakers, call
+
+
+def _tripped(name: str) -> CircuitBreaker:
+    breaker = CircuitBreaker(name, failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    return breaker
+
+
+def test_half_open_admits_single_probe():
+    breaker = _tripped("probe")
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_permanent_error_releases_probe(monkeypatch):
+    breaker = _tripped("permanent")
+    monkeypatch.setitem(breakers._breakers, "permanent", breaker)
+
+    def bad_request():
+        raise ValueError("400")
+
+    with pytest.raises(ValueError):
+        call("permanent", bad_request, policy=RetryPolicy(max_attempts=1))
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
@@ -0,0 +1,44 @@
+"""Slot planı: döngü süresi ve gece yarısı çakışmaları"""
+import pytest
+
+import slot_planner
+from config import config
+
+
+@pytest.fixture
+def schedule(monkeypatch):
+    monkeypatch.setattr(config.schedule, "cycle_timeout_minutes", 20)
+
+    def configure(en, tr=(), engagement=()):
+        monkeypatch.setattr(config.schedule, "schedule_en", list(en))
+        monkeypatch.setattr(config.schedule, "schedule_tr", list(tr))
+        monkeypatch.setattr(config.schedule, "engagement_schedule", list(engagement))
+    return configure
+
+
+def _slots(plan):
+    return [(slot.time, [f"{a.kind}/{a.language}" for a in slot.actions]) for slot in plan]
+
+
+def test_stagger_waits_for_previous_cycle_timeout(schedule):
+    schedule(en=["09:00", "09:15"])
+    plan = slot_planner.build_plan(policy=slot_planner.STAGGER, min_gap=10)
+    assert [slot.time for slot in plan] == ["09:00", "09:20"]
+
+
+def test_combined_slot_occupies_one_timeout_per_leg(schedule):
+    schedule(en=["09:00", "09:30"], engagement=["09:00"])
+    plan = slot_planner.build_plan(policy=slot_planner.MERGE, min_gap=10)
+    assert _slots(plan) == [("09:00", ["original/en", "engagement/tr", "original/en"])]
+
+
+def test_stagger_wraps_at_midnight(schedule):
+    schedule(en=["23:55", "00:05"], tr=["12:00"])
+    plan = slot_planner.build_plan(policy=slot_planner.STAGGER, min_gap=10)
+    assert [slot.time for slot in plan] == ["00:15", "12:00", "23:55"]
+
+
+def test_merge_wraps_at_midnight(schedule):
+    schedule(en=["23:55", "00:05"], tr=["12:00"])
+    plan = slot_planner.build_plan(policy=slot_planner.MERGE, min_gap=10)
+    assert _slots(plan) == [("12:00", ["original/tr"]), ("23:55", ["original/en", "original/en"])]
@@ -0,0 +1,23 @@
+"""Thread numaralandırma düzeltmesi"""
+from tweet_generator import TweetGenerator
+
+
+def _fix(tweet: str, index: int = 1, total: int = 5) -> str:
+    # _fix_numbering istemci kullanmaz; OpenAI kurulumu gerekmez
+    return TweetGenerator._fix_numbering(object.__new__(TweetGenerator), tweet, index, total)
+
+
+def test_fix_numbering_keeps_single_thread_marker():
+    assert _fix("🧵 1/ Most people get this wrong") == "🧵 1/ Most people get this wrong"
+
+
+def test_fix_numbering_keeps_numbers_in_content():
+    assert _fix("24/7 hustle is a lie") == "🧵 1/ 24/7 hustle is a lie"
+
+
+def test_fix_numbering_replaces_wrong_number():
+    assert _fix("3/5 Second point", index=2) == "2/ Second point"
+
+
+def test_fix_numbering_keeps_leading_number_after_marker():
+    assert _fix("1/ 5 reasons you fail") == "🧵 1/ 5 reasons you fail"
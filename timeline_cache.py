@@ -0,0 +1,121 @@
+"""
+Timeline Cache - Hedef hesap zaman akışları için yerel önbellek
+Hesap başına since_id imleci ve sınırlı tweet penceresi; penceredeki
+tweetlerin metrikleri toplu sorguyla (istek başına 100 tweet) tazelenir
+"""
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from loguru import logger
+import tweepy
+
+from config import config, DATA_DIR
+from user_cache import _chunks
+
+
+class TimelineCache:
+    """
+    {user_id: {"since_id", "fetched_at", "tweets": [en yeniden eskiye]}}
+
+    Yenilemede sadece since_id'den yeni tweetler istenir ve pencereye
+    eklenir; pencere timeline_window tweet ile sınırlıdır.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DATA_DIR / "timelines.json"
+        self._lock = threading.Lock()
+        self._timelines: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        if self.path.exists():
+            try:
+                return json.loads(self.path.read_text()).get("timelines", {})
+            except Exception as e:
+                logger.warning(f"Timeline cache could not be loaded: {e}")
+        return {}
+
+    def _save(self):
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"timelines": self._timelines}, ensure_ascii=False))
+        tmp.replace(self.path)
+
+    def since_id(self, user_id: str) -> Optional[str]:
+        """Bu hesap için görülen en yeni tweet ID'si"""
+        with self._lock:
+            return self._timelines.get(str(user_id), {}).get("since_id")
+
+    def is_fresh(self, user_id: str, max_age_minutes: Optional[int] = None) -> bool:
+        """Son yenileme max_age_minutes içinde mi"""
+        max_age_minutes = config.engagement.timeline_refresh_minutes if max_age_minutes is None else max_age_minutes
+        with self._lock:
+            fetched_at = self._timelines.get(str(user_id), {}).get("fetched_at")
+        if not fetched_at:
+            return False
+        return datetime.fromisoformat(fetched_at) > datetime.now() - timedelta(minutes=max_age_minutes)
+
+    def merge(self, user_id: str, tweets: List[dict]) -> List[dict]:
+        """
+        Yeni tweetleri pencereye ekle, imleci ilerlet
+
+        Args:
+            tweets: API'den gelen yeni tweetler (herhangi bir sırada)
+
+        Returns:
+            Güncel pencere (en yeniden eskiye)
+        """
+        user_id = str(user_id)
+        with self._lock:
+            timeline = self._timelines.setdefault(user_id, {"since_id": None, "tweets": []})
+            # Bilinen tweet tekrar gelirse güncel metrikleri yazılır
+            by_id = {t["id"]: t for t in timeline["tweets"]}
+            for tweet in tweets:
+                by_id[tweet["id"]] = {**by_id.get(tweet["id"], {}), **tweet}
+
+            window = list(by_id.values())
+            window.sort(key=lambda t: int(t["id"]), reverse=True)
+            timeline["tweets"] = window[:config.engagement.timeline_window]
+            if window:
+                timeline["since_id"] = window[0]["id"]
+            timeline["fetched_at"] = datetime.now().isoformat()
+            self._save()
+            return list(timeline["tweets"])
+
+    def refresh_metrics(self, client: tweepy.Client, tweet_ids: List[str]) -> Dict[str, dict]:
+        """
+        Penceredeki tweetlerin public_metrics'ini toplu tazele
+
+        since_id yüzünden bilinen tweetler zaman akışında bir daha gelmez;
+        metrikler ilk görüldüğü anda donmasın diye GET /2/tweets?ids= ile
+        (istek başına 100 ID) yeniden okunur.
+
+        Returns:
+            {tweet_id: public_metrics} - dönmeyen (silinmiş) tweetler hariç
+        """
+        metrics = {}
+        for batch in _chunks(list(dict.fromkeys(str(i) for i in tweet_ids))):
+            try:
+                response = client.get_tweets(ids=batch, tweet_fields=["public_metrics"])
+            except tweepy.TweepyException as e:
+                logger.error(f"Tweet metrics refresh failed ({len(batch)} ids): {e}")
+                continue
+            for tweet in response.data or []:
+                metrics[str(tweet.id)] = tweet.public_metrics or {}
+
+        with self._lock:
+            for timeline in self._timelines.values():
+                for tweet in timeline["tweets"]:
+                    if tweet["id"] in metrics:
+                        tweet["metrics"] = metrics[tweet["id"]]
+            if metrics:
+                self._save()
+        return metrics
+
+    def recent(self, user_id: str, count: int) -> List[dict]:
+        """Önbellekteki son count tweet"""
+        with self._lock:
+            return list(self._timelines.get(str(user_id), {}).get("tweets", [])[:count])
+
+
+# Süreç genelinde tek önbellek
+timelines = TimelineCache()
@@ -2,13 +2,25 @@
 Tweet Generator - Hurricane Notları Stratejisi
 Duygusal tetikleyiciler ile viral tweet oluşturma
 """
+import contextvars
+import json
 import random
+import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List
 from loguru import logger
 import openai
 
 from config import config
+from model_router import ModelRouter
+from resilience import check_deadline
 from reddit_scraper import RedditPost
+from tweet_templates import render_template_tweet
+from tweet_text import MAX_TWEET_WEIGHT, weighted_length, truncate_weighted
+
+# Thread tweet numaralandırması: tek başına duran "1/", "2/5" vb. ("24/7" değil)
+# Toplam sadece eğik çizgiye bitişikse ("3/5"); "1/ 5 reasons" içerikteki sayıdır
+_THREAD_NUMBER_RE = re.compile(r"^(\d+)/(\d+)?(?=\s|$)")
 
 
 class TweetGenerator:
@@ -23,8 +35,11 @@ class TweetGenerator:
     """
     
     def __init__(self):
-        self.client = openai.OpenAI(api_key=config.openai.api_key)
-        self.model = config.openai.model
+        base_url = config.openai.base_url or None
+        # Tekrar denemeleri resilience katmanı yapar
+        self.client = openai.OpenAI(api_key=config.openai.api_key, base_url=base_url, max_retries=0)
+        self.async_client = openai.AsyncOpenAI(api_key=config.openai.api_key, base_url=base_url, max_retries=0)
+        self.router = ModelRouter(self.client, async_client=self.async_client)
     
     def _get_system_prompt(self, language: str) -> str:
         """Sistem prompt'u oluştur - Hurricane stratejisi ile"""
@@ -127,60 +142,262 @@ Goal: Make readers spend 5+ seconds on the tweet."""
     def generate_tweet(
         self, 
         post: RedditPost, 
-        language: str = "tr"
+        language: str = "tr",
+        recent_texts: Optional[List[str]] = None,
+        n: Optional[int] = None
     ) -> Optional[str]:
         """
         Reddit postundan tweet oluştur
         
+        Tek çağrıda config.tweet.variant_count varyant istenir,
+        en iyisi yerelde puanlanarak seçilir.
+        
         Args:
             post: Reddit post
             language: 'tr' veya 'en'
+            recent_texts: Son paylaşılan tweet'ler (benzerlik cezası için)
+            n: Varyant sayısı (varsayılan: config.tweet.variant_count)
             
         Returns:
             Tweet metni veya None
         """
+        check_deadline("generate tweet")
+        if self._should_skip_llm():
+            return self.generate_template_tweet(post, language)
+        
+        variants = self.generate_tweet_variants(
+            post,
+            language,
+            n=n or config.tweet.variant_count,
+            timeout=config.openai.generation_deadline_seconds
+        )
+        
+        if not variants and config.tweet.use_template_fallback:
+            logger.warning("LLM generation failed, using template fallback")
+            return self.generate_template_tweet(post, language)
+        
+        return self._pick_tweet(variants, language, recent_texts)
+    
+    def _should_skip_llm(self) -> bool:
+        """Breaker açıksa LLM'i hiç deneme, doğrudan şablona geç"""
+        if config.tweet.use_template_fallback and self.router.is_circuit_open("tweet"):
+            logger.warning("LLM circuit open, using template fallback")
+            return True
+        return False
+    
+    def generate_template_tweet(self, post: RedditPost, language: str = "tr") -> str:
+        """Yerel, deterministik şablon tweet'i (API çağrısı yok)"""
+        tweet_text = self._finalize_tweet(render_template_tweet(post, language), language)
+        logger.info(f"Generated template tweet ({weighted_length(tweet_text)} chars)")
+        return tweet_text
+    
+    async def agenerate_tweet(
+        self,
+        post: RedditPost,
+        language: str = "tr",
+        recent_texts: Optional[List[str]] = None,
+        n: Optional[int] = None
+    ) -> Optional[str]:
+        """generate_tweet'in async versiyonu (AsyncOpenAI)"""
+        check_deadline("generate tweet")
+        if self._should_skip_llm():
+            return self.generate_template_tweet(post, language)
+        
+        n = max(1, n or config.tweet.variant_count)
         try:
-            logger.info(f"Generating {language.upper()} tweet for: {post.title[:50]}...")
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                max_tokens=300,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._get_system_prompt(language)
-                    },
-                    {
-                        "role": "user",
-                        "content": self._get_user_prompt(post, language)
-                    }
-                ]
+            logger.info(f"Generating {n} {language.upper()} tweet variant(s) for: {post.title[:50]}...")
+            response = await self.router.acomplete(
+                "tweet",
+                n=n,
+                timeout=config.openai.generation_deadline_seconds,
+                messages=self._tweet_messages(post, language)
             )
+            variants = self._variant_texts(response)
+        except Exception as e:
+            logger.error(f"Error generating tweet: {e}")
+            variants = []
+        
+        if not variants and config.tweet.use_template_fallback:
+            logger.warning("LLM generation failed, using template fallback")
+            return self.generate_template_tweet(post, language)
+        
+        return self._pick_tweet(variants, language, recent_texts)
+    
+    def generate_tweets(
+        self,
+        posts: List[RedditPost],
+        language: str = "tr",
+        recent_texts: Optional[List[str]] = None,
+        max_workers: int = 4
+    ) -> List[Optional[str]]:
+        """
+        Birden fazla post için tweet üret (paralel, sıra korunur)
+        
+        Returns:
+            Her post için tweet metni veya None
+        """
+        # Döngü son tarihi işçi thread'lere taşınsın (görev başına bağlam kopyası)
+        contexts = [contextvars.copy_context() for _ in posts]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(
+                lambda ctx, p: ctx.run(self.generate_tweet, p, language, recent_texts), contexts, posts
+            ))
+    
+    def _pick_tweet(
+        self,
+        variants: List[str],
+        language: str,
+        recent_texts: Optional[List[str]]
+    ) -> Optional[str]:
+        """Varyantlardan en iyisini seçip son haline getir"""
+        if not variants:
+            return None
+        
+        tweet_text = self.select_best_variant(variants, language, recent_texts)
+        tweet_text = self._finalize_tweet(tweet_text, language)
+        
+        logger.info(f"Generated tweet ({weighted_length(tweet_text)} chars)")
+        return tweet_text
+    
+    def _tweet_messages(self, post: RedditPost, language: str) -> List[dict]:
+        """Tek tweet üretimi için chat mesajları"""
+        return [
+            {
+                "role": "system",
+                "content": self._get_system_prompt(language)
+            },
+            {
+                "role": "user",
+                "content": self._get_user_prompt(post, language)
+            }
+        ]
+    
+    @staticmethod
+    def _variant_texts(response) -> List[str]:
+        """Completion choice'larından boş olmayan metinler"""
+        return [
+            choice.message.content.strip()
+            for choice in response.choices
+            if choice.message.content and choice.message.content.strip()
+        ]
+    
+    def generate_tweet_variants(
+        self,
+        post: RedditPost,
+        language: str = "tr",
+        n: int = 3,
+        timeout: Optional[float] = None
+    ) -> List[str]:
+        """
+        Tek completion çağrısında n farklı tweet varyantı üret
+        
+        Args:
+            timeout: Tüm denemeler için süre sınırı (saniye)
+        
+        Returns:
+            Varyant listesi (hata durumunda boş)
+        """
+        try:
+            logger.info(f"Generating {n} {language.upper()} tweet variant(s) for: {post.title[:50]}...")
             
-            tweet_text = response.choices[0].message.content.strip()
-            
-            # Tweet uzunluk kontrolü
-            if len(tweet_text) > 260:
-                logger.warning(f"Tweet too long ({len(tweet_text)} chars), truncating...")
-                tweet_text = tweet_text[:257] + "..."
-            
-            # Hurricane: Hashtag kullanma (varsayılan kapalı)
-            if config.tweet.use_hashtags:
-                hashtags = self._get_hashtags(language)
-                max_hashtag_len = 280 - len(tweet_text) - 2
-                hashtag_str = ""
-                for tag in hashtags:
-                    if len(hashtag_str) + len(tag) + 1 <= max_hashtag_len:
-                        hashtag_str += f" {tag}"
-                
-                tweet_text = f"{tweet_text}{hashtag_str}"
+            response = self.router.complete(
+                "tweet",
+                n=max(1, n),
+                timeout=timeout,
+                messages=self._tweet_messages(post, language)
+            )
             
-            logger.info(f"Generated tweet ({len(tweet_text)} chars)")
-            return tweet_text
+            return self._variant_texts(response)
             
         except Exception as e:
             logger.error(f"Error generating tweet: {e}")
-            return None
+            return []
+    
+    def _score_variant(
+        self,
+        text: str,
+        language: str,
+        recent_word_sets: List[set]
+    ) -> float:
+        """
+        Varyantı yerel kurallara göre puanla
+        
+        - Uzunluk uyumu (ağırlıklı, 180-260 ideal)
+        - Hashtag kuralı (Hurricane: kapalıysa ceza)
+        - Emoji kuralı (1-2 ideal)
+        - Duygusal tetikleyici kullanımı
+        - Son tweet'lere benzerlik cezası
+        """
+        score = 0.0
+        
+        length = weighted_length(text)
+        if length > 260:
+            score -= 1.0 + (length - 260) / 40
+        elif length >= 180:
+            score += 1.0
+        else:
+            score += length / 180
+        
+        hashtag_count = len(re.findall(r"(?<!\w)#\w+", text))
+        if hashtag_count and not config.tweet.use_hashtags:
+            score -= 0.5 * hashtag_count
+        
+        emoji_count = sum(1 for c in text if ord(c) >= 0x1F000 or 0x2600 <= ord(c) <= 0x27BF)
+        if 1 <= emoji_count <= 2:
+            score += 0.5
+        elif emoji_count > 2:
+            score -= 0.25 * (emoji_count - 2)
+        
+        triggers = config.tweet.emotional_triggers_tr if language == "tr" else config.tweet.emotional_triggers_en
+        lowered = text.lower()
+        if any(trigger.lower() in lowered for trigger in triggers):
+            score += 0.5
+        
+        if recent_word_sets:
+            words = set(re.findall(r"\w+", lowered))
+            similarity = max(
+                (len(words & other) / len(words | other) for other in recent_word_sets if words | other),
+                default=0.0
+            )
+            score -= 2.0 * similarity
+        
+        return score
+    
+    def select_best_variant(
+        self,
+        variants: List[str],
+        language: str,
+        recent_texts: Optional[List[str]] = None
+    ) -> str:
+        """Varyantlar arasından en yüksek puanlıyı seç (API çağrısı yok)"""
+        recent_word_sets = [set(re.findall(r"\w+", t.lower())) for t in (recent_texts or [])]
+        
+        scored = [(self._score_variant(v, language, recent_word_sets), i, v) for i, v in enumerate(variants)]
+        best_score, best_index, best = max(scored, key=lambda item: (item[0], -item[1]))
+        
+        if len(variants) > 1:
+            logger.debug(f"Selected variant {best_index + 1}/{len(variants)} (score {best_score:.2f})")
+        return best
+    
+    def _finalize_tweet(self, tweet_text: str, language: str) -> str:
+        """Uzunluk kontrolü ve opsiyonel hashtag ekleme"""
+        # Tweet uzunluk kontrolü
+        if weighted_length(tweet_text) > 260:
+            logger.warning(f"Tweet too long ({weighted_length(tweet_text)} chars), truncating...")
+            tweet_text = truncate_weighted(tweet_text, 260)
+        
+        # Hurricane: Hashtag kullanma (varsayılan kapalı)
+        if config.tweet.use_hashtags:
+            hashtags = self._get_hashtags(language)
+            max_hashtag_len = MAX_TWEET_WEIGHT - weighted_length(tweet_text) - 2
+            hashtag_str = ""
+            for tag in hashtags:
+                if weighted_length(hashtag_str) + weighted_length(tag) + 1 <= max_hashtag_len:
+                    hashtag_str += f" {tag}"
+            
+            tweet_text = f"{tweet_text}{hashtag_str}"
+        
+        return tweet_text
     
     def _get_hashtags(self, language: str, count: int = 2) -> list:
         """Rastgele hashtag seç (opsiyonel kullanım)"""
@@ -191,25 +408,10 @@ Goal: Make readers spend 5+ seconds on the tweet."""
         
         return random.sample(tags, min(count, len(tags)))
     
-    def generate_quote_comment(
-        self,
-        original_tweet: str,
-        language: str = "tr"
-    ) -> Optional[str]:
-        """
-        Quote tweet için yorum oluştur
-        
-        Hurricane: Büyük hesapları quote'larken akıllı yorum
-        
-        Args:
-            original_tweet: Alıntılanacak tweet metni
-            language: 'tr' veya 'en'
-            
-        Returns:
-            Quote yorumu veya None
-        """
+    def _quote_prompt(self, original_tweet: str, language: str) -> str:
+        """Quote yorumu prompt'u"""
         if language == "tr":
-            prompt = f"""Aşağıdaki tweet'i quote (alıntı) yapıyorsun. Uygun bir yorum yaz.
+            return f"""Aşağıdaki tweet'i quote (alıntı) yapıyorsun. Uygun bir yorum yaz.
 
 Orijinal tweet: "{original_tweet}"
 
@@ -223,7 +425,7 @@ KURALLAR:
 
 Sadece yorum metnini yaz:"""
         else:
-            prompt = f"""You're quoting the following tweet. Write an appropriate comment.
+            return f"""You're quoting the following tweet. Write an appropriate comment.
 
 Original tweet: "{original_tweet}"
 
@@ -236,12 +438,29 @@ RULES:
 6. DO NOT use hashtags
 
 Write only the comment text:"""
+    
+    def generate_quote_comment(
+        self,
+        original_tweet: str,
+        language: str = "tr"
+    ) -> Optional[str]:
+        """
+        Quote tweet için yorum oluştur
         
+        Hurricane: Büyük hesapları quote'larken akıllı yorum
+        
+        Args:
+            original_tweet: Alıntılanacak tweet metni
+            language: 'tr' veya 'en'
+            
+        Returns:
+            Quote yorumu veya None
+        """
+        check_deadline("generate quote")
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                max_tokens=150,
-                messages=[{"role": "user", "content": prompt}]
+            response = self.router.complete(
+                "quote",
+                messages=[{"role": "user", "content": self._quote_prompt(original_tweet, language)}]
             )
             
             comment = response.choices[0].message.content.strip()
@@ -255,23 +474,34 @@ Write only the comment text:"""
             logger.error(f"Error generating quote comment: {e}")
             return None
     
-    def generate_reply(
+    async def agenerate_quote_comment(
         self,
         original_tweet: str,
         language: str = "tr"
     ) -> Optional[str]:
-        """
-        Tweet'e reply oluştur
-        
-        Args:
-            original_tweet: Yanıtlanacak tweet metni
-            language: 'tr' veya 'en'
+        """generate_quote_comment'in async versiyonu (AsyncOpenAI)"""
+        check_deadline("generate quote")
+        try:
+            response = await self.router.acomplete(
+                "quote",
+                messages=[{"role": "user", "content": self._quote_prompt(original_tweet, language)}]
+            )
             
-        Returns:
-            Reply metni veya None
-        """
+            comment = response.choices[0].message.content.strip()
+            
+            if len(comment) > 200:
+                comment = comment[:197] + "..."
+            
+            return comment
+            
+        except Exception as e:
+            logger.error(f"Error generating quote comment: {e}")
+            return None
+    
+    def _reply_prompt(self, original_tweet: str, language: str) -> str:
+        """Reply prompt'u"""
         if language == "tr":
-            prompt = f"""Aşağıdaki tweet'e yanıt yazıyorsun. Akıllı ve değer katan bir yanıt yaz.
+            return f"""Aşağıdaki tweet'e yanıt yazıyorsun. Akıllı ve değer katan bir yanıt yaz.
 
 Tweet: "{original_tweet}"
 
@@ -285,7 +515,7 @@ KURALLAR:
 
 Sadece yanıt metnini yaz:"""
         else:
-            prompt = f"""You're replying to the following tweet. Write a smart, value-adding reply.
+            return f"""You're replying to the following tweet. Write a smart, value-adding reply.
 
 Tweet: "{original_tweet}"
 
@@ -298,12 +528,51 @@ RULES:
 6. You can use emojis (1-2)
 
 Write only the reply text:"""
+    
+    def generate_reply(
+        self,
+        original_tweet: str,
+        language: str = "tr"
+    ) -> Optional[str]:
+        """
+        Tweet'e reply oluştur
         
+        Args:
+            original_tweet: Yanıtlanacak tweet metni
+            language: 'tr' veya 'en'
+            
+        Returns:
+            Reply metni veya None
+        """
+        check_deadline("generate reply")
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                max_tokens=200,
-                messages=[{"role": "user", "content": prompt}]
+            response = self.router.complete(
+                "reply",
+                messages=[{"role": "user", "content": self._reply_prompt(original_tweet, language)}]
+            )
+            
+            reply = response.choices[0].message.content.strip()
+            
+            if len(reply) > 240:
+                reply = reply[:237] + "..."
+            
+            return reply
+            
+        except Exception as e:
+            logger.error(f"Error generating reply: {e}")
+            return None
+    
+    async def agenerate_reply(
+        self,
+        original_tweet: str,
+        language: str = "tr"
+    ) -> Optional[str]:
+        """generate_reply'ın async versiyonu (AsyncOpenAI)"""
+        check_deadline("generate reply")
+        try:
+            response = await self.router.acomplete(
+                "reply",
+                messages=[{"role": "user", "content": self._reply_prompt(original_tweet, language)}]
             )
             
             reply = response.choices[0].message.content.strip()
@@ -334,6 +603,7 @@ Write only the reply text:"""
         Returns:
             Tweet listesi
         """
+        check_deadline("generate thread")
         if language == "tr":
             thread_prompt = f"""Reddit'te popüler olan bu konudan {tweet_count} tweet'lik bir thread oluştur:
 
@@ -357,7 +627,8 @@ KURALLAR:
 4. HASHTAG KULLANMA
 
 FORMAT:
-Her tweet'i yeni satırda yaz, aralarında boş satır bırak."""
+Sadece JSON döndür: {{"tweets": ["1/ ...", "2/ ...", ...]}}
+"tweets" dizisinde tam {tweet_count} eleman olmalı."""
 
         else:
             thread_prompt = f"""Create a {tweet_count}-tweet thread from this popular Reddit topic:
@@ -382,26 +653,159 @@ RULES:
 4. DO NOT use hashtags
 
 FORMAT:
-Write each tweet on a new line, with blank lines between."""
+Return only JSON: {{"tweets": ["1/ ...", "2/ ...", ...]}}
+The "tweets" array must have exactly {tweet_count} items."""
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                max_tokens=1500,
+            response = self.router.complete(
+                "thread",
+                response_format={"type": "json_object"},
                 messages=[
                     {"role": "user", "content": thread_prompt}
                 ]
             )
             
             text = response.choices[0].message.content.strip()
-            tweets = [t.strip() for t in text.split("\n\n") if t.strip()]
-            
-            logger.info(f"Generated thread with {len(tweets)} tweets")
-            return tweets[:tweet_count]
+            tweets = self._parse_thread(text)
             
         except Exception as e:
             logger.error(f"Error generating thread: {e}")
             return []
+        
+        if not tweets:
+            logger.error("Thread output could not be parsed")
+            return []
+        
+        tweets = self._validate_thread(post, tweets[:tweet_count], language, tweet_count)
+        
+        logger.info(f"Generated thread with {len(tweets)} tweets")
+        return tweets
+    
+    def _parse_thread(self, text: str) -> List[str]:
+        """
+        Thread çıktısını parse et
+        
+        JSON bekleniyor; bozuksa eski boş satır formatına düş.
+        """
+        try:
+            data = json.loads(text)
+            items = data.get("tweets", []) if isinstance(data, dict) else data
+            if isinstance(items, list):
+                return [str(t).strip() for t in items if str(t).strip()]
+        except (json.JSONDecodeError, AttributeError):
+            logger.warning("Thread JSON invalid, falling back to plain-text split")
+        
+        return [t.strip() for t in text.split("\n\n") if t.strip()]
+    
+    def _thread_problem(self, tweet: str) -> Optional[str]:
+        """Thread tweet'i geçersizse nedeni, geçerliyse None"""
+        if not tweet:
+            return "missing"
+        if weighted_length(tweet) > MAX_TWEET_WEIGHT:
+            return f"too long ({weighted_length(tweet)}/{MAX_TWEET_WEIGHT})"
+        return None
+    
+    def _fix_numbering(self, tweet: str, index: int, total: int) -> str:
+        """Numaralandırmayı yerel olarak düzelt (API çağrısı yok)"""
+        body = tweet.strip()
+        if body.startswith("🧵"):
+            body = body[1:].lstrip()
+        # Sadece thread numarası gibi duran öneki sil (N <= toplam)
+        match = _THREAD_NUMBER_RE.match(body)
+        if match and int(match.group(1)) <= total:
+            body = body[match.end():].strip()
+        fixed = f"{index}/ {body}"
+        if index == 1 and "🧵" not in fixed:
+            fixed = f"🧵 {fixed}"
+        return fixed
+    
+    def _validate_thread(
+        self,
+        post: RedditPost,
+        tweets: List[str],
+        language: str,
+        tweet_count: int
+    ) -> List[str]:
+        """
+        Thread'i tweet tweet doğrula
+        
+        Numaralandırma yerelde düzeltilir; sadece uzun veya eksik
+        tweet'ler için küçük bir onarım çağrısı yapılır.
+        """
+        tweets = tweets + [""] * (tweet_count - len(tweets))
+        validated = []
+        
+        for i, tweet in enumerate(tweets, start=1):
+            if tweet:
+                tweet = self._fix_numbering(tweet, i, tweet_count)
+            
+            problem = self._thread_problem(tweet)
+            if problem:
+                logger.warning(f"Thread tweet {i}/{tweet_count} {problem}, repairing...")
+                previous = validated[-1] if validated else None
+                repaired = self._repair_thread_tweet(post, language, i, tweet_count, tweet, previous)
+                if repaired:
+                    tweet = self._fix_numbering(repaired, i, tweet_count)
+                
+                if not tweet:
+                    logger.warning(f"Thread tweet {i} could not be repaired, stopping thread")
+                    break
+                if self._thread_problem(tweet):
+                    tweet = truncate_weighted(tweet)
+            
+            validated.append(tweet)
+        
+        return validated
+    
+    def _repair_thread_tweet(
+        self,
+        post: RedditPost,
+        language: str,
+        index: int,
+        total: int,
+        tweet: str,
+        previous: Optional[str]
+    ) -> Optional[str]:
+        """Tek bir thread tweet'ini yeniden yaz (hedefli, düşük token)"""
+        limit = MAX_TWEET_WEIGHT - 20
+        if language == "tr":
+            prompt = f"""Bir X thread'inin {index}/{total}. tweet'ini yaz.
+
+Konu: {post.title}
+Önceki tweet: {previous or 'Yok (ilk tweet)'}
+Mevcut taslak: {tweet or 'Yok'}
+
+KURALLAR:
+1. Maksimum {limit} karakter
+2. "{index}/" ile başla
+3. HASHTAG KULLANMA
+
+Sadece tweet metnini yaz:"""
+        else:
+            prompt = f"""Write tweet {index}/{total} of an X thread.
+
+Topic: {post.title}
+Previous tweet: {previous or 'None (first tweet)'}
+Current draft: {tweet or 'None'}
+
+RULES:
+1. Maximum {limit} characters
+2. Start with "{index}/"
+3. DO NOT use hashtags
+
+Write only the tweet text:"""
+        
+        try:
+            response = self.router.complete(
+                "thread",
+                max_tokens=150,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            return response.choices[0].message.content.strip()
+            
+        except Exception as e:
+            logger.error(f"Error repairing thread tweet {index}: {e}")
+            return None
 
 
 # Test için
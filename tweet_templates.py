@@ -0,0 +1,64 @@
+"""
+Tweet Templates - LLM erişilemezken yerel tweet üretimi
+Deterministik şablon bankası (dil başına), RedditPost alanlarıyla doldurulur
+"""
+import zlib
+from typing import List
+
+from config import config
+from reddit_scraper import RedditPost
+from tweet_text import weighted_length, truncate_weighted
+
+# Şablonlar: {title}, {subreddit}, {score}, {comments}, {trigger}
+TEMPLATES_TR: List[str] = [
+    "Çoğu kişi bunu yanlış anlıyor 👇\n\n{title}\n\n{comments} kişi tartışıyor. Sence {trigger} için doğru yol bu mu?",
+    "Bunu bilmiyorsan {trigger} hedefinden uzaklaşıyorsun:\n\n{title}\n\nKatılıyor musun? 🤔",
+    "{score} kişi aynı fikirde:\n\n{title}\n\nAma asıl soru şu: {trigger} için kimse bunu konuşmuyor.",
+    "Herkes başka yere bakarken:\n\n{title}\n\n{trigger} isteyen herkes bunu düşünmeli 💡",
+    "Kaçırdığın fırsat bu olabilir 👀\n\n{title}\n\nSen olsan ne yapardın?",
+    "Tartışmalı ama gerçek:\n\n{title}\n\n{trigger} konusunda fikrini değiştirir mi? 🔥",
+]
+
+TEMPLATES_EN: List[str] = [
+    "Most people get this wrong 👇\n\n{title}\n\n{comments} people are debating it. Is this really the path to {trigger}?",
+    "If you don't know this, you're further from {trigger} than you think:\n\n{title}\n\nAgree? 🤔",
+    "{score} people agree on this:\n\n{title}\n\nBut nobody talks about what it means for {trigger}.",
+    "While everyone looks elsewhere:\n\n{title}\n\nAnyone chasing {trigger} should think about this 💡",
+    "This might be the opportunity you're missing 👀\n\n{title}\n\nWhat would you do?",
+    "Controversial but true:\n\n{title}\n\nDoes this change how you think about {trigger}? 🔥",
+]
+
+# Şablon tweet'leri için hedef uzunluk (generate_tweet ile aynı)
+TEMPLATE_MAX_WEIGHT = 260
+
+
+def _pick(items: List[str], key: str, salt: str) -> str:
+    """Aynı post için her zaman aynı seçim"""
+    return items[zlib.crc32(f"{salt}:{key}".encode()) % len(items)]
+
+
+def render_template_tweet(post: RedditPost, language: str = "tr") -> str:
+    """
+    Post'tan şablonla tweet üret (ağ çağrısı yok)
+
+    Başlık, tweet limite sığacak kadar kısaltılır.
+    """
+    templates = TEMPLATES_TR if language == "tr" else TEMPLATES_EN
+    triggers = config.tweet.emotional_triggers_tr if language == "tr" else config.tweet.emotional_triggers_en
+
+    template = _pick(templates, post.id, "template")
+    fields = {
+        "subreddit": post.subreddit,
+        "score": f"{post.score:,}",
+        "comments": f"{post.num_comments:,}",
+        "trigger": _pick(triggers, post.id, "trigger") if triggers else "",
+    }
+
+    shell = template.format(title="", **fields)
+    title_budget = TEMPLATE_MAX_WEIGHT - weighted_length(shell)
+    title = post.title.strip()
+    if weighted_length(title) > title_budget:
+        title = truncate_weighted(title, max(title_budget, 10), suffix="…")
+
+    text = template.format(title=title, **fields)
+    return truncate_weighted(text, TEMPLATE_MAX_WEIGHT)
@@ -0,0 +1,69 @@
+"""
+Tweet Text - X (Twitter) ağırlıklı karakter sayımı
+twitter-text v3 kurallarına göre uzunluk hesaplama
+"""
+import re
+
+# X limiti (ağırlıklı)
+MAX_TWEET_WEIGHT = 280
+
+# t.co ile kısaltılan her URL sabit 23 karakter sayılır
+URL_WEIGHT = 23
+
+# Ağırlığı 1 olan Unicode aralıkları, geri kalan her karakter 2 sayılır
+_LIGHT_RANGES = (
+    (0x0000, 0x10FF),
+    (0x2000, 0x200D),
+    (0x2010, 0x201F),
+    (0x2032, 0x2037),
+)
+
+_URL_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+
+
+def _char_weight(char: str) -> int:
+    """Tek karakterin ağırlığı"""
+    code = ord(char)
+    for start, end in _LIGHT_RANGES:
+        if start <= code <= end:
+            return 1
+    return 2
+
+
+def weighted_length(text: str) -> int:
+    """
+    Tweet'in X tarafından sayılan uzunluğu
+
+    Emoji ve CJK karakterler 2, URL'ler 23 sayılır.
+    """
+    length = 0
+    position = 0
+    for match in _URL_RE.finditer(text):
+        length += sum(_char_weight(c) for c in text[position:match.start()])
+        length += URL_WEIGHT
+        position = match.end()
+    length += sum(_char_weight(c) for c in text[position:])
+    return length
+
+
+def fits(text: str, limit: int = MAX_TWEET_WEIGHT) -> bool:
+    """Metin ağırlıklı limite sığıyor mu"""
+    return weighted_length(text) <= limit
+
+
+def truncate_weighted(text: str, limit: int = MAX_TWEET_WEIGHT, suffix: str = "...") -> str:
+    """Metni ağırlıklı limite sığacak şekilde kırp"""
+    if weighted_length(text) <= limit:
+        return text
+
+    budget = limit - weighted_length(suffix)
+    used = 0
+    cut = 0
+    for i, char in enumerate(text):
+        weight = _char_weight(char)
+        if used + weight > budget:
+            break
+        used += weight
+        cut = i + 1
+
+    return text[:cut].rstrip() + suffix
@@ -0,0 +1,172 @@
+"""
+Usage - OpenAI token ve X API kota muhasebesi
+Günlük/görev bazlı sayaçlar ve bütçe yöneticisi
+"""
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from loguru import logger
+import pytz
+
+from config import config, DATA_DIR
+from storage import WriteBehindSnapshot
+
+# Bütçe kararları
+BUDGET_OK = "ok"
+BUDGET_DEGRADE = "degrade"
+BUDGET_DEFER = "defer"
+
+# Kaç günlük kayıt tutulsun
+KEEP_DAYS = 14
+
+
+def local_now() -> datetime:
+    """Yapılandırılmış zaman diliminde şu an"""
+    return datetime.now(pytz.timezone(config.schedule.timezone))
+
+
+def today_key() -> str:
+    """Yapılandırılmış zaman diliminde bugünün tarihi (YYYY-MM-DD)"""
+    return local_now().strftime("%Y-%m-%d")
+
+
+def _empty_counter() -> dict:
+    return {"requests": 0, "errors": 0, "latency_total": 0.0, "prompt_tokens": 0, "completion_tokens": 0}
+
+
+class UsageLedger(WriteBehindSnapshot):
+    """
+    Süreç genelinde kullanım defteri
+
+    Her OpenAI completion ve tweepy isteği buraya kaydedilir:
+    {gün: {"openai": {görev: sayaç}, "x": {endpoint: sayaç}}}
+    Disk kaydı ertelenmiş ve atomiktir.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DATA_DIR / "usage.json"
+        self._lock = threading.Lock()
+        self._days: Dict[str, dict] = self._load()
+        self._init_snapshot()
+
+    def _load(self) -> Dict[str, dict]:
+        if self.path.exists():
+            try:
+                return json.loads(self.path.read_text()).get("days", {})
+            except Exception as e:
+                logger.warning(f"Usage ledger could not be loaded: {e}")
+        return {}
+
+    _snapshot_label = "Usage ledger"
+
+    def _snapshot(self) -> str:
+        cutoff = (local_now() - timedelta(days=KEEP_DAYS)).strftime("%Y-%m-%d")
+        for day in [d for d in self._days if d < cutoff]:
+            del self._days[day]
+        return json.dumps({"days": self._days}, indent=2)
+
+    def _counter(self, group: str, name: str) -> dict:
+        day = self._days.setdefault(today_key(), {"openai": {}, "x": {}})
+        return day[group].setdefault(name, _empty_counter())
+
+    def record_openai(self, task: str, model: str, latency: float, ok: bool, usage=None):
+        """Bir chat completion çağrısını kaydet"""
+        with self._lock:
+            counter = self._counter("openai", task)
+            counter["requests"] += 1
+            counter["latency_total"] += latency
+            if not ok:
+                counter["errors"] += 1
+            if usage is not None:
+                counter["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+                counter["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+            self._mark_dirty()
+
+    def record_x(self, endpoint: str, latency: float, ok: bool):
+        """Bir X API isteğini kaydet (endpoint: 'POST /2/tweets' gibi)"""
+        with self._lock:
+            counter = self._counter("x", endpoint)
+            counter["requests"] += 1
+            counter["latency_total"] += latency
+            if not ok:
+                counter["errors"] += 1
+            self._mark_dirty()
+
+    def day(self, date: Optional[str] = None) -> dict:
+        """Bir günün ham sayaçları"""
+        with self._lock:
+            return json.loads(json.dumps(self._days.get(date or today_key(), {"openai": {}, "x": {}})))
+
+    def totals(self, date: Optional[str] = None) -> dict:
+        """Günlük toplamlar: token, OpenAI isteği, X okuma/yazma"""
+        day = self.day(date)
+        openai_counters = day["openai"].values()
+        x_items = day["x"].items()
+        return {
+            "openai_requests": sum(c["requests"] for c in openai_counters),
+            "openai_tokens": sum(c["prompt_tokens"] + c["completion_tokens"] for c in openai_counters),
+            "x_reads": sum(c["requests"] for e, c in x_items if e.startswith("GET ")),
+            "x_writes": sum(c["requests"] for e, c in x_items if not e.startswith("GET ")),
+        }
+
+
+class BudgetGovernor:
+    """
+    Günlük bütçe yöneticisi
+
+    Eşik (degrade_ratio) aşılınca iş hafifletilir (ör. thread yerine tek tweet),
+    bütçe dolunca iş ertelenir. Hiçbir durumda hata fırlatılmaz.
+    """
+
+    def __init__(self, ledger: UsageLedger):
+        self.ledger = ledger
+
+    def _limits(self) -> Dict[str, int]:
+        cfg = config.budget
+        return {
+            "openai_tokens": cfg.daily_openai_tokens,
+            "openai_requests": cfg.daily_openai_requests,
+            "x_writes": cfg.daily_x_writes,
+            "x_reads": cfg.daily_x_reads,
+        }
+
+    def check(self, *resources: str) -> str:
+        """
+        Kaynaklar için bütçe kararı
+
+        Args:
+            resources: 'openai_tokens', 'openai_requests', 'x_writes', 'x_reads'
+
+        Returns:
+            'ok', 'degrade' veya 'defer'
+        """
+        totals = self.ledger.totals()
+        limits = self._limits()
+        decision = BUDGET_OK
+
+        for resource in resources or limits.keys():
+            limit = limits.get(resource, 0)
+            if limit <= 0:
+                continue
+            used = totals.get(resource, 0)
+            if used >= limit:
+                logger.warning(f"Budget exhausted: {resource} {used}/{limit}")
+                return BUDGET_DEFER
+            if used >= limit * config.budget.degrade_ratio:
+                decision = BUDGET_DEGRADE
+
+        return decision
+
+    def report(self) -> Dict[str, dict]:
+        """Kaynak bazlı kullanım / limit özeti"""
+        totals = self.ledger.totals()
+        return {
+            resource: {"used": totals.get(resource, 0), "limit": limit}
+            for resource, limit in self._limits().items()
+        }
+
+
+# Süreç genelinde tek defter
+ledger = UsageLedger()
+budget = BudgetGovernor(ledger)
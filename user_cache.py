@@ -0,0 +1,136 @@
+"""
+User Cache - Kalıcı username -> user ID önbelleği
+Toplu çözümleme (istek başına 100 kullanıcı) ve handle değişikliği tespiti
+"""
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+import tweepy
+
+from config import config, DATA_DIR
+
+# X v2 çoklu kullanıcı sorgusu limiti
+LOOKUP_BATCH = 100
+
+
+def _chunks(items: List[str], size: int = LOOKUP_BATCH):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class UserIdCache:
+    """
+    {user_id: {"username", "resolved_at"}} + username indeksi
+
+    ID değişmez, handle değişebilir; bu yüzden kayıtlar ID ile tutulur
+    ve yenilemede dönen username farklıysa değişiklik raporlanır.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DATA_DIR / "user_ids.json"
+        self._lock = threading.Lock()
+        self._users: Dict[str, dict] = self._load()
+        self._by_username: Dict[str, str] = {
+            u["username"].lower(): user_id for user_id, u in self._users.items()
+        }
+
+    def _load(self) -> Dict[str, dict]:
+        if self.path.exists():
+            try:
+                return json.loads(self.path.read_text()).get("users", {})
+            except Exception as e:
+                logger.warning(f"User ID cache could not be loaded: {e}")
+        return {}
+
+    def _save(self):
+        self.path.write_text(json.dumps({"users": self._users}, indent=2, ensure_ascii=False))
+
+    def _put(self, user_id: str, username: str) -> Optional[Tuple[str, str]]:
+        """Kaydı güncelle (kilit altında); handle değiştiyse (eski, yeni)"""
+        previous = self._users.get(user_id)
+        change = None
+        if previous and previous["username"].lower() != username.lower():
+            change = (previous["username"], username)
+            self._by_username.pop(previous["username"].lower(), None)
+        self._users[user_id] = {"username": username, "resolved_at": datetime.now().isoformat()}
+        self._by_username[username.lower()] = user_id
+        return change
+
+    def lookup(self, username: str) -> Optional[str]:
+        """Önbellekteki ID (ağ çağrısı yok)"""
+        with self._lock:
+            return self._by_username.get(username.lstrip("@").lower())
+
+    def username_for(self, user_id: str) -> Optional[str]:
+        with self._lock:
+            entry = self._users.get(str(user_id))
+            return entry["username"] if entry else None
+
+    def resolve(self, client: tweepy.Client, usernames: Iterable[str]) -> Dict[str, str]:
+        """
+        Username'leri ID'ye çevir; önbellekte olmayanlar toplu sorgulanır
+
+        Returns:
+            {username (küçük harf): user_id} - bulunamayanlar dahil edilmez
+        """
+        names = list(dict.fromkeys(u.lstrip("@").lower() for u in usernames))
+        with self._lock:
+            result = {n: self._by_username[n] for n in names if n in self._by_username}
+        missing = [n for n in names if n not in result]
+
+        for batch in _chunks(missing):
+            try:
+                response = client.get_users(usernames=batch)
+            except tweepy.TweepyException as e:
+                logger.error(f"User lookup failed ({len(batch)} usernames): {e}")
+                continue
+            with self._lock:
+                for user in response.data or []:
+                    self._put(str(user.id), user.username)
+                    result[user.username.lower()] = str(user.id)
+                self._save()
+
+        for name in missing:
+            if name not in result:
+                logger.warning(f"User not found: @{name}")
+        return result
+
+    def resolve_one(self, client: tweepy.Client, username: str) -> Optional[str]:
+        return self.resolve(client, [username]).get(username.lstrip("@").lower())
+
+    def stale_ids(self, user_ids: Optional[Iterable[str]] = None, max_age_days: Optional[int] = None) -> List[str]:
+        """resolved_at'i max_age_days'ten eski kayıtlar"""
+        max_age_days = config.engagement.user_cache_refresh_days if max_age_days is None else max_age_days
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        with self._lock:
+            ids = [str(i) for i in user_ids] if user_ids is not None else list(self._users)
+            return [i for i in ids if self._users.get(i, {}).get("resolved_at", "") < cutoff]
+
+    def refresh(self, client: tweepy.Client, user_ids: Iterable[str]) -> List[Tuple[str, str, str]]:
+        """
+        ID'leri toplu yeniden sorgula
+
+        Returns:
+            Handle değişiklikleri: [(user_id, eski_username, yeni_username)]
+        """
+        changes = []
+        for batch in _chunks(list(dict.fromkeys(str(i) for i in user_ids))):
+            try:
+                response = client.get_users(ids=batch)
+            except tweepy.TweepyException as e:
+                logger.error(f"User refresh failed ({len(batch)} ids): {e}")
+                continue
+            with self._lock:
+                for user in response.data or []:
+                    change = self._put(str(user.id), user.username)
+                    if change:
+                        logger.info(f"Handle changed: @{change[0]} -> @{change[1]} ({user.id})")
+                        changes.append((str(user.id), *change))
+                self._save()
+        return changes
+
+
+# Süreç genelinde tek önbellek
+user_ids = UserIdCache()
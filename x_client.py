@@ -0,0 +1,132 @@
+"""
+X Client - Ortak tweepy istemcisi
+Tüm X API istekleri bu sınıftan geçer (kullanım muhasebesi, rate limit)
+"""
+import re
+import time
+import requests
+import tweepy
+from urllib3.exceptions import NewConnectionError
+
+from config import config
+from rate_limits import rate_limits
+from resilience import CircuitOpenError, call, remaining, request_timeout
+from usage import ledger
+
+_NUMERIC_SEGMENT_RE = re.compile(r"(?<=.)/\d+(?=/|$)")
+_USERNAME_SEGMENT_RE = re.compile(r"/username/[^/]+")
+
+# Tweet/quote/reply/mention yazma endpoint'i
+TWEET_ENDPOINT = "POST /2/tweets"
+
+# tweepy.BaseClient.request içinde sabit host
+X_API_HOST = "https://api.twitter.com"
+
+
+def endpoint_name(method: str, route: str) -> str:
+    """
+    İsteği endpoint anahtarına indirge
+
+    'GET /2/users/123/tweets' -> 'GET /2/users/:id/tweets'
+    """
+    route = _USERNAME_SEGMENT_RE.sub("/username/:username", route)
+    route = _NUMERIC_SEGMENT_RE.sub("/:id", route)
+    return f"{method.upper()} {route}"
+
+
+def unsent_write_failure(exc: Exception) -> bool:
+    """
+    Yazma isteği X'e ulaşmadan mı başarısız oldu (tekrar denemek güvenli)
+
+    429 isteğin işlenmediğini söyler; bağlantı kurulamadıysa istek hiç
+    gitmemiştir. Timeout, kopan bağlantı ve 5xx'te X postu kabul etmiş
+    olabilir - tekrar yerine outbox recover/find_recent_tweet karar verir.
+    """
+    if isinstance(exc, (tweepy.TooManyRequests, requests.exceptions.ConnectTimeout)):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        reason = exc.args[0] if exc.args else None
+        return isinstance(getattr(reason, "reason", reason), NewConnectionError)
+    return False
+
+
+class XCircuitOpenError(CircuitOpenError, tweepy.TweepyException):
+    """Açık breaker - mevcut tweepy hata yakalayıcıları da yakalar"""
+
+
+class DeadlineSession(requests.Session):
+    """tweepy timeout vermez; döngü son tarihi varsa kalan süre HTTP timeout olur"""
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get("timeout") is None and remaining() is not None:
+            kwargs["timeout"] = request_timeout(config.x.request_timeout)
+        return super().request(method, url, *args, **kwargs)
+
+
+class RebasedSession(DeadlineSession):
+    """api.twitter.com isteklerini başka bir adrese (yerel stub) yönlendirir"""
+
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+
+    def request(self, method, url, *args, **kwargs):
+        if url.startswith(X_API_HOST):
+            url = self.base_url + url[len(X_API_HOST):]
+        return super().request(method, url, *args, **kwargs)
+
+
+class XClient(tweepy.Client):
+    """
+    tweepy.Client - her istek retry/breaker altında çalışır,
+    rate limit kaydından izin alır ve usage defterine kaydedilir;
+    döngü son tarihi retry, bekleme ve HTTP timeout'a uygulanır
+    """
+
+    def __init__(self, *args, base_url: str = "", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session = RebasedSession(base_url) if base_url else DeadlineSession()
+
+    def request(self, method, route, params=None, json=None, user_auth=False):
+        endpoint = endpoint_name(method, route)
+        return call(
+            f"x:{endpoint}",
+            self._accounted_request,
+            endpoint, method, route, params, json, user_auth,
+            open_error=XCircuitOpenError,
+            # Okumalar her geçici hatada, yazmalar sadece gönderilmediyse tekrar denenir
+            retry_if=None if method.upper() == "GET" else unsent_write_failure
+        )
+
+    def _accounted_request(self, endpoint, method, route, params, json, user_auth):
+        # Limit dolmuşsa reset'i bekle ya da RateLimitDeferred (istek gönderilmez);
+        # döngü son tarihinden sonrasına beklenmez
+        left = remaining()
+        rate_limits.acquire(endpoint, max_wait=None if left is None else min(left, config.resilience.rate_limit_max_wait))
+        start = time.monotonic()
+
+        try:
+            response = super().request(method, route, params=params, json=json, user_auth=user_auth)
+        except tweepy.HTTPException as e:
+            rate_limits.update(endpoint, e.response.headers)
+            ledger.record_x(endpoint, time.monotonic() - start, ok=False)
+            raise
+        except tweepy.TweepyException:
+            ledger.record_x(endpoint, time.monotonic() - start, ok=False)
+            raise
+
+        rate_limits.update(endpoint, response.headers)
+        ledger.record_x(endpoint, time.monotonic() - start, ok=True)
+        return response
+
+
+def create_x_client() -> XClient:
+    """Yapılandırmadan X istemcisi oluştur"""
+    return XClient(
+        consumer_key=config.x.api_key,
+        consumer_secret=config.x.api_secret,
+        access_token=config.x.access_token,
+        access_token_secret=config.x.access_token_secret,
+        bearer_token=config.x.bearer_token,
+        base_url=config.x.base_url
+    )
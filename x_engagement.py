@@ -11,7 +11,19 @@ from typing import Optional, List, Dict
 from loguru import logger
 import tweepy
 
+from activity import activity
+from candidate_pool import candidates, Candidate
 from config import config, DATA_DIR
+from engaged_index import engaged
+from event_journal import journal, migrate_legacy_history
+from quota import quota, QUOTES, REPLIES, MENTIONS
+from target_scheduler import target_scheduler
+from timeline_cache import timelines
+from user_cache import user_ids
+from x_client import create_x_client
+
+# Günlükteki engagement olay türleri -> eski geçmiş anahtarları
+ENGAGEMENT_EVENTS = {"quote": "quotes", "reply": "replies", "mention": "mentions"}
 
 
 class XEngagementManager:
@@ -27,64 +39,50 @@ class XEngagementManager:
     
     def __init__(self):
         self.client = self._create_client()
-        self.engagement_file = DATA_DIR / "engagement_history.json"
+        self.journal = journal
+        self.quota = quota
+        self.user_ids = user_ids
+        self.timelines = timelines
+        self.candidates = candidates
+        self.engaged = engaged
+        self.target_scheduler = target_scheduler
+        self.activity = activity
+        migrate_legacy_history(self.journal)
         self.target_accounts_file = DATA_DIR / "target_accounts.json"
-        self.last_activity_file = DATA_DIR / "last_activity.json"
+        # Boş/bozuk dosya sıradaki sayaçları silmesin
+        accounts = self.load_target_accounts()
+        if accounts:
+            self.target_scheduler.sync(accounts)
     
     def _create_client(self) -> tweepy.Client:
-        """Tweepy client oluştur"""
-        return tweepy.Client(
-            consumer_key=config.x.api_key,
-            consumer_secret=config.x.api_secret,
-            access_token=config.x.access_token,
-            access_token_secret=config.x.access_token_secret,
-            bearer_token=config.x.bearer_token
-        )
-    
-    def _load_engagement_history(self) -> dict:
-        """Engagement geçmişini yükle"""
-        if self.engagement_file.exists():
-            try:
-                return json.loads(self.engagement_file.read_text())
-            except:
-                return {"quotes": [], "mentions": [], "replies": [], "daily_stats": {}}
-        return {"quotes": [], "mentions": [], "replies": [], "daily_stats": {}}
-    
-    def _save_engagement_history(self, history: dict):
-        """Engagement geçmişini kaydet"""
-        self.engagement_file.write_text(json.dumps(history, indent=2, ensure_ascii=False))
+        """Tweepy client oluştur (usage muhasebeli)"""
+        return create_x_client()
     
-    def _update_last_activity(self):
-        """Son aktivite zamanını güncelle"""
-        self.last_activity_file.write_text(json.dumps({
-            "last_activity": datetime.now().isoformat(),
-            "type": "engagement"
-        }, indent=2))
+    def _load_engagement_history(self, limit: int = 500) -> dict:
+        """
+        Engagement geçmişi (olay günlüğünden)
+        
+        Her tür için son limit kayıt, eski formatla aynı yapıda.
+        """
+        history = {"quotes": [], "mentions": [], "replies": [], "daily_stats": {}}
+        for event_type, key in ENGAGEMENT_EVENTS.items():
+            history[key] = [
+                {**{k: v for k, v in e.items() if k not in ("seq", "type", "ts")}, "created_at": e["ts"]}
+                for e in self.journal.tail(limit, types=(event_type,))
+            ]
+        return history
     
     def check_24h_rule(self) -> tuple[bool, float]:
         """
-        24 saat kuralını kontrol et
+        24 saat kuralını kontrol et (tüm paylaşımlar dahil)
         
         Returns:
             (is_urgent, hours_since_last): Acil mi ve son aktiviteden bu yana geçen saat
         """
-        if not self.last_activity_file.exists():
-            return True, 999  # Hiç aktivite yok, acil
-        
-        try:
-            data = json.loads(self.last_activity_file.read_text())
-            last_activity = datetime.fromisoformat(data["last_activity"])
-            hours_since = (datetime.now() - last_activity).total_seconds() / 3600
-            
-            # 23 saatten fazla sessizlik = acil
-            is_urgent = hours_since >= config.engagement.max_silence_hours
-            
-            if is_urgent:
-                logger.warning(f"⚠️ 24 saat kuralı! Son aktiviteden {hours_since:.1f} saat geçti!")
-            
-            return is_urgent, hours_since
-        except:
-            return True, 999
+        is_urgent, hours_since = self.activity.check()
+        if is_urgent:
+            logger.warning(f"⚠️ 24 saat kuralı! Son aktiviteden {hours_since:.1f} saat geçti!")
+        return is_urgent, hours_since
     
     def load_target_accounts(self) -> List[Dict]:
         """
@@ -94,9 +92,15 @@ class XEngagementManager:
         """
         if self.target_accounts_file.exists():
             try:
-                return json.loads(self.target_accounts_file.read_text())
+                accounts = json.loads(self.target_accounts_file.read_text())
             except:
                 return []
+            # Güncel sayaçlar hedef sırasında tutulur
+            for account in accounts:
+                account["engagement_count"] = self.target_scheduler.count(
+                    account["username"], default=account.get("engagement_count", 0)
+                )
+            return accounts
         return []
     
     def add_target_account(self, username: str, category: str = "general"):
@@ -108,60 +112,169 @@ class XEngagementManager:
             logger.info(f"Hesap zaten listede: @{username}")
             return
         
+        # ID eklenirken çözülür; başarısızsa sonraki toplu yenilemede denenir
+        user_id = self.user_ids.resolve_one(self.client, username)
+        
         accounts.append({
             "username": username,
+            "user_id": user_id,
             "category": category,
             "added_at": datetime.now().isoformat(),
             "engagement_count": 0
         })
         
+        self._save_target_accounts(accounts)
+        logger.info(f"Hedef hesap eklendi: @{username} ({category}, id: {user_id})")
+    
+    def _save_target_accounts(self, accounts: List[Dict]):
+        """Listeyi kaydet ve hedef sırasını eşitle (seçim dosya okumaz)"""
         self.target_accounts_file.write_text(json.dumps(accounts, indent=2, ensure_ascii=False))
-        logger.info(f"Hedef hesap eklendi: @{username} ({category})")
+        self.target_scheduler.sync(accounts)
+    
+    def refresh_target_accounts(self, force: bool = False) -> List[tuple]:
+        """
+        Hedef hesap ID'lerini toplu çöz/yenile (istek başına 100 hesap)
+        
+        ID'siz hesaplar username ile çözülür; user_cache_refresh_days'ten
+        eski kayıtlar ID ile yenilenir. Handle değiştiyse hesap yeni
+        username ile güncellenir, eskisi previous_usernames'e eklenir.
+        
+        Returns:
+            [(user_id, eski_username, yeni_username)]
+        """
+        accounts = self.load_target_accounts()
+        if not accounts:
+            return []
+        changed = False
+        
+        unresolved = [a for a in accounts if not a.get("user_id")]
+        if unresolved:
+            resolved = self.user_ids.resolve(self.client, [a["username"] for a in unresolved])
+            for account in unresolved:
+                user_id = resolved.get(account["username"].lower())
+                if user_id:
+                    account["user_id"] = user_id
+                    changed = True
+        
+        ids = [a["user_id"] for a in accounts if a.get("user_id")]
+        stale = ids if force else self.user_ids.stale_ids(ids)
+        changes = self.user_ids.refresh(self.client, stale) if stale else []
+        
+        by_id = {a.get("user_id"): a for a in accounts}
+        for user_id, old, new in changes:
+            account = by_id.get(user_id)
+            if account and account["username"] != new:
+                self.target_scheduler.rename(account["username"], new)
+                account.setdefault("previous_usernames", []).append(account["username"])
+                account["username"] = new
+                changed = True
+        
+        if changed:
+            self._save_target_accounts(accounts)
+        return changes
+    
+    def _user_id_for(self, username: str) -> Optional[str]:
+        """Önbellekten ID; yoksa tek seferlik çözüm"""
+        return self.user_ids.lookup(username) or self.user_ids.resolve_one(self.client, username)
     
     def get_user_recent_tweets(self, username: str, count: int = 10) -> List[Dict]:
         """
         Kullanıcının son tweetlerini getir
         
-        Quote veya reply için tweet seçimi
+        Quote veya reply için tweet seçimi. Hesap başına since_id imleci
+        tutulur; sadece yeni tweetler indirilip yerel pencereye eklenir,
+        pencere tazeyse API'ye hiç gidilmez.
         """
         try:
-            # Kullanıcı ID'sini al
-            user = self.client.get_user(username=username)
-            if not user.data:
+            # Kullanıcı ID'si (önbellekten, değişmez)
+            user_id = self._user_id_for(username)
+            if not user_id:
                 logger.warning(f"Kullanıcı bulunamadı: @{username}")
                 return []
             
-            user_id = user.data.id
+            if self.timelines.is_fresh(user_id):
+                return self.timelines.recent(user_id, count)
             
-            # Son tweetleri al
-            tweets = self.client.get_users_tweets(
-                id=user_id,
-                max_results=count,
-                tweet_fields=["created_at", "public_metrics", "conversation_id"]
-            )
-            
-            if not tweets.data:
-                return []
+            # Sadece son görülen tweetten yenilerini al
+            params = {
+                "id": user_id,
+                "max_results": max(5, min(100, max(count, config.engagement.timeline_window))),
+                "tweet_fields": ["created_at", "public_metrics", "conversation_id"]
+            }
+            since_id = self.timelines.since_id(user_id)
+            if since_id:
+                params["since_id"] = since_id
+            tweets = self.client.get_users_tweets(**params)
             
-            return [
+            new_tweets = [
                 {
                     "id": str(tweet.id),
                     "text": tweet.text,
                     "created_at": tweet.created_at.isoformat() if tweet.created_at else None,
-                    "metrics": tweet.public_metrics if hasattr(tweet, 'public_metrics') else {}
+                    "metrics": tweet.public_metrics if hasattr(tweet, 'public_metrics') else {},
+                    "conversation_id": str(tweet.conversation_id) if getattr(tweet, 'conversation_id', None) else None
                 }
-                for tweet in tweets.data
+                for tweet in tweets.data or []
             ]
+            logger.debug(f"@{username}: {len(new_tweets)} new tweets since {since_id}")
+            
+            return self.timelines.merge(user_id, new_tweets)[:count]
             
         except Exception as e:
             logger.error(f"Tweet çekme hatası (@{username}): {e}")
             return []
     
+    def refresh_candidate_pool(self) -> int:
+        """
+        Aday havuzunu yeniden kur (arka plan işi)
+        
+        Zaman akışı önbelleği tazeyse API'ye gidilmez; etkileşim yapılmış
+        tweetler havuza alınmaz. Adayların metrikleri toplu sorguyla
+        tazelenir (hız puanı ilk görüldüğü andaki sayılarla hesaplanmasın).
+        
+        Returns:
+            Havuzdaki aday sayısı
+        """
+        windows = [
+            (account["username"], self.get_user_recent_tweets(account["username"], count=config.engagement.timeline_window))
+            for account in self.load_target_accounts()
+        ]
+        
+        ids = [t["id"] for _, tweets in windows for t in tweets if not self.has_engaged(t["id"])]
+        metrics = self.timelines.refresh_metrics(self.client, ids) if ids else {}
+        
+        pool = []
+        for username, tweets in windows:
+            for tweet in tweets:
+                pool.append(Candidate(
+                    tweet_id=tweet["id"],
+                    username=username,
+                    text=tweet["text"],
+                    created_at=tweet.get("created_at"),
+                    metrics=metrics.get(tweet["id"]) or tweet.get("metrics") or {},
+                    conversation_id=tweet.get("conversation_id"),
+                ))
+        
+        self.candidates.rebuild([c for c in pool if not self.has_engaged(c.tweet_id)])
+        return len(self.candidates)
+    
+    def select_candidate(self, username: Optional[str] = None) -> Optional[Candidate]:
+        """Havuzdan en iyi adayı al (API çağrısı yok, etkileşim yapılmışlar atlanır)"""
+        while True:
+            candidate = self.candidates.select(username)
+            if candidate is None or not self.has_engaged(candidate.tweet_id):
+                return candidate
+    
+    def has_engaged(self, tweet_id: str) -> bool:
+        """Bu tweet daha önce quote/reply yapıldı mı (O(1))"""
+        return str(tweet_id) in self.engaged
+    
     def quote_tweet(
         self, 
         tweet_id: str, 
         comment: str, 
-        dry_run: bool = None
+        dry_run: bool = None,
+        language: str = None
     ) -> Optional[str]:
         """
         Quote tweet yap (Alıntı tweet)
@@ -172,6 +285,7 @@ class XEngagementManager:
             tweet_id: Alıntılanacak tweet ID'si
             comment: Alıntı yorumu
             dry_run: Test modu
+            language: İçerik dili (istatistikler için)
             
         Returns:
             Yeni tweet ID veya None
@@ -186,6 +300,10 @@ class XEngagementManager:
             logger.info(f"[DRY RUN] Quote tweet: {comment[:50]}... -> Tweet {tweet_id}")
             return "dry_run_quote_id"
         
+        if self.has_engaged(tweet_id):
+            logger.warning(f"Tweet {tweet_id} zaten alıntılandı/yanıtlandı, atlanıyor")
+            return None
+        
         try:
             # Quote tweet = tweet metnine URL ekleyerek
             tweet_url = f"https://twitter.com/i/status/{tweet_id}"
@@ -201,15 +319,13 @@ class XEngagementManager:
             quote_id = response.data["id"]
             
             # Geçmişe kaydet
-            history = self._load_engagement_history()
-            history["quotes"].append({
-                "quote_id": quote_id,
-                "original_tweet_id": tweet_id,
-                "comment": comment,
-                "created_at": datetime.now().isoformat()
-            })
-            self._save_engagement_history(history)
-            self._update_last_activity()
+            self.journal.append(
+                "quote",
+                quote_id=quote_id,
+                original_tweet_id=tweet_id,
+                comment=comment,
+                language=language
+            )
             
             logger.success(f"Quote tweet oluşturuldu: {quote_id}")
             return quote_id
@@ -222,7 +338,8 @@ class XEngagementManager:
         self, 
         tweet_id: str, 
         reply_text: str, 
-        dry_run: bool = None
+        dry_run: bool = None,
+        language: str = None
     ) -> Optional[str]:
         """
         Tweet'e yanıt ver (Mention)
@@ -233,6 +350,7 @@ class XEngagementManager:
             tweet_id: Yanıtlanacak tweet ID'si
             reply_text: Yanıt metni
             dry_run: Test modu
+            language: İçerik dili (istatistikler için)
             
         Returns:
             Yanıt tweet ID veya None
@@ -247,6 +365,10 @@ class XEngagementManager:
             logger.info(f"[DRY RUN] Reply: {reply_text[:50]}... -> Tweet {tweet_id}")
             return "dry_run_reply_id"
         
+        if self.has_engaged(tweet_id):
+            logger.warning(f"Tweet {tweet_id} zaten alıntılandı/yanıtlandı, atlanıyor")
+            return None
+        
         try:
             response = self.client.create_tweet(
                 text=reply_text,
@@ -255,15 +377,13 @@ class XEngagementManager:
             reply_id = response.data["id"]
             
             # Geçmişe kaydet
-            history = self._load_engagement_history()
-            history["replies"].append({
-                "reply_id": reply_id,
-                "original_tweet_id": tweet_id,
-                "text": reply_text,
-                "created_at": datetime.now().isoformat()
-            })
-            self._save_engagement_history(history)
-            self._update_last_activity()
+            self.journal.append(
+                "reply",
+                reply_id=reply_id,
+                original_tweet_id=tweet_id,
+                text=reply_text,
+                language=language
+            )
             
             logger.success(f"Reply oluşturuldu: {reply_id}")
             return reply_id
@@ -276,7 +396,8 @@ class XEngagementManager:
         self, 
         username: str, 
         tweet_text: str, 
-        dry_run: bool = None
+        dry_run: bool = None,
+        language: str = None
     ) -> Optional[str]:
         """
         Kullanıcıyı mention et (yeni tweet'te)
@@ -285,6 +406,7 @@ class XEngagementManager:
             username: Mention edilecek kullanıcı (@'sız)
             tweet_text: Tweet metni (@username otomatik eklenir)
             dry_run: Test modu
+            language: İçerik dili (istatistikler için)
             
         Returns:
             Tweet ID veya None
@@ -308,15 +430,13 @@ class XEngagementManager:
             mention_id = response.data["id"]
             
             # Geçmişe kaydet
-            history = self._load_engagement_history()
-            history["mentions"].append({
-                "mention_id": mention_id,
-                "mentioned_user": username,
-                "text": tweet_text,
-                "created_at": datetime.now().isoformat()
-            })
-            self._save_engagement_history(history)
-            self._update_last_activity()
+            self.journal.append(
+                "mention",
+                mention_id=mention_id,
+                mentioned_user=username,
+                text=tweet_text,
+                language=language
+            )
             
             logger.success(f"Mention oluşturuldu: {mention_id}")
             return mention_id
@@ -327,28 +447,19 @@ class XEngagementManager:
     
     def get_daily_engagement_stats(self) -> dict:
         """Günlük engagement istatistikleri"""
-        history = self._load_engagement_history()
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        today_quotes = [q for q in history.get("quotes", []) 
-                       if q.get("created_at", "").startswith(today)]
-        today_replies = [r for r in history.get("replies", []) 
-                        if r.get("created_at", "").startswith(today)]
-        today_mentions = [m for m in history.get("mentions", []) 
-                         if m.get("created_at", "").startswith(today)]
-        
-        total_engagement = len(today_quotes) + len(today_replies) + len(today_mentions)
+        counts = self.quota.snapshot()
+        total_engagement = counts[QUOTES] + counts[REPLIES] + counts[MENTIONS]
         
         return {
-            "date": today,
-            "quotes": len(today_quotes),
-            "replies": len(today_replies),
-            "mentions": len(today_mentions),
+            "date": counts["date"],
+            "quotes": counts[QUOTES],
+            "replies": counts[REPLIES],
+            "mentions": counts[MENTIONS],
             "total": total_engagement,
             "quote_target": config.engagement.daily_quote_target,
             "mention_target": config.engagement.daily_mention_target,
-            "quote_remaining": max(0, config.engagement.daily_quote_target - len(today_quotes)),
-            "mention_remaining": max(0, config.engagement.daily_mention_target - len(today_mentions))
+            "quote_remaining": self.quota.remaining(QUOTES),
+            "mention_remaining": self.quota.remaining(MENTIONS)
         }
     
     def decide_action_type(self) -> str:
@@ -366,11 +477,17 @@ class XEngagementManager:
             # %90: Quote veya mention
             sub_roll = random.random()
             if sub_roll < 0.5:
-                return "quote"
+                action = "quote"
             elif sub_roll < 0.8:
-                return "reply"
+                action = "reply"
             else:
-                return "mention"
+                action = "mention"
+            
+            # Günlük hedefi dolan tür yerine reply (limitsiz)
+            if not self.quota.allows(action):
+                logger.debug(f"Daily {action} target reached, falling back to reply")
+                return "reply"
+            return action
         else:
             # %10: Orijinal post
             return "original"
@@ -379,29 +496,26 @@ class XEngagementManager:
         """
         Engagement için hedef hesap seç
         
-        En az etkileşim yapılmış hesaba öncelik ver
+        Bekleme süresi dolmuş hesaplardan sıradaki (eşitlikte en az
+        etkileşim yapılan); aday havuzu kuruluysa havuzda adayı olmayan
+        hesaplar atlanır. O(log n); hesap kayıtları hedef sırasında
+        tutulduğu için dosya okuması/yazması yok.
         """
-        accounts = self.load_target_accounts()
-        
-        if not accounts:
+        if not len(self.target_scheduler):
             logger.warning("Hedef hesap listesi boş!")
             return None
         
-        # En az etkileşim yapılana öncelik
-        accounts.sort(key=lambda x: x.get("engagement_count", 0))
+        has_candidates = self.candidates.has_candidates if len(self.candidates) else None
+        target = self.target_scheduler.select(has_candidates)
+        if not target:
+            logger.info("Uygun hedef yok (bekleme süresinde veya aday yok)")
+            return None
         
-        return accounts[0]
+        return target
     
     def increment_engagement_count(self, username: str):
-        """Hesabın engagement sayısını artır"""
-        accounts = self.load_target_accounts()
-        
-        for account in accounts:
-            if account["username"] == username:
-                account["engagement_count"] = account.get("engagement_count", 0) + 1
-                break
-        
-        self.target_accounts_file.write_text(json.dumps(accounts, indent=2, ensure_ascii=False))
+        """Hesabın engagement sayısını artır ve bekleme süresini başlat"""
+        self.target_scheduler.record(username)
 
 
 # Test için
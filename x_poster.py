@@ -1,14 +1,24 @@
 """
 X (Twitter) Poster - Tweet paylaşım modülü
 """
+import hashlib
 import json
-from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, List
 from loguru import logger
 import tweepy
 
 from config import config, DATA_DIR
+from event_journal import journal, migrate_legacy_history
+from quota import quota, POSTS
+from rollups import rollups
+from usage import local_now
+from x_client import create_x_client
+from tweet_text import MAX_TWEET_WEIGHT, weighted_length, truncate_weighted
+
+
+# Günlük limite sayılan olaylar (thread tek paylaşım sayılır)
+POST_EVENTS = ("tweet", "thread")
 
 
 class XPoster:
@@ -16,84 +26,62 @@ class XPoster:
     
     def __init__(self):
         self.client = self._create_client()
-        self.history_file = DATA_DIR / "tweet_history.json"
+        self.journal = journal
+        self.quota = quota
+        self.checkpoint_file = DATA_DIR / "thread_checkpoints.json"
+        migrate_legacy_history(self.journal)
     
     def _create_client(self) -> tweepy.Client:
-        """Tweepy client oluştur"""
-        return tweepy.Client(
-            consumer_key=config.x.api_key,
-            consumer_secret=config.x.api_secret,
-            access_token=config.x.access_token,
-            access_token_secret=config.x.access_token_secret,
-            bearer_token=config.x.bearer_token
-        )
+        """Tweepy client oluştur (usage muhasebeli)"""
+        return create_x_client()
     
     def _load_history(self) -> dict:
-        """Tweet geçmişini yükle"""
-        if self.history_file.exists():
-            try:
-                return json.loads(self.history_file.read_text())
-            except:
-                return {"tweets": [], "daily_count": {}}
-        return {"tweets": [], "daily_count": {}}
-    
-    def _save_history(self, history: dict):
-        """Tweet geçmişini kaydet"""
-        self.history_file.write_text(json.dumps(history, indent=2, ensure_ascii=False))
-    
-    def _get_daily_count(self) -> int:
-        """Bugün kaç tweet atıldığını getir"""
-        history = self._load_history()
-        today = datetime.now().strftime("%Y-%m-%d")
-        return history.get("daily_count", {}).get(today, 0)
-    
-    def _increment_daily_count(self):
-        """Günlük sayacı artır"""
-        history = self._load_history()
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        if "daily_count" not in history:
-            history["daily_count"] = {}
-        
-        history["daily_count"][today] = history["daily_count"].get(today, 0) + 1
+        """
+        Tweet geçmişi (olay günlüğünden)
         
-        # Eski günleri temizle (son 7 gün tut)
-        keys_to_remove = []
-        for date_key in history["daily_count"]:
-            try:
-                key_date = datetime.strptime(date_key, "%Y-%m-%d")
-                if (datetime.now() - key_date).days > 7:
-                    keys_to_remove.append(date_key)
-            except:
-                pass
+        Son 500 tweet ve son 7 günün sayaçları, eski formatla aynı yapıda.
+        """
+        tweets = [
+            {
+                "tweet_id": e.get("tweet_id"),
+                "text": e.get("text", ""),
+                "language": e.get("language"),
+                "reddit_post_id": e.get("reddit_post_id"),
+                "posted_at": e["ts"]
+            }
+            for e in self.journal.tail(500, types=("tweet",))
+        ]
         
-        for key in keys_to_remove:
-            del history["daily_count"][key]
+        week_ago = (local_now() - timedelta(days=7)).strftime("%Y-%m-%d")
+        daily_count = {}
+        for event in self.journal.since(week_ago, types=POST_EVENTS):
+            day = event["ts"][:10]
+            daily_count[day] = daily_count.get(day, 0) + 1
         
-        self._save_history(history)
+        return {"tweets": tweets, "daily_count": daily_count}
+    
+    def _get_daily_count(self) -> int:
+        """Bugün kaç tweet atıldığını getir (thread = 1)"""
+        return self.quota.count(POSTS)
     
     def _log_tweet(self, tweet_id: str, tweet_text: str, language: str, reddit_post_id: str = None):
-        """Tweet'i geçmişe kaydet"""
-        history = self._load_history()
-        
-        history["tweets"].append({
-            "tweet_id": tweet_id,
-            "text": tweet_text,
-            "language": language,
-            "reddit_post_id": reddit_post_id,
-            "posted_at": datetime.now().isoformat()
-        })
-        
-        # Son 500 tweet'i tut
-        history["tweets"] = history["tweets"][-500:]
-        
-        self._save_history(history)
+        """Tweet'i günlüğe ekle (günlük sayaca da sayılır)"""
+        self.journal.append(
+            "tweet",
+            tweet_id=tweet_id,
+            text=tweet_text,
+            language=language,
+            reddit_post_id=reddit_post_id
+        )
+    
+    def _log_thread(self, tweet_ids: List[str], language: str, reddit_post_id: str = None):
+        """Thread'i günlüğe ekle (günlük sayaca 1 olarak sayılır)"""
+        self.journal.append("thread", tweet_ids=tweet_ids, language=language, reddit_post_id=reddit_post_id)
     
     def can_post(self) -> tuple[bool, str]:
         """Tweet atılabilir mi kontrol et"""
-        daily_count = self._get_daily_count()
-        
-        if daily_count >= config.tweet.max_daily_tweets:
+        if not self.quota.allows(POSTS):
+            daily_count = self._get_daily_count()
             return False, f"Daily limit reached ({daily_count}/{config.tweet.max_daily_tweets})"
         
         return True, "OK"
@@ -126,8 +114,8 @@ class XPoster:
             return None
         
         # Karakter kontrolü
-        if len(text) > 280:
-            logger.error(f"Tweet too long: {len(text)} characters")
+        if weighted_length(text) > MAX_TWEET_WEIGHT:
+            logger.error(f"Tweet too long: {weighted_length(text)} weighted characters")
             return None
         
         if dry_run:
@@ -142,30 +130,109 @@ class XPoster:
             
             # Geçmişe kaydet
             self._log_tweet(tweet_id, text, language, reddit_post_id)
-            self._increment_daily_count()
             
             return tweet_id
             
+        except tweepy.TwitterServerError:
+            # X postu kabul etmiş olabilir: outbox öğesi 'posting' kalır,
+            # recover() find_recent_tweet ile karar verir
+            raise
         except tweepy.TweepyException as e:
             logger.error(f"Error posting tweet: {e}")
             return None
     
+    def _load_checkpoints(self) -> dict:
+        """Yarım kalan thread'ler: {anahtar: checkpoint}"""
+        if self.checkpoint_file.exists():
+            try:
+                return json.loads(self.checkpoint_file.read_text())
+            except Exception as e:
+                logger.warning(f"Thread checkpoints could not be loaded: {e}")
+        return {}
+    
+    def _save_checkpoints(self, checkpoints: dict):
+        """Checkpoint'leri atomik olarak yaz (yarıda kesilen yazma eskiyi bozmasın)"""
+        tmp = self.checkpoint_file.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(checkpoints, indent=2, ensure_ascii=False))
+        tmp.replace(self.checkpoint_file)
+    
+    @staticmethod
+    def _thread_key(tweets: List[str], reddit_post_id: str = None) -> str:
+        if reddit_post_id:
+            return reddit_post_id
+        return hashlib.sha1("\n".join(tweets).encode("utf-8")).hexdigest()[:16]
+    
+    def discard_thread_checkpoint(self, key: str):
+        """Artık devam ettirilmeyecek thread'in checkpoint'ini sil"""
+        checkpoints = self._load_checkpoints()
+        if checkpoints.pop(key, None) is not None:
+            self._save_checkpoints(checkpoints)
+    
+    def prune_thread_checkpoints(self, active_keys: set) -> int:
+        """
+        Bekleyen outbox öğesi olmayan checkpoint'leri sil
+        
+        Thread'ler sadece outbox üzerinden devam ettirilir; öğesi
+        paylaşılmış, başarısız olmuş ya da silinmiş checkpoint'ler kalmaz.
+        """
+        checkpoints = self._load_checkpoints()
+        orphaned = [key for key in checkpoints if key not in active_keys]
+        for key in orphaned:
+            logger.warning(f"Dropping orphaned thread checkpoint {key} ({len(checkpoints[key]['posted_ids'])} tweets posted)")
+            del checkpoints[key]
+        if orphaned:
+            self._save_checkpoints(checkpoints)
+        return len(orphaned)
+    
+    def find_recent_tweet(self, text: str, lookback: int = 10) -> Optional[str]:
+        """
+        Hesabın son tweetlerinde aynı metin var mı (çökme sonrası kurtarma)
+        
+        X linkleri t.co'ya çevirdiği için baştaki metin karşılaştırılır.
+        """
+        prefix = text.strip()[:60]
+        try:
+            me = self.client.get_me(user_auth=True)
+            response = self.client.get_users_tweets(
+                me.data.id,
+                max_results=max(5, lookback),
+                user_auth=True
+            )
+        except tweepy.TweepyException as e:
+            logger.warning(f"Could not check recent tweets: {e}")
+            return None
+        
+        for tweet in response.data or []:
+            if tweet.text.strip()[:60] == prefix:
+                return str(tweet.id)
+        return None
+    
     def post_thread(
         self, 
         tweets: List[str], 
         language: str = "tr",
-        dry_run: bool = None
+        dry_run: bool = None,
+        reddit_post_id: str = None,
+        checkpoint_key: str = None
     ) -> List[str]:
         """
         Thread paylaş
         
+        Her paylaşılan tweet ID'si checkpoint'e yazılır. Aynı thread için
+        tekrar çağrılırsa (aynı checkpoint_key, reddit_post_id ya da metinler)
+        kayıtlı metinlerle son başarılı tweet'in altından devam edilir.
+        Devam ettirme outbox'a aittir: checkpoint_key outbox idempotency
+        anahtarıdır ve bekleyen öğesi kalmayan checkpoint recover() ile silinir.
+        
         Args:
             tweets: Tweet listesi
             language: Dil
             dry_run: Kuru çalıştırma
+            reddit_post_id: İlişkili Reddit post ID'si
+            checkpoint_key: Checkpoint anahtarı (ör. outbox idempotency anahtarı)
             
         Returns:
-            Tweet ID listesi
+            Tweet ID listesi (thread tamamlanmadıysa boş)
         """
         dry_run = dry_run if dry_run is not None else config.dry_run
         
@@ -173,20 +240,39 @@ class XPoster:
             logger.warning("No tweets to post")
             return []
         
-        tweet_ids = []
-        reply_to_id = None
+        # Tweet metinleri baştan düzeltilir ki devamda aynı metinler kullanılsın
+        tweets = [
+            truncate_weighted(t) if weighted_length(t) > MAX_TWEET_WEIGHT else t
+            for t in tweets
+        ]
         
-        for i, tweet_text in enumerate(tweets):
-            # Karakter kontrolü
-            if len(tweet_text) > 280:
-                logger.warning(f"Tweet {i+1} too long, truncating...")
-                tweet_text = tweet_text[:277] + "..."
-            
-            if dry_run:
+        if dry_run:
+            for i, tweet_text in enumerate(tweets):
                 logger.info(f"[DRY RUN] Thread {i+1}/{len(tweets)}: {tweet_text[:80]}...")
-                tweet_ids.append(f"dry_run_{i}")
-                continue
-            
+            return [f"dry_run_{i}" for i in range(len(tweets))]
+        
+        key = checkpoint_key or self._thread_key(tweets, reddit_post_id)
+        checkpoints = self._load_checkpoints()
+        checkpoint = checkpoints.get(key)
+        if checkpoint:
+            tweets = checkpoint["tweets"]
+            language = checkpoint.get("language", language)
+            logger.info(f"Resuming thread {key} after {len(checkpoint['posted_ids'])}/{len(tweets)} tweets")
+        else:
+            checkpoint = {
+                "key": key,
+                "tweets": tweets,
+                "language": language,
+                "reddit_post_id": reddit_post_id,
+                "posted_ids": [],
+                "created_at": datetime.now().isoformat()
+            }
+        
+        tweet_ids = checkpoint["posted_ids"]
+        reply_to_id = tweet_ids[-1] if tweet_ids else None
+        
+        for i in range(len(tweet_ids), len(tweets)):
+            tweet_text = tweets[i]
             try:
                 if reply_to_id:
                     response = self.client.create_tweet(
@@ -200,27 +286,93 @@ class XPoster:
                 tweet_ids.append(tweet_id)
                 reply_to_id = tweet_id
                 
+                # Checkpoint: sonraki deneme buradan devam eder
+                checkpoint["updated_at"] = datetime.now().isoformat()
+                checkpoints[key] = checkpoint
+                self._save_checkpoints(checkpoints)
+                
                 logger.info(f"Posted thread tweet {i+1}/{len(tweets)}: {tweet_id}")
                 
+            except tweepy.TwitterServerError:
+                # Tweet X'e ulaşmış olabilir: checkpoint korunur, outbox
+                # öğesi 'posting' kalır ve recover() reconcile_thread ile çözer
+                logger.warning(f"Thread tweet {i+1} outcome unknown, checkpoint kept ({len(tweet_ids)}/{len(tweets)})")
+                raise
             except tweepy.TweepyException as e:
                 logger.error(f"Error posting thread tweet {i+1}: {e}")
-                break
+                if tweet_ids:
+                    logger.warning(f"Thread checkpoint saved ({len(tweet_ids)}/{len(tweets)}), will resume on next run")
+                return []
         
-        if tweet_ids and not dry_run:
-            self._increment_daily_count()
+        checkpoints.pop(key, None)
+        self._save_checkpoints(checkpoints)
+        self._log_thread(tweet_ids, language, checkpoint.get("reddit_post_id"))
         
         return tweet_ids
     
+    def reconcile_thread(
+        self,
+        key: str,
+        tweets: List[str],
+        language: str = "tr",
+        reddit_post_id: str = None
+    ) -> Optional[List[str]]:
+        """
+        Sonucu bilinmeyen thread tweet'lerini X'ten doğrula (çökme/5xx sonrası)
+        
+        Checkpoint'teki son tweet'ten sonraki metinler hesabın son
+        tweetlerinde aranır; bulunanlar checkpoint'e eklenir ve thread
+        oradan devam eder, aynı tweet tekrar gönderilmez.
+        
+        Returns:
+            Thread tamamlandıysa tweet ID listesi, değilse None
+        """
+        checkpoints = self._load_checkpoints()
+        checkpoint = checkpoints.get(key) or {
+            "key": key,
+            "tweets": tweets,
+            "language": language,
+            "reddit_post_id": reddit_post_id,
+            "posted_ids": [],
+            "created_at": datetime.now().isoformat()
+        }
+        tweets = checkpoint["tweets"]
+        tweet_ids = checkpoint["posted_ids"]
+        
+        found = False
+        while len(tweet_ids) < len(tweets):
+            remote_id = self.find_recent_tweet(tweets[len(tweet_ids)])
+            if not remote_id:
+                break
+            logger.info(f"Thread {key}: tweet {len(tweet_ids) + 1} was already posted ({remote_id})")
+            tweet_ids.append(remote_id)
+            found = True
+        
+        if len(tweet_ids) == len(tweets):
+            checkpoints.pop(key, None)
+            self._save_checkpoints(checkpoints)
+            self._log_thread(tweet_ids, checkpoint.get("language", language), checkpoint.get("reddit_post_id"))
+            return tweet_ids
+        
+        if found:
+            checkpoint["updated_at"] = datetime.now().isoformat()
+            checkpoints[key] = checkpoint
+            self._save_checkpoints(checkpoints)
+        return None
+    
+    def get_recent_texts(self, limit: int = 50) -> List[str]:
+        """Son paylaşılan tweet metinleri (varyant seçimi için)"""
+        return [e.get("text", "") for e in self.journal.tail(limit, types=("tweet",))]
+    
     def get_stats(self) -> dict:
         """Tweet istatistiklerini getir"""
-        history = self._load_history()
-        today = datetime.now().strftime("%Y-%m-%d")
+        today_count = self._get_daily_count()
         
         return {
-            "total_tweets": len(history.get("tweets", [])),
-            "today_count": history.get("daily_count", {}).get(today, 0),
+            "total_tweets": rollups.total(("tweet",)),
+            "today_count": today_count,
             "daily_limit": config.tweet.max_daily_tweets,
-            "remaining_today": config.tweet.max_daily_tweets - history.get("daily_count", {}).get(today, 0)
+            "remaining_today": self.quota.remaining(POSTS)
         }
 
 